@@ -1,3 +1,4 @@
+from .batch import *
 from .builtins import *
 from .errors import *
 from .lang import *
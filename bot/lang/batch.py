@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy
+
+from .errors import LangError
+from .lang import (
+    CSV,
+    Array,
+    Expression,
+    Index,
+    Map,
+    Member,
+    Object,
+    Operator,
+    Set,
+    UnaryExpression,
+    compile_expression,
+    get_lang_attrs,
+)
+
+__all__ = ("evaluate_batch",)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping, Sequence
+    from typing import Any
+
+    Scope = dict[str, Any]
+
+
+def evaluate_batch(
+    expression: Any,
+    scope: Scope,
+    rows: Mapping[str, Sequence[Any]],
+    columns: Mapping[str, Mapping[str, numpy.ndarray[Any, Any]]],
+) -> numpy.ndarray[Any, Any]:
+    # rows maps scope names to equal length sequences of objects and columns maps
+    # the same names to arrays keyed by dotted attribute path, anything that can't
+    # be computed from columns is evaluated row by row and if the vectorized form
+    # fails outright (e.g. Decimal * float) the whole expression falls back so
+    # errors match evaluate
+    # column math follows the dtype of the column, float64 columns like score
+    # round like floats instead of decimals and int64 columns wrap around instead
+    # of growing, so results can differ from evaluate in the last digits or past
+    # 2**63, leave an attribute out of the columns when that matters
+    batch = Batch(scope, rows, columns)
+    with numpy.errstate(all="ignore"):
+        try:
+            result = batch.evaluate(expression)
+        except (TypeError, ValueError, ArithmeticError, LangError):
+            result = batch.evaluate_rows(expression)
+    if numpy.ndim(result) == 0:
+        return numpy.full(batch.size, result)
+    return result
+
+
+class Batch:
+    def __init__(
+        self,
+        scope: Scope,
+        rows: Mapping[str, Sequence[Any]],
+        columns: Mapping[str, Mapping[str, numpy.ndarray[Any, Any]]],
+    ) -> None:
+        self.scope: Scope = scope
+        self.rows: Mapping[str, Sequence[Any]] = rows
+        self.columns: Mapping[str, Mapping[str, numpy.ndarray[Any, Any]]] = columns
+        self.size: int = len(next(iter(rows.values()))) if rows else 0
+
+    def subset(self, mask: numpy.ndarray[Any, Any]) -> Batch:
+        indexes = numpy.flatnonzero(mask)
+        return Batch(
+            self.scope,
+            {name: [rows[i] for i in indexes] for name, rows in self.rows.items()},
+            {
+                name: {path: column[indexes] for path, column in columns.items()}
+                for name, columns in self.columns.items()
+            },
+        )
+
+    def depends(self, value: Any) -> bool:  # noqa: C901
+        if isinstance(value, Member):
+            root = value.path[0]
+            if isinstance(root, str):
+                if root in self.rows:
+                    return True
+            elif self.depends(root):
+                return True
+            return any(self.depends(i) for i in value.path[1:])
+        elif isinstance(value, Expression):
+            return self.depends(value.left) or self.depends(value.right)
+        elif isinstance(value, UnaryExpression):
+            return self.depends(value.value)
+        elif isinstance(value, (CSV, Index, Map)):
+            return any(self.depends(i) for i in value.values)
+        elif isinstance(value, (Array, Set)):
+            return self.depends(value.csv)
+        elif isinstance(value, Object):
+            return self.depends(value.map)
+        return False
+
+    def evaluate(self, value: Any) -> Any:
+        if not getattr(value, "__lang_abstract__", False):
+            return value
+        if not self.depends(value):
+            return compile_expression(value)(self.scope)
+        if isinstance(value, Expression):
+            return self.evaluate_expression(value)
+        elif isinstance(value, UnaryExpression):
+            if value.operator is Operator.not_:
+                return numpy.logical_not(self.evaluate(value.value))
+            return numpy.negative(self.evaluate(value.value))
+        elif isinstance(value, Member):
+            column = self.get_column(value)
+            if column is not None:
+                return column
+        return self.evaluate_rows(value)
+
+    def evaluate_expression(self, expression: Expression) -> Any:
+        if expression.operator is Operator.and_:
+            left = self.evaluate(expression.left)
+            return self.short_circuit(left, truthy(left), expression.right)
+        elif expression.operator is Operator.or_:
+            left = self.evaluate(expression.left)
+            return self.short_circuit(
+                left, numpy.logical_not(truthy(left)), expression.right
+            )
+        function = VECTOR_OPERATORS.get(expression.operator)
+        if function is None:
+            return self.evaluate_rows(expression)
+        return function(self.evaluate(expression.left), self.evaluate(expression.right))
+
+    def short_circuit(self, left: Any, mask: Any, right: Any) -> Any:
+        # the right side is only evaluated for the rows where mask is set so guards
+        # like a.inner is not None && a.inner.value > 0 work like they do in evaluate
+        if numpy.ndim(mask) == 0:
+            return self.evaluate(right) if mask else left
+        if not mask.any():
+            return left
+        values = self.subset(mask).evaluate(right)
+        if mask.all():
+            return values
+        result = numpy.empty(
+            self.size, dtype=numpy.result_type(left, numpy.asarray(values))
+        )
+        result[:] = left
+        result[mask] = values
+        return result
+
+    def get_column(self, member: Member) -> Any:
+        root, *path = member.path
+        if (
+            not isinstance(root, str)
+            or not path
+            or not all(isinstance(i, str) for i in path)
+        ):
+            return None
+        column = self.columns.get(root, {}).get(".".join(path))
+        if column is None:
+            return None
+        # the snapshot has to respect __lang_attrs__ like evaluate does
+        if self.size:
+            obj = self.rows[root][0]
+            for name in path:
+                if name not in get_lang_attrs(obj):
+                    return None
+                obj = getattr(obj, name)
+        return column
+
+    def evaluate_rows(self, value: Any) -> numpy.ndarray[Any, Any]:
+        evaluator = compile_expression(value)
+        result = numpy.empty(self.size, dtype=object)
+        for index in range(self.size):
+            result[index] = evaluator(
+                self.scope | {name: rows[index] for name, rows in self.rows.items()}
+            )
+        return result
+
+
+def truthy(value: Any) -> Any:
+    if isinstance(value, numpy.ndarray):
+        return value.astype(bool)
+    return bool(value)
+
+
+VECTOR_OPERATORS: dict[Operator, Callable[[Any, Any], Any]] = {
+    Operator.lt: numpy.less,
+    Operator.le: numpy.less_equal,
+    Operator.ge: numpy.greater_equal,
+    Operator.gt: numpy.greater,
+    Operator.eq: numpy.equal,
+    Operator.ne: numpy.not_equal,
+    Operator.add: numpy.add,
+    Operator.sub: numpy.subtract,
+    Operator.mul: numpy.multiply,
+    Operator.div: numpy.true_divide,
+    Operator.mod: numpy.mod,
+    Operator.floor: numpy.floor_divide,
+    Operator.pow: numpy.power,
+}
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import abc
 import decimal
+import functools
+import operator
 import re
 from enum import Enum
 from typing import TYPE_CHECKING, Callable
@@ -12,13 +15,18 @@ from .builtins import get_builtin_attrs
 
 __all__ = (
     "Expression",
+    "compile_expression",
     "parse_expression",
 )
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
     from typing import Any, Final, Optional
 
     Scope = dict[str, Any]
+    Evaluator = Callable[[Scope], Any]
+    # scope names -> the type their values are known to have when compiling
+    Types = Mapping[str, type[Any]]
 
 
 def get_attribute(obj: Any, name: str, default: Optional[Any] = None) -> Any:
@@ -35,16 +43,49 @@ def get_attribute(obj: Any, name: str, default: Optional[Any] = None) -> Any:
             ) from e
 
 
-def get_lang_attrs(obj: Any) -> set[str]:
-    return get_attribute(obj, "__lang_attrs__", set()) or get_builtin_attrs(obj)
+def get_lang_attrs(obj: Any) -> frozenset[str]:
+    # dicts can declare their own attributes so they can't be cached by type
+    if isinstance(obj, dict):
+        return frozenset(
+            get_attribute(obj, "__lang_attrs__", set()) or get_builtin_attrs(obj)
+        )
+    try:
+        return LANG_ATTRS[type(obj)]
+    except KeyError:
+        attrs = LANG_ATTRS[type(obj)] = frozenset(
+            get_attribute(obj, "__lang_attrs__", set()) or get_builtin_attrs(obj)
+        )
+        return attrs
 
 
-def evaluate_if_abstract(value: Any, scope: Scope) -> Any:
-    return (
-        value.evaluate(scope) if getattr(value, "__lang_abstract__", False) else value
-    )
+def get_type_attrs(cls: type[Any]) -> Optional[frozenset[str]]:
+    # None unless the type declares __lang_attrs__, builtins are checked on values
+    try:
+        return LANG_ATTRS[cls]
+    except KeyError:
+        names = getattr(cls, "__lang_attrs__", None)
+        if not names:
+            return None
+        attrs = LANG_ATTRS[cls] = frozenset(names)
+        return attrs
+
 
+def compile_value(value: Any, types: Types) -> Evaluator:
+    if getattr(value, "__lang_abstract__", False):
+        return value.compile(types)
+    return lambda scope: value
 
+
+def compile_expression(expression: Any, types: Optional[Types] = None) -> Evaluator:
+    if getattr(expression, "__lang_abstract__", False):
+        return expression.get_evaluator(types)
+    return lambda scope: expression
+
+
+# parsed expressions are never mutated so the same tree (and its compiled
+# evaluator) can be shared by every caller parsing the same text, use
+# parse_expression.cache_info() for hit/miss counts
+@functools.lru_cache(maxsize=4096)
 def parse_expression(text: str) -> Expression:
     # the tree_class option is not properly implemented with a TypeVar
     return EXPRESSION_PARSER.parse(text, "expr")  # type: ignore
@@ -125,53 +166,118 @@ class Operator(Enum):
         elif self is Operator.neg:
             return -left()
 
+    def compile(self, left: Evaluator, right: Evaluator) -> Evaluator:
+        # and/or are kept as closures so they still short circuit
+        if self is Operator.or_:
+            return lambda scope: left(scope) or right(scope)
+        elif self is Operator.and_:
+            return lambda scope: left(scope) and right(scope)
+        function = BINARY_OPERATORS[self]
+        return lambda scope: function(left(scope), right(scope))
+
 
-class Member:
+class Node(abc.ABC):
     __lang_abstract__: Final = True
+    # compiled once for each set of known scope types
+    evaluators: Optional[dict[Any, Evaluator]] = None
 
+    @abc.abstractmethod
+    def compile(self, types: Types) -> Evaluator:
+        ...
+
+    def get_evaluator(self, types: Optional[Types] = None) -> Evaluator:
+        key = frozenset(types.items()) if types else None
+        if self.evaluators is None:
+            self.evaluators = {}
+        try:
+            return self.evaluators[key]
+        except KeyError:
+            evaluator = self.evaluators[key] = self.compile(types or {})
+            return evaluator
+
+    def evaluate(self, scope: Scope, types: Optional[Types] = None) -> Any:
+        return self.get_evaluator(types)(scope)
+
+
+class Member(Node):
     def __init__(self, *path: Any) -> None:
         self.path: list[Any] = list(path)
 
     def get(self) -> Any:
         ...
 
-    def evaluate(self, scope: Scope) -> Any:  # noqa: C901
+    def compile(self, types: Types) -> Evaluator:
         path_root = self.path[0]
+        # only the type of a scope name is known, not the type of what it leads to
+        cls: Optional[type[Any]] = None
         if getattr(path_root, "__lang_abstract__", False):
-            obj = path_root.evaluate(scope)
+            evaluator = path_root.compile(types)
         else:
-            obj = scope[path_root]
+            evaluator = operator.itemgetter(path_root)
+            cls = types.get(path_root)
         for name in self.path[1:]:
             if isinstance(name, str):
-                if name not in get_lang_attrs(obj):
-                    raise errors.InvalidAttributeError(
-                        f"{type(obj).__name__} has no attribute {name}"
-                    )
-                obj = get_attribute(obj, name)
+                evaluator = self.compile_attribute(evaluator, name, cls)
             elif isinstance(name, CSV):
-                if not callable(obj) or not get_attribute(
-                    obj, "__lang_callable__", True
-                ):
-                    raise errors.NotCallableError(
-                        f"{type(obj).__name__} is not callable"
-                    )
-                obj = obj(*name.evaluate(scope))
+                evaluator = self.compile_call(evaluator, name.compile(types))
             elif isinstance(name, Index):
-                if not get_attribute(obj, "__lang_indexable__", True):
-                    raise errors.NotCallableError(
-                        f"{type(obj).__name__} is not callable"
-                    )
-                try:
-                    obj = obj[name.evaluate(scope)]
-                except TypeError as e:
-                    raise errors.InvalidAttributeError(
-                        f"{type(obj).__name__} is not subscriptable"
-                    ) from e
-                except IndexError as e:
-                    raise errors.InvalidAttributeError(
-                        f"{type(obj).__name__} has no index {name.evaluate(scope)}"
-                    ) from e
-        return obj
+                evaluator = self.compile_index(evaluator, name.compile(types))
+            cls = None
+        return evaluator
+
+    @staticmethod
+    def compile_attribute(
+        evaluator: Evaluator, name: str, cls: Optional[type[Any]] = None
+    ) -> Evaluator:
+        attrs = None if cls is None else get_type_attrs(cls)
+        if attrs is not None:
+            # the type is known so the name is checked once instead of on every
+            # evaluation
+            if name not in attrs:
+                raise errors.InvalidAttributeError(
+                    f"{cls.__name__} has no attribute {name}"  # type: ignore
+                )
+            return lambda scope: get_attribute(evaluator(scope), name)
+
+        def evaluate(scope: Scope) -> Any:
+            obj = evaluator(scope)
+            if name not in get_lang_attrs(obj):
+                raise errors.InvalidAttributeError(
+                    f"{type(obj).__name__} has no attribute {name}"
+                )
+            return get_attribute(obj, name)
+
+        return evaluate
+
+    @staticmethod
+    def compile_call(evaluator: Evaluator, args: Evaluator) -> Evaluator:
+        def evaluate(scope: Scope) -> Any:
+            obj = evaluator(scope)
+            if not callable(obj) or not get_attribute(obj, "__lang_callable__", True):
+                raise errors.NotCallableError(f"{type(obj).__name__} is not callable")
+            return obj(*args(scope))
+
+        return evaluate
+
+    @staticmethod
+    def compile_index(evaluator: Evaluator, index: Evaluator) -> Evaluator:
+        def evaluate(scope: Scope) -> Any:
+            obj = evaluator(scope)
+            if not get_attribute(obj, "__lang_indexable__", True):
+                raise errors.NotCallableError(f"{type(obj).__name__} is not callable")
+            key = index(scope)
+            try:
+                return obj[key]
+            except TypeError as e:
+                raise errors.InvalidAttributeError(
+                    f"{type(obj).__name__} is not subscriptable"
+                ) from e
+            except IndexError as e:
+                raise errors.InvalidAttributeError(
+                    f"{type(obj).__name__} has no index {key}"
+                ) from e
+
+        return evaluate
 
     def chain(self, item: Any) -> Member:
         self.path.append(item)
@@ -189,9 +295,7 @@ class Member:
         return string.strip(".")
 
 
-class Expression:
-    __lang_abstract__: Final = True
-
+class Expression(Node):
     def __init__(
         self, left: Any, operator: Operator, right: Any, expr: bool = False
     ) -> None:
@@ -208,10 +312,9 @@ class Expression:
             return operator.evaluate(lambda: left, lambda: right)
         return cls(left, operator, right, expr)
 
-    def evaluate(self, scope: Scope) -> Any:
-        return self.operator.evaluate(
-            lambda: evaluate_if_abstract(self.left, scope),
-            lambda: evaluate_if_abstract(self.right, scope),
+    def compile(self, types: Types) -> Evaluator:
+        return self.operator.compile(
+            compile_value(self.left, types), compile_value(self.right, types)
         )
 
     def __str__(self) -> str:
@@ -220,9 +323,7 @@ class Expression:
         return f"{to_string_value(self.left)} {self.operator.value} {to_string_value(self.right)}"
 
 
-class UnaryExpression:
-    __lang_abstract__: Final = True
-
+class UnaryExpression(Node):
     def __init__(self, operator: Operator, value: Any) -> None:
         self.operator: Operator = operator
         self.value: Any = value
@@ -235,8 +336,12 @@ class UnaryExpression:
             else operator.evaluate(lambda: value, lambda: None)
         )
 
-    def evaluate(self, scope: Scope) -> Any:
-        return self.operator.evaluate(lambda: self.value.evaluate(scope), lambda: None)
+    def compile(self, types: Types) -> Evaluator:
+        # neg shares its value with sub so it can't go through Operator.compile
+        value = compile_value(self.value, types)
+        if self.operator is Operator.not_:
+            return lambda scope: not value(scope)
+        return lambda scope: -value(scope)
 
     def __str__(self) -> str:
         if self.operator is Operator.neg:
@@ -244,48 +349,45 @@ class UnaryExpression:
         return f"{self.operator.value} {to_string_value(self.value)}"
 
 
-class CSV:
-    __lang_abstract__: Final = True
-
+class CSV(Node):
     def __init__(self, values: list[Any]) -> None:
         self.values: list[Any] = values
 
-    def evaluate(self, scope: Scope) -> Any:
-        return [evaluate_if_abstract(i, scope) for i in self.values]
+    def compile(self, types: Types) -> Evaluator:
+        values = [compile_value(i, types) for i in self.values]
+        return lambda scope: [i(scope) for i in values]
 
     def __str__(self) -> str:
         return ", ".join(map(to_string_value, self.values))
 
 
-class Index:
-    __lang_abstract__: Final = True
-
+class Index(Node):
     def __init__(self, values: list[Any]) -> None:
         self.values: list[Any] = values
 
-    def evaluate(self, scope: Scope) -> Any:
-        values = [evaluate_if_abstract(i, scope) for i in self.values]
+    def compile(self, types: Types) -> Evaluator:
+        values = [compile_value(i, types) for i in self.values]
         if len(values) == 1:
             return values[0]
-        return slice(*values)
+        return lambda scope: slice(*(i(scope) for i in values))
 
     def __str__(self) -> str:
         return ":".join(map(to_string_value, self.values))
 
 
-class Map:
-    __lang_abstract__: Final = True
-
+class Map(Node):
     def __init__(self, values: list[Any]) -> None:
         self.values: list[Any] = values
 
-    def evaluate(self, scope: Scope) -> Any:
-        return {
-            evaluate_if_abstract(self.values[i], scope): evaluate_if_abstract(
-                self.values[i + 1], scope
+    def compile(self, types: Types) -> Evaluator:
+        items = [
+            (
+                compile_value(self.values[i], types),
+                compile_value(self.values[i + 1], types),
             )
             for i in range(0, len(self.values), 2)
-        }
+        ]
+        return lambda scope: {key(scope): value(scope) for key, value in items}
 
     def __str__(self) -> str:
         return ", ".join(
@@ -294,53 +396,47 @@ class Map:
         )
 
 
-class Array:
-    __lang_abstract__: Final = True
-
+class Array(Node):
     def __init__(self, csv: CSV) -> None:
         self.csv: CSV = csv
 
-    def evaluate(self, scope: Scope) -> Any:
-        return self.csv.evaluate(scope)
+    def compile(self, types: Types) -> Evaluator:
+        return self.csv.compile(types)
 
     def __str__(self) -> str:
         return f"[{self.csv}]"
 
 
-class Object:
-    __lang_abstract__: Final = True
-
+class Object(Node):
     def __init__(self, map: Map) -> None:
         self.map: Map = map
 
-    def evaluate(self, scope: Scope) -> Any:
-        return self.map.evaluate(scope)
+    def compile(self, types: Types) -> Evaluator:
+        return self.map.compile(types)
 
     def __str__(self) -> str:
         return f"{{{self.map}}}"
 
 
-class Set:
-    __lang_abstract__: Final = True
-
+class Set(Node):
     def __init__(self, csv: CSV) -> None:
         self.csv: CSV = csv
 
-    def evaluate(self, scope: Scope) -> Any:
-        return set(self.csv.evaluate(scope))
+    def compile(self, types: Types) -> Evaluator:
+        csv = self.csv.compile(types)
+        return lambda scope: set(csv(scope))
 
     def __str__(self) -> str:
         return f"{{{self.csv}}}"
 
 
-class NotAbstractExpression:
-    __lang_abstract__: Final = True
-
+class NotAbstractExpression(Node):
     def __init__(self, expr: Any) -> None:
         self.expr: Any = expr
 
-    def evaluate(self, scope: Scope) -> Any:
-        return self.expr
+    def compile(self, types: Types) -> Evaluator:
+        expr = self.expr
+        return lambda scope: expr
 
 
 class LangTransformer:
@@ -546,6 +642,26 @@ OPTIONS = {
     "start": "expr",
     "maybe_placeholders": False,
 }
+BINARY_OPERATORS: dict[Operator, Callable[[Any, Any], Any]] = {
+    Operator.lt: operator.lt,
+    Operator.le: operator.le,
+    Operator.ge: operator.ge,
+    Operator.gt: operator.gt,
+    Operator.eq: operator.eq,
+    Operator.ne: operator.ne,
+    Operator.in_: lambda left, right: left in right,
+    Operator.not_in: lambda left, right: left not in right,
+    Operator.is_: operator.is_,
+    Operator.is_not: operator.is_not,
+    Operator.add: operator.add,
+    Operator.sub: operator.sub,
+    Operator.mul: operator.mul,
+    Operator.div: operator.truediv,
+    Operator.mod: operator.mod,
+    Operator.floor: operator.floordiv,
+    Operator.pow: operator.pow,
+}
+LANG_ATTRS: dict[type[Any], frozenset[str]] = {}
 # **options is Unknown
 EXPRESSION_PARSER = lark.Lark.open(**OPTIONS)  # type: ignore
 # **options is Unknown
@@ -1,20 +1,103 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
+import datetime
+import math
+import time
 from typing import TYPE_CHECKING
 
-from . import db, enums, models
+import numpy
+
+from . import db, enums, env, intern, models
+from .columns import Columns, group_sum
+from .compact import CompactTable
 
 __all__ = ("cache",)
 
 if TYPE_CHECKING:
-    from typing import Any, Optional
+    from collections.abc import Iterable, MutableMapping, ValuesView
+    from typing import Any, Awaitable, Callable, Optional
+
+    from . import fixed
+
+
+class Retention:
+    # how much of a history table is kept in memory, rows older than window or
+    # older than the newest max_count rows are evicted by Cache.sweep and read
+    # from the database by Cache.fetch_history
+    __slots__ = (
+        "window",
+        "max_count",
+        "horizon",
+        "sweeps",
+        "evicted",
+        "last_evicted",
+        "last_sweep",
+        "read_throughs",
+    )
+
+    def __init__(
+        self,
+        window: Optional[datetime.timedelta] = None,
+        max_count: Optional[int] = None,
+    ) -> None:
+        self.window: Optional[datetime.timedelta] = window
+        self.max_count: Optional[int] = max_count
+        # every row dated at or after this is in memory, None until rows are evicted
+        self.horizon: Optional[datetime.datetime] = None
+        self.sweeps: int = 0
+        self.evicted: int = 0
+        self.last_evicted: int = 0
+        self.last_sweep: float = 0.0
+        self.read_throughs: int = 0
+
+    def __bool__(self) -> bool:
+        return self.window is not None or self.max_count is not None
+
+    def expired(
+        self, table: MutableMapping[int, Any], now: datetime.datetime
+    ) -> list[int]:
+        # ids increase with the date in history tables so the rows past max_count
+        # are the ones with the lowest ids
+        ids: set[int] = set()
+        if self.window is not None:
+            cutoff = now - self.window
+            if isinstance(table, CompactTable):
+                ids.update(table.before("date", cutoff))
+            else:
+                ids.update(i.id for i in table.values() if i.date < cutoff)
+            self.advance(cutoff)
+        if self.max_count is not None and len(table) - len(ids) > self.max_count:
+            keys = numpy.fromiter((i for i in table if i not in ids), dtype=numpy.int64)
+            count = len(keys) - self.max_count
+            oldest = numpy.partition(keys, count - 1)[:count]
+            self.advance(table[int(oldest.max())].date + datetime.timedelta.resolution)
+            ids.update(oldest.tolist())
+        return list(ids)
+
+    def advance(self, horizon: datetime.datetime) -> None:
+        if self.horizon is None or horizon > self.horizon:
+            self.horizon = horizon
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "window": self.window,
+            "max_count": self.max_count,
+            "horizon": self.horizon,
+            "sweeps": self.sweeps,
+            "evicted": self.evicted,
+            "last_evicted": self.last_evicted,
+            "last_sweep": self.last_sweep,
+            "read_throughs": self.read_throughs,
+        }
 
 
 class Cache:
     __slots__ = (
         "_accounts",
         "_alliances",
+        "_alliances_by_score",
         "_alliance_auto_roles",
         "_alliance_settings",
         "_alliances_private",
@@ -29,7 +112,9 @@ class Cache:
         "_bounties",
         "_builds",
         "_cities",
+        "_cities_by_nation",
         "_city_auto_roles",
+        "_city_columns",
         "_colors",
         "_conditional_auto_roles",
         "_conditions",
@@ -48,6 +133,9 @@ class Cache:
         "_menu_items",
         "_menus",
         "_nations",
+        "_nations_by_alliance",
+        "_nations_by_score",
+        "_nation_columns",
         "_nations_private",
         "_reminders",
         "_roles",
@@ -65,17 +153,30 @@ class Cache:
         "_trades",
         "_transactions",
         "_treasures",
+        "_treasures_by_nation",
         "_treaties",
         "_users",
         "_war_attacks",
         "_war_room_configs",
         "_war_rooms",
         "_wars",
+        "_wars_by_nation",
+        "_ready",
+        "_removed",
+        "_retention",
+        "_fetching",
+        "_missing",
+        "_api",
+        "_fetch_stats",
     )
 
-    def __init__(self) -> None:
+    def __init__(
+        self, compact: bool = False, retention: Optional[dict[str, Retention]] = None
+    ) -> None:
         self._accounts: dict[int, models.Account] = {}
         self._alliances: dict[int, models.Alliance] = {}
+        # scores are negated so the highest score comes first
+        self._alliances_by_score: list[tuple[fixed.Fixed, int]] = []
         self._alliance_auto_roles: dict[int, models.AllianceAutoRole] = {}
         self._alliance_settings: dict[int, models.AllianceSettings] = {}
         self._alliances_private: dict[int, models.AlliancePrivate] = {}
@@ -84,13 +185,15 @@ class Cache:
         self._audit_log_configs: dict[int, models.AuditLogConfig] = {}
         self._audit_logs: dict[int, models.AuditLog] = {}
         self._audit_runs: dict[int, models.AuditRun] = {}
-        self._bankrecs: dict[int, models.Bankrec] = {}
+        self._bankrecs: MutableMapping[int, models.Bankrec] = {}
         self._blitzes: dict[int, models.Blitz] = {}
         self._blitz_targets: dict[int, models.BlitzTarget] = {}
         self._bounties: dict[int, models.Bounty] = {}
         self._builds: dict[int, models.Build] = {}
-        self._cities: dict[int, models.City] = {}
+        self._cities: MutableMapping[int, models.City] = {}
+        self._cities_by_nation: dict[int, set[int]] = {}
         self._city_auto_roles: dict[int, models.CityAutoRole] = {}
+        self._city_columns: Columns = Columns(models.City.COLUMNS)
         self._colors: dict[enums.Color, models.Color] = {}
         self._conditional_auto_roles: dict[int, models.ConditionalAutoRole] = {}
         self._conditions: dict[int, models.Condition] = {}
@@ -109,6 +212,11 @@ class Cache:
         self._menu_items: dict[int, models.MenuItem] = {}
         self._menus: dict[int, models.Menu] = {}
         self._nations: dict[int, models.Nation] = {}
+        self._nations_by_alliance: dict[int, set[int]] = {}
+        self._nations_by_score: list[tuple[fixed.Fixed, int]] = []
+        self._nation_columns: Columns = Columns(
+            models.Nation.COLUMNS | {"alliance_position": "int8"}
+        )
         self._nations_private: dict[int, models.NationPrivate] = {}
         # self._radiation: models.Radiation
         self._reminders: dict[int, models.Reminder] = {}
@@ -124,15 +232,39 @@ class Cache:
         self._tax_brackets: dict[int, models.TaxBracket] = {}
         self._ticket_configs: dict[int, models.TicketConfig] = {}
         self._tickets: dict[int, models.Ticket] = {}
-        self._trades: dict[int, models.Trade] = {}
+        self._trades: MutableMapping[int, models.Trade] = {}
         self._transactions: dict[int, models.Transaction] = {}
         self._treasures: dict[str, models.Treasure] = {}
+        self._treasures_by_nation: dict[int, set[str]] = {}
         self._treaties: dict[int, models.Treaty] = {}
         self._users: dict[int, models.User] = {}
-        self._war_attacks: dict[int, models.WarAttack] = {}
+        self._war_attacks: MutableMapping[int, models.WarAttack] = {}
         self._war_room_configs: dict[int, models.WarRoomConfig] = {}
         self._war_rooms: dict[int, models.WarRoom] = {}
-        self._wars: dict[int, models.War] = {}
+        self._wars: MutableMapping[int, models.War] = {}
+        self._wars_by_nation: dict[int, set[int]] = {}
+        # the big pnw tables keep their rows in typed columns instead of models,
+        # see CompactTable
+        if compact:
+            for i in COMPACT_MODELS:
+                setattr(self, f"_{i.TABLE}", CompactTable(i))
+        # set once a history table has been loaded by load_history
+        self._ready: dict[str, asyncio.Event] = {
+            i.TABLE: asyncio.Event() for i in HISTORY_MODELS
+        }
+        # ids removed from a history table while it's loading, see discard_history
+        self._removed: dict[str, set[int]] = {}
+        # history tables without a policy keep every row
+        self._retention: dict[str, Retention] = (
+            {} if retention is None else {i: j for i, j in retention.items() if j}
+        )
+        # (table, id, api) -> the lookup in progress, see fetch
+        self._fetching: dict[tuple[str, int, bool], asyncio.Future[Any]] = {}
+        # (table, id, api) -> when the row stops being remembered as missing
+        self._missing: dict[tuple[str, int, bool], float] = {}
+        # table -> looks a row up in the pnw api, set by register_api
+        self._api: dict[str, Callable[[int], Awaitable[Optional[Any]]]] = {}
+        self._fetch_stats: dict[str, dict[str, int]] = {}
 
     async def initialize(self) -> None:
         models_ = [
@@ -144,9 +276,7 @@ class Cache:
             models.AuditCheck,
             models.AuditConfig,
             models.AuditLogConfig,
-            models.AuditLog,
             models.AuditRun,
-            models.Bankrec,
             models.Blitz,
             models.BlitzTarget,
             models.Bounty,
@@ -185,39 +315,277 @@ class Cache:
             models.TaxBracket,
             models.TicketConfig,
             models.Ticket,
-            models.Trade,
             models.Transaction,
             models.Treasure,
             models.Treaty,
             models.User,
-            models.WarAttack,
             models.WarRoomConfig,
             models.WarRoom,
             models.War,
         ]
-        data: list[Any] = []
         for i in range(0, len(models_), 10):
-            data.extend(
-                await asyncio.gather(
-                    *(
-                        db.query(f"SELECT * FROM {i.TABLE};")  # nosec
-                        for i in models_[i : i + 10]
-                    )
-                )
-            )
-        for i, result in zip(models_, data):
-            attr = getattr(self, f"_{i.TABLE}")
-            for row in result:
-                # too lazy to properly type this
-                model = i.from_dict(row)
-                attr[model.key if hasattr(i, "key") else model.id] = model  # type: ignore
+            await asyncio.gather(*(self.load_table(i) for i in models_[i : i + 10]))
         for i in self.users:
             if i.nation_id is not None:
                 self._users[i.nation_id] = i
+        self._alliances_by_score.extend((-i.score, i.id) for i in self.alliances_view)
+        self._alliances_by_score.sort()
+        for i in self._cities.values():
+            index_add(self._cities_by_nation, i.nation_id, i.id)
+        for i in self._nations.values():
+            index_add(self._nations_by_alliance, i.alliance_id, i.id)
+            self._nations_by_score.append((i.score, i.id))
+        self._nations_by_score.sort()
+        self._city_columns.load(list(self._cities.values()))
+        self._nation_columns.load(list(self._nations.values()))
+        for i in self._treasures.values():
+            index_add(self._treasures_by_nation, i.nation_id, i.name)
+        for i in self._wars.values():
+            index_add(self._wars_by_nation, i.attacker_id, i.id)
+            index_add(self._wars_by_nation, i.defender_id, i.id)
+
+    async def load_table(self, model: Any, /) -> None:
+        attr = getattr(self, f"_{model.TABLE}")
+        key = hasattr(model, "key")
+        async for chunk in db.load(model):
+            for i in chunk:
+                attr[i.key if key else i.id] = i
+
+    async def load_history(self, chunk_size: int = 10000) -> None:
+        # history tables are loaded after startup in keyset paginated chunks so
+        # they don't hold up the core tables, rows added by subscriptions while
+        # a table is loading take precedence over the stored rows
+        try:
+            for model in HISTORY_MODELS:
+                attr = getattr(self, f"_{model.TABLE}")
+                removed = self._removed.setdefault(model.TABLE, set())
+                after = await self.retained_after(model)
+                async for chunk in db.load(
+                    model, chunk_size=chunk_size, keyset=True, after=after
+                ):
+                    for i in chunk:
+                        if i.id not in removed:
+                            attr.setdefault(i.id, i)
+                self._ready[model.TABLE].set()
+                del self._removed[model.TABLE]
+        finally:
+            # a failed load still marks the tables as ready so waiters and sweep
+            # aren't held up forever, the error is reported by the task
+            for i in self._ready.values():
+                i.set()
+            self._removed.clear()
+
+    def discard_history(self, name: str, id: int, /) -> None:
+        # rows removed while their table is loading are remembered so load_history
+        # doesn't add them back from a chunk fetched before the removal
+        getattr(self, f"_{name}").pop(id, None)
+        if not self.is_ready(name):
+            self._removed.setdefault(name, set()).add(id)
+
+    async def retained_after(self, model: Any, /) -> int:
+        # the id load_history starts after so only rows within the retention
+        # policy are loaded
+        retention = self._retention.get(model.TABLE)
+        after = -(2**63)
+        if retention is None:
+            return after
+        if retention.window is not None:
+            cutoff = datetime.datetime.now(datetime.timezone.utc) - retention.window
+            rows = await db.query(
+                f"SELECT MIN(id) FROM {model.TABLE} WHERE date >= $1;",  # nosec
+                cutoff,
+                name=f"{model.TABLE}.retained_after",
+            )
+            retention.advance(cutoff)
+            if rows[0][0] is not None:
+                after = max(after, rows[0][0] - 1)
+        if retention.max_count is not None:
+            rows = await db.query(
+                f"SELECT id, date FROM {model.TABLE} "  # nosec
+                "ORDER BY id DESC OFFSET $1 LIMIT 1;",
+                retention.max_count,
+                name=f"{model.TABLE}.retained_after",
+            )
+            if rows:
+                retention.advance(rows[0]["date"] + datetime.timedelta.resolution)
+                after = max(after, rows[0]["id"])
+        return after
+
+    def sweep(self, now: Optional[datetime.datetime] = None) -> dict[str, int]:
+        # evicts the rows of loaded history tables outside of their retention
+        # policy, returns how many rows were evicted from each table
+        if now is None:
+            now = datetime.datetime.now(datetime.timezone.utc)
+        evicted: dict[str, int] = {}
+        for name, retention in self._retention.items():
+            if not self.is_ready(name):
+                continue
+            start = time.perf_counter()
+            table = getattr(self, f"_{name}")
+            ids = retention.expired(table, now)
+            if isinstance(table, CompactTable):
+                table.remove_many(ids)
+            else:
+                for i in ids:
+                    table.pop(i, None)
+            retention.sweeps += 1
+            retention.evicted += len(ids)
+            retention.last_evicted = len(ids)
+            retention.last_sweep = time.perf_counter() - start
+            evicted[name] = len(ids)
+        clock = time.monotonic()
+        for key in [i for i, j in self._missing.items() if j <= clock]:
+            del self._missing[key]
+        return evicted
+
+    async def fetch_history(
+        self,
+        model: Any,
+        start: datetime.datetime,
+        end: Optional[datetime.datetime] = None,
+        /,
+    ) -> list[Any]:
+        # rows of a history table dated from start up to end ordered by id, ranges
+        # that go back further than the rows kept in memory are read from the
+        # database
+        name = model.TABLE
+        retention = self._retention.get(name)
+        horizon = None if retention is None else retention.horizon
+        if self.is_ready(name) and (horizon is None or start >= horizon):
+            return sorted(
+                (
+                    i
+                    for i in getattr(self, f"_{name}").values()
+                    if start <= i.date and (end is None or i.date < end)
+                ),
+                key=lambda x: x.id,
+            )
+        if retention is not None:
+            retention.read_throughs += 1
+        fields = ", ".join(f'"{i}"' for i in model.FIELDS)
+        if end is None:
+            rows = await db.query(
+                f"SELECT {fields} FROM {name} WHERE date >= $1 ORDER BY id;",  # nosec
+                start,
+                name=f"{name}.fetch_history",
+            )
+        else:
+            rows = await db.query(
+                f"SELECT {fields} FROM {name} "  # nosec
+                "WHERE date >= $1 AND date < $2 ORDER BY id;",
+                start,
+                end,
+                name=f"{name}.fetch_history",
+            )
+        return [model.from_row(i) for i in rows]
+
+    def register_api(
+        self, table: str, fetcher: Callable[[int], Awaitable[Optional[Any]]], /
+    ) -> None:
+        self._api[table] = fetcher
+
+    async def fetch(
+        self,
+        model: Any,
+        id: int,
+        adder: Callable[[Any], None],
+        /,
+        *,
+        api: bool = False,
+    ) -> Optional[Any]:
+        # get_* that falls back to the database and then to the pnw api, concurrent
+        # misses for the same row share one lookup and rows that weren't found are
+        # remembered as missing for MISSING_TTL seconds
+        name = model.TABLE
+        stats = self._fetch_stats.setdefault(name, dict.fromkeys(FETCH_STATS, 0))
+        value = getattr(self, f"_{name}").get(id)
+        if value is not None:
+            stats["memory"] += 1
+            return value
+        key = (name, id, api)
+        expires = self._missing.get(key)
+        if expires is not None:
+            if expires > time.monotonic():
+                stats["negative"] += 1
+                return None
+            del self._missing[key]
+        future = self._fetching.get(key)
+        if future is None:
+            future = self._fetching[key] = asyncio.ensure_future(
+                self.load_row(model, id, adder, api)
+            )
+            future.add_done_callback(lambda _: self._fetching.pop(key, None))
+        else:
+            stats["coalesced"] += 1
+        # one caller being cancelled doesn't cancel the lookup for the others
+        return await asyncio.shield(future)
+
+    async def load_row(
+        self, model: Any, id: int, adder: Callable[[Any], None], api: bool, /
+    ) -> Optional[Any]:
+        name = model.TABLE
+        stats = self._fetch_stats[name]
+        rows = await db.execute(f"{name}.select", id)
+        stats["database"] += 1
+        value = model.from_row(rows[0]) if rows else None
+        fetcher = self._api.get(name)
+        if value is None and api and fetcher is not None:
+            value = await fetcher(id)
+            stats["api"] += 1
+        if value is None:
+            stats["missing"] += 1
+            self._missing[(name, id, api)] = time.monotonic() + MISSING_TTL
+            return None
+        # a subscription may have added the row while it was being looked up
+        existing = getattr(self, f"_{name}").get(id)
+        if existing is not None:
+            return existing
+        # history rows the retention policy already evicted would only be swept
+        # again, so they're returned without being kept
+        retention = self._retention.get(name)
+        if (
+            retention is not None
+            and retention.horizon is not None
+            and value.date < retention.horizon
+        ):
+            return value
+        adder(value)
+        return value
+
+    def fetch_stats(self) -> dict[str, dict[str, int]]:
+        return {
+            name: {**i, "in_flight": sum(j[0] == name for j in self._fetching)}
+            for name, i in self._fetch_stats.items()
+        }
+
+    def retention_stats(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {**i.to_dict(), "rows": len(getattr(self, f"_{name}"))}
+            for name, i in self._retention.items()
+        }
+
+    def is_ready(self, table: str, /) -> bool:
+        return table not in self._ready or self._ready[table].is_set()
+
+    async def wait_until_ready(self, table: str, /) -> None:
+        if table in self._ready:
+            await self._ready[table].wait()
+
+    def interned_bytes(self) -> dict[str, int]:
+        # bytes each table saves by sharing equal strings, see intern.string
+        return {
+            i.TABLE: intern.bytes_saved(
+                getattr(self, f"_{i.TABLE}").values(), intern.interned_fields(i)
+            )
+            for i in INTERNED_MODELS
+        }
 
     def clear(self) -> None:
+        for i in self._ready.values():
+            i.clear()
         self._accounts.clear()
         self._alliances.clear()
+        self._alliances_by_score.clear()
         self._alliance_auto_roles.clear()
         self._alliance_settings.clear()
         self._alliances_private.clear()
@@ -232,7 +600,9 @@ class Cache:
         self._bounties.clear()
         self._builds.clear()
         self._cities.clear()
+        self._cities_by_nation.clear()
         self._city_auto_roles.clear()
+        self._city_columns.clear()
         self._colors.clear()
         self._conditional_auto_roles.clear()
         self._conditions.clear()
@@ -251,6 +621,9 @@ class Cache:
         self._menu_items.clear()
         self._menus.clear()
         self._nations.clear()
+        self._nations_by_alliance.clear()
+        self._nations_by_score.clear()
+        self._nation_columns.clear()
         self._nations_private.clear()
         # self._radiation.clear()
         self._reminders.clear()
@@ -269,17 +642,23 @@ class Cache:
         self._trades.clear()
         self._transactions.clear()
         self._treasures.clear()
+        self._treasures_by_nation.clear()
         self._treaties.clear()
         self._users.clear()
         self._war_attacks.clear()
         self._war_room_configs.clear()
         self._war_rooms.clear()
         self._wars.clear()
+        self._wars_by_nation.clear()
 
     @property
     def accounts(self) -> set[models.Account]:
         return set(self._accounts.values())
 
+    @property
+    def accounts_view(self) -> ValuesView[models.Account]:
+        return self._accounts.values()
+
     def add_account(self, account: models.Account, /) -> None:
         self._accounts[account.id] = account
 
@@ -293,19 +672,50 @@ class Cache:
     def alliances(self) -> set[models.Alliance]:
         return set(self._alliances.values())
 
+    @property
+    def alliances_view(self) -> ValuesView[models.Alliance]:
+        return self._alliances.values()
+
     def add_alliance(self, alliance: models.Alliance, /) -> None:
+        if (existing := self._alliances.get(alliance.id)) is not None:
+            sorted_discard(self._alliances_by_score, (-existing.score, existing.id))
         self._alliances[alliance.id] = alliance
+        sorted_add(self._alliances_by_score, (-alliance.score, alliance.id))
 
     def get_alliance(self, id: int, /) -> Optional[models.Alliance]:
         return self._alliances.get(id)
 
+    async def fetch_alliance(
+        self, id: int, /, *, api: bool = False
+    ) -> Optional[models.Alliance]:
+        return await self.fetch(models.Alliance, id, self.add_alliance, api=api)
+
+    def get_alliance_rank(self, alliance: models.Alliance, /) -> int:
+        return (
+            bisect.bisect_left(self._alliances_by_score, (-alliance.score, alliance.id))
+            + 1
+        )
+
+    def get_top_alliances(self, count: int, /) -> list[models.Alliance]:
+        return [self._alliances[i] for _, i in self._alliances_by_score[:count]]
+
+    def update_alliance(self, old: models.Alliance, new: models.Alliance, /) -> None:
+        if old.score != new.score:
+            sorted_discard(self._alliances_by_score, (-old.score, old.id))
+            sorted_add(self._alliances_by_score, (-new.score, new.id))
+
     def remove_alliance(self, account: models.Alliance, /) -> None:
-        del self._alliances[account.id]
+        alliance = self._alliances.pop(account.id)
+        sorted_discard(self._alliances_by_score, (-alliance.score, alliance.id))
 
     @property
     def alliance_auto_roles(self) -> set[models.AllianceAutoRole]:
         return set(self._alliance_auto_roles.values())
 
+    @property
+    def alliance_auto_roles_view(self) -> ValuesView[models.AllianceAutoRole]:
+        return self._alliance_auto_roles.values()
+
     def add_alliance_auto_role(
         self, alliance_auto_role: models.AllianceAutoRole, /
     ) -> None:
@@ -323,6 +733,10 @@ class Cache:
     def alliance_settings(self) -> set[models.AllianceSettings]:
         return set(self._alliance_settings.values())
 
+    @property
+    def alliance_settings_view(self) -> ValuesView[models.AllianceSettings]:
+        return self._alliance_settings.values()
+
     def add_alliance_setting(
         self, alliance_setting: models.AllianceSettings, /
     ) -> None:
@@ -342,6 +756,10 @@ class Cache:
     def alliances_private(self) -> set[models.AlliancePrivate]:
         return set(self._alliances_private.values())
 
+    @property
+    def alliances_private_view(self) -> ValuesView[models.AlliancePrivate]:
+        return self._alliances_private.values()
+
     def add_alliance_private(self, alliance_private: models.AlliancePrivate, /) -> None:
         self._alliances_private[alliance_private.id] = alliance_private
 
@@ -357,6 +775,10 @@ class Cache:
     def audit_checks(self) -> set[models.AuditCheck]:
         return set(self._audit_checks.values())
 
+    @property
+    def audit_checks_view(self) -> ValuesView[models.AuditCheck]:
+        return self._audit_checks.values()
+
     def add_audit_check(self, audit_check: models.AuditCheck, /) -> None:
         self._audit_checks[audit_check.id] = audit_check
 
@@ -370,6 +792,10 @@ class Cache:
     def audit_configs(self) -> set[models.AuditConfig]:
         return set(self._audit_configs.values())
 
+    @property
+    def audit_configs_view(self) -> ValuesView[models.AuditConfig]:
+        return self._audit_configs.values()
+
     def add_audit_config(self, audit_config: models.AuditConfig, /) -> None:
         self._audit_configs[audit_config.id] = audit_config
 
@@ -383,6 +809,10 @@ class Cache:
     def audit_log_configs(self) -> set[models.AuditLogConfig]:
         return set(self._audit_log_configs.values())
 
+    @property
+    def audit_log_configs_view(self) -> ValuesView[models.AuditLogConfig]:
+        return self._audit_log_configs.values()
+
     def add_audit_log_config(self, audit_log_config: models.AuditLogConfig, /) -> None:
         self._audit_log_configs[audit_log_config.id] = audit_log_config
 
@@ -398,6 +828,10 @@ class Cache:
     def audit_logs(self) -> set[models.AuditLog]:
         return set(self._audit_logs.values())
 
+    @property
+    def audit_logs_view(self) -> ValuesView[models.AuditLog]:
+        return self._audit_logs.values()
+
     def add_audit_log(self, audit_log: models.AuditLog, /) -> None:
         self._audit_logs[audit_log.id] = audit_log
 
@@ -405,12 +839,17 @@ class Cache:
         return self._audit_logs.get(id)
 
     def remove_audit_log(self, audit_log: models.AuditLog, /) -> None:
-        del self._audit_logs[audit_log.id]
+        # may not be loaded yet, see load_history
+        self.discard_history("audit_logs", audit_log.id)
 
     @property
     def audit_runs(self) -> set[models.AuditRun]:
         return set(self._audit_runs.values())
 
+    @property
+    def audit_runs_view(self) -> ValuesView[models.AuditRun]:
+        return self._audit_runs.values()
+
     def add_audit_run(self, audit_run: models.AuditRun, /) -> None:
         self._audit_runs[audit_run.id] = audit_run
 
@@ -424,19 +863,33 @@ class Cache:
     def bankrecs(self) -> set[models.Bankrec]:
         return set(self._bankrecs.values())
 
+    @property
+    def bankrecs_view(self) -> ValuesView[models.Bankrec]:
+        return self._bankrecs.values()
+
     def add_bankrec(self, bankrec: models.Bankrec, /) -> None:
         self._bankrecs[bankrec.id] = bankrec
 
     def get_bankrec(self, id: int, /) -> Optional[models.Bankrec]:
         return self._bankrecs.get(id)
 
+    async def fetch_bankrec(
+        self, id: int, /, *, api: bool = False
+    ) -> Optional[models.Bankrec]:
+        return await self.fetch(models.Bankrec, id, self.add_bankrec, api=api)
+
     def remove_bankrec(self, bankrec: models.Bankrec, /) -> None:
-        del self._bankrecs[bankrec.id]
+        # may not be loaded yet, see load_history
+        self.discard_history("bankrecs", bankrec.id)
 
     @property
     def blitzes(self) -> set[models.Blitz]:
         return set(self._blitzes.values())
 
+    @property
+    def blitzes_view(self) -> ValuesView[models.Blitz]:
+        return self._blitzes.values()
+
     def add_blitz(self, blitz: models.Blitz, /) -> None:
         self._blitzes[blitz.id] = blitz
 
@@ -450,6 +903,10 @@ class Cache:
     def blitz_targets(self) -> set[models.BlitzTarget]:
         return set(self._blitz_targets.values())
 
+    @property
+    def blitz_targets_view(self) -> ValuesView[models.BlitzTarget]:
+        return self._blitz_targets.values()
+
     def add_blitz_target(self, blitz_target: models.BlitzTarget, /) -> None:
         self._blitz_targets[blitz_target.id] = blitz_target
 
@@ -463,6 +920,10 @@ class Cache:
     def bounties(self) -> set[models.Bounty]:
         return set(self._bounties.values())
 
+    @property
+    def bounties_view(self) -> ValuesView[models.Bounty]:
+        return self._bounties.values()
+
     def add_bounty(self, bounty: models.Bounty, /) -> None:
         self._bounties[bounty.id] = bounty
 
@@ -476,6 +937,10 @@ class Cache:
     def builds(self) -> set[models.Build]:
         return set(self._builds.values())
 
+    @property
+    def builds_view(self) -> ValuesView[models.Build]:
+        return self._builds.values()
+
     def add_build(self, build: models.Build, /) -> None:
         self._builds[build.id] = build
 
@@ -489,19 +954,51 @@ class Cache:
     def cities(self) -> set[models.City]:
         return set(self._cities.values())
 
+    @property
+    def cities_view(self) -> ValuesView[models.City]:
+        return self._cities.values()
+
     def add_city(self, city: models.City, /) -> None:
+        if (existing := self._cities.get(city.id)) is not None:
+            index_discard(self._cities_by_nation, existing.nation_id, existing.id)
         self._cities[city.id] = city
+        index_add(self._cities_by_nation, city.nation_id, city.id)
+        self._city_columns.set(city)
 
     def get_city(self, id: int, /) -> Optional[models.City]:
         return self._cities.get(id)
 
+    async def fetch_city(
+        self, id: int, /, *, api: bool = False
+    ) -> Optional[models.City]:
+        return await self.fetch(models.City, id, self.add_city, api=api)
+
+    @property
+    def city_columns(self) -> Columns:
+        return self._city_columns
+
+    def get_cities_by_nation(self, nation_id: int, /) -> set[models.City]:
+        return {self._cities[i] for i in self._cities_by_nation.get(nation_id, ())}
+
+    def update_city(self, old: models.City, new: models.City, /) -> None:
+        if old.nation_id != new.nation_id:
+            index_discard(self._cities_by_nation, old.nation_id, old.id)
+            index_add(self._cities_by_nation, new.nation_id, new.id)
+        self._city_columns.set(new)
+
     def remove_city(self, city: models.City, /) -> None:
-        del self._cities[city.id]
+        city = self._cities.pop(city.id)
+        index_discard(self._cities_by_nation, city.nation_id, city.id)
+        self._city_columns.remove(city.id)
 
     @property
     def city_auto_roles(self) -> set[models.CityAutoRole]:
         return set(self._city_auto_roles.values())
 
+    @property
+    def city_auto_roles_view(self) -> ValuesView[models.CityAutoRole]:
+        return self._city_auto_roles.values()
+
     def add_city_auto_role(self, city_auto_role: models.CityAutoRole, /) -> None:
         self._city_auto_roles[city_auto_role.id] = city_auto_role
 
@@ -515,6 +1012,10 @@ class Cache:
     def colors(self) -> set[models.Color]:
         return set(self._colors.values())
 
+    @property
+    def colors_view(self) -> ValuesView[models.Color]:
+        return self._colors.values()
+
     def add_color(self, color: models.Color, /) -> None:
         self._colors[color.color] = color
 
@@ -528,6 +1029,10 @@ class Cache:
     def conditional_auto_roles(self) -> set[models.ConditionalAutoRole]:
         return set(self._conditional_auto_roles.values())
 
+    @property
+    def conditional_auto_roles_view(self) -> ValuesView[models.ConditionalAutoRole]:
+        return self._conditional_auto_roles.values()
+
     def add_conditional_auto_role(
         self, conditional_auto_role: models.ConditionalAutoRole, /
     ) -> None:
@@ -547,6 +1052,10 @@ class Cache:
     def conditions(self) -> set[models.Condition]:
         return set(self._conditions.values())
 
+    @property
+    def conditions_view(self) -> ValuesView[models.Condition]:
+        return self._conditions.values()
+
     def add_condition(self, condition: models.Condition, /) -> None:
         self._conditions[condition.id] = condition
 
@@ -560,6 +1069,10 @@ class Cache:
     def embassy_configs(self) -> set[models.EmbassyConfig]:
         return set(self._embassy_configs.values())
 
+    @property
+    def embassy_configs_view(self) -> ValuesView[models.EmbassyConfig]:
+        return self._embassy_configs.values()
+
     def add_embassy_config(self, embassy_config: models.EmbassyConfig, /) -> None:
         self._embassy_configs[embassy_config.id] = embassy_config
 
@@ -573,6 +1086,10 @@ class Cache:
     def embassies(self) -> set[models.Embassy]:
         return set(self._embassies.values())
 
+    @property
+    def embassies_view(self) -> ValuesView[models.Embassy]:
+        return self._embassies.values()
+
     def add_embassy(self, embassy: models.Embassy, /) -> None:
         self._embassies[embassy.id] = embassy
 
@@ -586,6 +1103,10 @@ class Cache:
     def grants(self) -> set[models.Grant]:
         return set(self._grants.values())
 
+    @property
+    def grants_view(self) -> ValuesView[models.Grant]:
+        return self._grants.values()
+
     def add_grant(self, grant: models.Grant, /) -> None:
         self._grants[grant.id] = grant
 
@@ -599,6 +1120,10 @@ class Cache:
     def guild_roles(self) -> set[models.GuildRole]:
         return set(self._guild_roles.values())
 
+    @property
+    def guild_roles_view(self) -> ValuesView[models.GuildRole]:
+        return self._guild_roles.values()
+
     def add_guild_role(self, guild_role: models.GuildRole, /) -> None:
         self._guild_roles[guild_role.id] = guild_role
 
@@ -612,6 +1137,10 @@ class Cache:
     def guild_settings(self) -> set[models.GuildSettings]:
         return set(self._guild_settings.values())
 
+    @property
+    def guild_settings_view(self) -> ValuesView[models.GuildSettings]:
+        return self._guild_settings.values()
+
     def add_guild_settings(self, guild_settings: models.GuildSettings, /) -> None:
         self._guild_settings[guild_settings.guild_id] = guild_settings
 
@@ -625,6 +1154,10 @@ class Cache:
     def inactive_alerts(self) -> set[models.InactiveAlert]:
         return set(self._inactive_alerts.values())
 
+    @property
+    def inactive_alerts_view(self) -> ValuesView[models.InactiveAlert]:
+        return self._inactive_alerts.values()
+
     def add_inactive_alert(self, inactive_alert: models.InactiveAlert, /) -> None:
         self._inactive_alerts[inactive_alert.nation_id] = inactive_alert
 
@@ -638,6 +1171,10 @@ class Cache:
     def interview_answers(self) -> set[models.InterviewAnswer]:
         return set(self._interview_answers.values())
 
+    @property
+    def interview_answers_view(self) -> ValuesView[models.InterviewAnswer]:
+        return self._interview_answers.values()
+
     def add_interview_answer(self, interview_answer: models.InterviewAnswer, /) -> None:
         self._interview_answers[interview_answer.id] = interview_answer
 
@@ -653,6 +1190,10 @@ class Cache:
     def interview_configs(self) -> set[models.InterviewConfig]:
         return set(self._interview_configs.values())
 
+    @property
+    def interview_configs_view(self) -> ValuesView[models.InterviewConfig]:
+        return self._interview_configs.values()
+
     def add_interview_config(self, interview_config: models.InterviewConfig, /) -> None:
         self._interview_configs[interview_config.id] = interview_config
 
@@ -668,6 +1209,10 @@ class Cache:
     def interview_questions(self) -> set[models.InterviewQuestion]:
         return set(self._interview_questions.values())
 
+    @property
+    def interview_questions_view(self) -> ValuesView[models.InterviewQuestion]:
+        return self._interview_questions.values()
+
     def add_interview_question(
         self, interview_question: models.InterviewQuestion, /
     ) -> None:
@@ -685,6 +1230,10 @@ class Cache:
     def interviews(self) -> set[models.Interview]:
         return set(self._interviews.values())
 
+    @property
+    def interviews_view(self) -> ValuesView[models.Interview]:
+        return self._interviews.values()
+
     def add_interview(self, interview: models.Interview, /) -> None:
         self._interviews[interview.id] = interview
 
@@ -698,6 +1247,10 @@ class Cache:
     def mentions(self) -> set[models.Mention]:
         return set(self._mentions.values())
 
+    @property
+    def mentions_view(self) -> ValuesView[models.Mention]:
+        return self._mentions.values()
+
     def add_mention(self, mention: models.Mention, /) -> None:
         self._mentions[mention.id] = mention
 
@@ -711,6 +1264,10 @@ class Cache:
     def menu_interfaces(self) -> set[models.MenuInterface]:
         return set(self._menu_interfaces.values())
 
+    @property
+    def menu_interfaces_view(self) -> ValuesView[models.MenuInterface]:
+        return self._menu_interfaces.values()
+
     def add_menu_interface(self, menu_interface: models.MenuInterface, /) -> None:
         self._menu_interfaces[menu_interface.id] = menu_interface
 
@@ -724,6 +1281,10 @@ class Cache:
     def menu_items(self) -> set[models.MenuItem]:
         return set(self._menu_items.values())
 
+    @property
+    def menu_items_view(self) -> ValuesView[models.MenuItem]:
+        return self._menu_items.values()
+
     def add_menu_item(self, menu_item: models.MenuItem, /) -> None:
         self._menu_items[menu_item.id] = menu_item
 
@@ -737,6 +1298,10 @@ class Cache:
     def menus(self) -> set[models.Menu]:
         return set(self._menus.values())
 
+    @property
+    def menus_view(self) -> ValuesView[models.Menu]:
+        return self._menus.values()
+
     def add_menu(self, menu: models.Menu, /) -> None:
         self._menus[menu.id] = menu
 
@@ -750,19 +1315,116 @@ class Cache:
     def nations(self) -> set[models.Nation]:
         return set(self._nations.values())
 
+    @property
+    def nations_view(self) -> ValuesView[models.Nation]:
+        return self._nations.values()
+
     def add_nation(self, nation: models.Nation, /) -> None:
+        if (existing := self._nations.get(nation.id)) is not None:
+            index_discard(self._nations_by_alliance, existing.alliance_id, existing.id)
+            sorted_discard(self._nations_by_score, (existing.score, existing.id))
         self._nations[nation.id] = nation
+        index_add(self._nations_by_alliance, nation.alliance_id, nation.id)
+        sorted_add(self._nations_by_score, (nation.score, nation.id))
+        self._nation_columns.set(nation)
 
     def get_nation(self, id: int, /) -> Optional[models.Nation]:
         return self._nations.get(id)
 
+    async def fetch_nation(
+        self, id: int, /, *, api: bool = False
+    ) -> Optional[models.Nation]:
+        return await self.fetch(models.Nation, id, self.add_nation, api=api)
+
+    @property
+    def nation_columns(self) -> Columns:
+        return self._nation_columns
+
+    def get_alliance_aggregates(
+        self, alliance_ids: Optional[Iterable[int]] = None, /
+    ) -> dict[int, dict[str, float]]:
+        # sums of the nation columns and the infrastructure and land of the cities
+        # of the members of each alliance, computed from the column snapshots
+        nations = self._nation_columns
+        if not nations:
+            return {}
+        alliance_id = nations.get("alliance_id")
+        mask = nations.get("alliance_position") >= enums.AlliancePosition.MEMBER.value
+        if alliance_ids is not None:
+            mask &= numpy.isin(alliance_id, numpy.fromiter(alliance_ids, numpy.int64))
+        values = nations.get_many(AGGREGATE_COLUMNS)
+        values["vacation_mode"] = nations.get("vacation_mode_turns") > 0
+        aggregates = group_sum(alliance_id, values, mask)
+        cities = self._city_columns
+        nation_id = cities.get("nation_id")
+        infrastructure = cities.get("infrastructure")
+        land = cities.get("land")
+        if alliance_ids is not None:
+            # only look up the cities of the masked nations instead of every city
+            keep = numpy.isin(nation_id, nations.get("id")[mask])
+            nation_id, infrastructure, land = (
+                nation_id[keep],
+                infrastructure[keep],
+                land[keep],
+            )
+        rows = nations.lookup(nation_id)
+        city_mask = rows >= 0
+        city_mask[city_mask] = mask[rows[city_mask]]
+        for key, value in group_sum(
+            alliance_id[rows],
+            {"infrastructure": infrastructure, "land": land},
+            city_mask,
+        ).items():
+            value["cities"] = value.pop("count")
+            aggregates[key] |= value
+        for value in aggregates.values():
+            value["nations"] = value.pop("count")
+        return aggregates
+
+    def get_alliance_aggregate(self, *alliance_ids: int) -> dict[str, float]:
+        # totals across every given alliance, e.g. all the alliances in a bloc
+        total = dict.fromkeys(AGGREGATE_NAMES, 0.0)
+        for i in self.get_alliance_aggregates(alliance_ids).values():
+            for key, value in i.items():
+                total[key] += value
+        return total
+
+    def get_nations_by_alliance(self, alliance_id: int, /) -> set[models.Nation]:
+        return {
+            self._nations[i] for i in self._nations_by_alliance.get(alliance_id, ())
+        }
+
+    def get_nations_by_score(
+        self, min_score: float, max_score: float, /
+    ) -> list[models.Nation]:
+        scores = self._nations_by_score
+        start = bisect.bisect_left(scores, (min_score, -math.inf))
+        end = bisect.bisect_right(scores, (max_score, math.inf))
+        return [self._nations[i] for _, i in scores[start:end]]
+
+    def update_nation(self, old: models.Nation, new: models.Nation, /) -> None:
+        if old.alliance_id != new.alliance_id:
+            index_discard(self._nations_by_alliance, old.alliance_id, old.id)
+            index_add(self._nations_by_alliance, new.alliance_id, new.id)
+        if old.score != new.score:
+            sorted_discard(self._nations_by_score, (old.score, old.id))
+            sorted_add(self._nations_by_score, (new.score, new.id))
+        self._nation_columns.set(new)
+
     def remove_nation(self, nation: models.Nation, /) -> None:
-        del self._nations[nation.id]
+        nation = self._nations.pop(nation.id)
+        index_discard(self._nations_by_alliance, nation.alliance_id, nation.id)
+        sorted_discard(self._nations_by_score, (nation.score, nation.id))
+        self._nation_columns.remove(nation.id)
 
     @property
     def nations_private(self) -> set[models.NationPrivate]:
         return set(self._nations_private.values())
 
+    @property
+    def nations_private_view(self) -> ValuesView[models.NationPrivate]:
+        return self._nations_private.values()
+
     def add_nation_private(self, nation_private: models.NationPrivate, /) -> None:
         self._nations_private[nation_private.id] = nation_private
 
@@ -776,6 +1438,10 @@ class Cache:
     def reminders(self) -> set[models.Reminder]:
         return set(self._reminders.values())
 
+    @property
+    def reminders_view(self) -> ValuesView[models.Reminder]:
+        return self._reminders.values()
+
     def add_reminder(self, reminder: models.Reminder, /) -> None:
         self._reminders[reminder.id] = reminder
 
@@ -789,6 +1455,10 @@ class Cache:
     def roles(self) -> set[models.Role]:
         return set(self._roles.values())
 
+    @property
+    def roles_view(self) -> ValuesView[models.Role]:
+        return self._roles.values()
+
     def add_role(self, role: models.Role, /) -> None:
         self._roles[role.id] = role
 
@@ -802,6 +1472,10 @@ class Cache:
     def rosters(self) -> set[models.Roster]:
         return set(self._rosters.values())
 
+    @property
+    def rosters_view(self) -> ValuesView[models.Roster]:
+        return self._rosters.values()
+
     def add_roster(self, roster: models.Roster, /) -> None:
         self._rosters[roster.id] = roster
 
@@ -815,6 +1489,10 @@ class Cache:
     def servers(self) -> set[models.Server]:
         return set(self._servers.values())
 
+    @property
+    def servers_view(self) -> ValuesView[models.Server]:
+        return self._servers.values()
+
     def add_server(self, server: models.Server, /) -> None:
         self._servers[server.id] = server
 
@@ -828,6 +1506,10 @@ class Cache:
     def server_submissions(self) -> set[models.ServerSubmission]:
         return set(self._server_submissions.values())
 
+    @property
+    def server_submissions_view(self) -> ValuesView[models.ServerSubmission]:
+        return self._server_submissions.values()
+
     def add_server_submission(
         self, server_submission: models.ServerSubmission, /
     ) -> None:
@@ -845,6 +1527,10 @@ class Cache:
     def subscriptions(self) -> set[models.Subscription]:
         return set(self._subscriptions.values())
 
+    @property
+    def subscriptions_view(self) -> ValuesView[models.Subscription]:
+        return self._subscriptions.values()
+
     def add_subscription(self, subscription: models.Subscription, /) -> None:
         self._subscriptions[subscription.id] = subscription
 
@@ -858,6 +1544,10 @@ class Cache:
     def tags(self) -> set[models.Tag]:
         return set(self._tags.values())
 
+    @property
+    def tags_view(self) -> ValuesView[models.Tag]:
+        return self._tags.values()
+
     def add_tag(self, tag: models.Tag, /) -> None:
         self._tags[tag.id] = tag
 
@@ -871,6 +1561,10 @@ class Cache:
     def target_configs(self) -> set[models.TargetConfig]:
         return set(self._target_configs.values())
 
+    @property
+    def target_configs_view(self) -> ValuesView[models.TargetConfig]:
+        return self._target_configs.values()
+
     def add_target_config(self, target_config: models.TargetConfig, /) -> None:
         self._target_configs[target_config.id] = target_config
 
@@ -884,19 +1578,34 @@ class Cache:
     def target_raters(self) -> set[models.TargetRater]:
         return set(self._target_raters.values())
 
+    @property
+    def target_raters_view(self) -> ValuesView[models.TargetRater]:
+        return self._target_raters.values()
+
     def add_target_rater(self, target_rater: models.TargetRater, /) -> None:
         self._target_raters[target_rater.id] = target_rater
 
     def get_target_rater(self, id: int, /) -> Optional[models.TargetRater]:
         return self._target_raters.get(id)
 
+    def update_target_rater(
+        self, old: models.TargetRater, new: models.TargetRater, /
+    ) -> None:
+        self._target_raters[new.id] = new
+        old.clear_expressions()
+
     def remove_target_rater(self, target_rater: models.TargetRater, /) -> None:
         del self._target_raters[target_rater.id]
+        target_rater.clear_expressions()
 
     @property
     def target_reminders(self) -> set[models.TargetReminder]:
         return set(self._target_reminders.values())
 
+    @property
+    def target_reminders_view(self) -> ValuesView[models.TargetReminder]:
+        return self._target_reminders.values()
+
     def add_target_reminder(self, target_reminder: models.TargetReminder, /) -> None:
         self._target_reminders[target_reminder.id] = target_reminder
 
@@ -910,6 +1619,10 @@ class Cache:
     def tax_brackets(self) -> set[models.TaxBracket]:
         return set(self._tax_brackets.values())
 
+    @property
+    def tax_brackets_view(self) -> ValuesView[models.TaxBracket]:
+        return self._tax_brackets.values()
+
     def add_tax_bracket(self, tax_bracket: models.TaxBracket, /) -> None:
         self._tax_brackets[tax_bracket.id] = tax_bracket
 
@@ -923,6 +1636,10 @@ class Cache:
     def ticket_configs(self) -> set[models.TicketConfig]:
         return set(self._ticket_configs.values())
 
+    @property
+    def ticket_configs_view(self) -> ValuesView[models.TicketConfig]:
+        return self._ticket_configs.values()
+
     def add_ticket_config(self, ticket_config: models.TicketConfig, /) -> None:
         self._ticket_configs[ticket_config.id] = ticket_config
 
@@ -936,6 +1653,10 @@ class Cache:
     def tickets(self) -> set[models.Ticket]:
         return set(self._tickets.values())
 
+    @property
+    def tickets_view(self) -> ValuesView[models.Ticket]:
+        return self._tickets.values()
+
     def add_ticket(self, ticket: models.Ticket, /) -> None:
         self._tickets[ticket.id] = ticket
 
@@ -949,19 +1670,33 @@ class Cache:
     def trades(self) -> set[models.Trade]:
         return set(self._trades.values())
 
+    @property
+    def trades_view(self) -> ValuesView[models.Trade]:
+        return self._trades.values()
+
     def add_trade(self, trade: models.Trade, /) -> None:
         self._trades[trade.id] = trade
 
     def get_trade(self, id: int, /) -> Optional[models.Trade]:
         return self._trades.get(id)
 
+    async def fetch_trade(
+        self, id: int, /, *, api: bool = False
+    ) -> Optional[models.Trade]:
+        return await self.fetch(models.Trade, id, self.add_trade, api=api)
+
     def remove_trade(self, trade: models.Trade, /) -> None:
-        del self._trades[trade.id]
+        # may not be loaded yet, see load_history
+        self.discard_history("trades", trade.id)
 
     @property
     def transactions(self) -> set[models.Transaction]:
         return set(self._transactions.values())
 
+    @property
+    def transactions_view(self) -> ValuesView[models.Transaction]:
+        return self._transactions.values()
+
     def add_transaction(self, transaction: models.Transaction, /) -> None:
         self._transactions[transaction.id] = transaction
 
@@ -975,19 +1710,41 @@ class Cache:
     def treasures(self) -> set[models.Treasure]:
         return set(self._treasures.values())
 
+    @property
+    def treasures_view(self) -> ValuesView[models.Treasure]:
+        return self._treasures.values()
+
     def add_treasure(self, treasure: models.Treasure, /) -> None:
+        if (existing := self._treasures.get(treasure.name)) is not None:
+            index_discard(self._treasures_by_nation, existing.nation_id, existing.name)
         self._treasures[treasure.name] = treasure
+        index_add(self._treasures_by_nation, treasure.nation_id, treasure.name)
 
     def get_treasure(self, name: str, /) -> Optional[models.Treasure]:
         return self._treasures.get(name)
 
+    def get_treasures_by_nation(self, nation_id: int, /) -> set[models.Treasure]:
+        return {
+            self._treasures[i] for i in self._treasures_by_nation.get(nation_id, ())
+        }
+
+    def update_treasure(self, old: models.Treasure, new: models.Treasure, /) -> None:
+        if old.nation_id != new.nation_id:
+            index_discard(self._treasures_by_nation, old.nation_id, old.name)
+            index_add(self._treasures_by_nation, new.nation_id, new.name)
+
     def remove_treasure(self, treasure: models.Treasure, /) -> None:
-        del self._treasures[treasure.name]
+        treasure = self._treasures.pop(treasure.name)
+        index_discard(self._treasures_by_nation, treasure.nation_id, treasure.name)
 
     @property
     def treaties(self) -> set[models.Treaty]:
         return set(self._treaties.values())
 
+    @property
+    def treaties_view(self) -> ValuesView[models.Treaty]:
+        return self._treaties.values()
+
     def add_treaty(self, treaty: models.Treaty, /) -> None:
         self._treaties[treaty.id] = treaty
 
@@ -1018,19 +1775,33 @@ class Cache:
     def war_attacks(self) -> set[models.WarAttack]:
         return set(self._war_attacks.values())
 
+    @property
+    def war_attacks_view(self) -> ValuesView[models.WarAttack]:
+        return self._war_attacks.values()
+
     def add_war_attack(self, war_attack: models.WarAttack, /) -> None:
         self._war_attacks[war_attack.id] = war_attack
 
     def get_war_attack(self, id: int, /) -> Optional[models.WarAttack]:
         return self._war_attacks.get(id)
 
+    async def fetch_war_attack(
+        self, id: int, /, *, api: bool = False
+    ) -> Optional[models.WarAttack]:
+        return await self.fetch(models.WarAttack, id, self.add_war_attack, api=api)
+
     def remove_war_attack(self, war_attack: models.WarAttack, /) -> None:
-        del self._war_attacks[war_attack.id]
+        # may not be loaded yet, see load_history
+        self.discard_history("war_attacks", war_attack.id)
 
     @property
     def war_room_configs(self) -> set[models.WarRoomConfig]:
         return set(self._war_room_configs.values())
 
+    @property
+    def war_room_configs_view(self) -> ValuesView[models.WarRoomConfig]:
+        return self._war_room_configs.values()
+
     def add_war_room_config(self, war_room_config: models.WarRoomConfig, /) -> None:
         self._war_room_configs[war_room_config.id] = war_room_config
 
@@ -1044,6 +1815,10 @@ class Cache:
     def war_rooms(self) -> set[models.WarRoom]:
         return set(self._war_rooms.values())
 
+    @property
+    def war_rooms_view(self) -> ValuesView[models.WarRoom]:
+        return self._war_rooms.values()
+
     def add_war_room(self, war_room: models.WarRoom, /) -> None:
         self._war_rooms[war_room.id] = war_room
 
@@ -1057,17 +1832,130 @@ class Cache:
     def wars(self) -> set[models.War]:
         return set(self._wars.values())
 
+    @property
+    def wars_view(self) -> ValuesView[models.War]:
+        return self._wars.values()
+
     def add_war(self, war: models.War, /) -> None:
+        if (existing := self._wars.get(war.id)) is not None:
+            index_discard(self._wars_by_nation, existing.attacker_id, existing.id)
+            index_discard(self._wars_by_nation, existing.defender_id, existing.id)
         self._wars[war.id] = war
+        index_add(self._wars_by_nation, war.attacker_id, war.id)
+        index_add(self._wars_by_nation, war.defender_id, war.id)
 
     def get_war(self, id: int, /) -> Optional[models.War]:
         return self._wars.get(id)
 
-    def remove_war(self, war: models.War, /) -> None:
-        del self._wars[war.id]
+    async def fetch_war(self, id: int, /, *, api: bool = False) -> Optional[models.War]:
+        return await self.fetch(models.War, id, self.add_war, api=api)
 
+    def get_wars_by_nation(self, nation_id: int, /) -> set[models.War]:
+        return {self._wars[i] for i in self._wars_by_nation.get(nation_id, ())}
 
-cache = Cache()
+    def update_war(self, old: models.War, new: models.War, /) -> None:
+        if old.attacker_id != new.attacker_id or old.defender_id != new.defender_id:
+            index_discard(self._wars_by_nation, old.attacker_id, old.id)
+            index_discard(self._wars_by_nation, old.defender_id, old.id)
+            index_add(self._wars_by_nation, new.attacker_id, new.id)
+            index_add(self._wars_by_nation, new.defender_id, new.id)
+
+    def remove_war(self, war: models.War, /) -> None:
+        war = self._wars.pop(war.id)
+        index_discard(self._wars_by_nation, war.attacker_id, war.id)
+        index_discard(self._wars_by_nation, war.defender_id, war.id)
+
+
+def index_add(index: dict[Any, set[Any]], key: Any, value: Any) -> None:
+    try:
+        index[key].add(value)
+    except KeyError:
+        index[key] = {value}
+
+
+def index_discard(index: dict[Any, set[Any]], key: Any, value: Any) -> None:
+    values = index.get(key)
+    if values is not None:
+        values.discard(value)
+        if not values:
+            del index[key]
+
+
+def sorted_add(values: list[Any], value: Any) -> None:
+    index = bisect.bisect_left(values, value)
+    if index == len(values) or values[index] != value:
+        values.insert(index, value)
+
+
+def sorted_discard(values: list[Any], value: Any) -> None:
+    index = bisect.bisect_left(values, value)
+    if index < len(values) and values[index] == value:
+        del values[index]
+
+
+# loaded in the background by load_history instead of initialize
+HISTORY_MODELS: tuple[Any, ...] = (
+    models.AuditLog,
+    models.Bankrec,
+    models.Trade,
+    models.WarAttack,
+)
+# kept in a CompactTable when the cache is compact
+COMPACT_MODELS: tuple[Any, ...] = (
+    models.Bankrec,
+    models.City,
+    models.Trade,
+    models.WarAttack,
+    models.War,
+)
+# have string fields converted by intern.string
+INTERNED_MODELS: tuple[Any, ...] = (
+    models.Alliance,
+    models.Bankrec,
+    models.Nation,
+    models.War,
+    models.WarAttack,
+)
+# seconds a row that wasn't found by fetch is remembered as missing
+MISSING_TTL = 60.0
+FETCH_STATS: tuple[str, ...] = (
+    "memory",
+    "negative",
+    "coalesced",
+    "database",
+    "api",
+    "missing",
+)
+# evicted by sweep when the cache has a retention policy
+RETAINED_MODELS: tuple[Any, ...] = (
+    models.Bankrec,
+    models.Trade,
+    models.WarAttack,
+)
+AGGREGATE_COLUMNS: tuple[str, ...] = tuple(
+    i for i in models.Nation.COLUMNS if i not in {"id", "alliance_id"}
+)
+AGGREGATE_NAMES: tuple[str, ...] = (
+    "nations",
+    *AGGREGATE_COLUMNS,
+    "vacation_mode",
+    "cities",
+    "infrastructure",
+    "land",
+)
+
+cache = Cache(
+    compact=env.COMPACT_CACHE,
+    retention={
+        i.TABLE: Retention(
+            window=datetime.timedelta(days=env.HISTORY_RETENTION_DAYS)
+            if env.HISTORY_RETENTION_DAYS
+            else None,
+            max_count=env.HISTORY_RETENTION_COUNT or None,
+        )
+        for i in RETAINED_MODELS
+    },
+)
 
 
 def __getattr__(name: str) -> Any:
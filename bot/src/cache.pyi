@@ -3,29 +3,62 @@
 
 from __future__ import annotations
 
+import datetime
 from typing import TYPE_CHECKING
 
 from . import enums, models
+from .columns import Columns
 
 if TYPE_CHECKING:
-    from typing import Optional
+    from collections.abc import Iterable, ValuesView
+    from typing import Any, Awaitable, Callable, Optional
 
 async def initialize() -> None: ...
+async def load_history(chunk_size: int = 10000) -> None: ...
+def is_ready(table: str, /) -> bool: ...
+async def wait_until_ready(table: str, /) -> None: ...
+def interned_bytes() -> dict[str, int]: ...
+async def retained_after(model: Any, /) -> int: ...
+def discard_history(name: str, id: int, /) -> None: ...
+def sweep(now: Optional[datetime.datetime] = None) -> dict[str, int]: ...
+async def fetch_history(
+    model: Any,
+    start: datetime.datetime,
+    end: Optional[datetime.datetime] = None,
+    /,
+) -> list[Any]: ...
+def retention_stats() -> dict[str, dict[str, Any]]: ...
+def register_api(
+    table: str, fetcher: Callable[[int], Awaitable[Optional[Any]]], /
+) -> None: ...
+async def fetch(
+    model: Any, id: int, adder: Callable[[Any], None], /, *, api: bool = False
+) -> Optional[Any]: ...
+def fetch_stats() -> dict[str, dict[str, int]]: ...
 def clear() -> None: ...
 
 accounts: set[models.Account]
+accounts_view: ValuesView[models.Account]
 
 def add_account(account: models.Account, /) -> None: ...
 def get_account(id: int, /) -> Optional[models.Account]: ...
 def remove_account(character: models.Account, /) -> None: ...
 
 alliances: set[models.Alliance]
+alliances_view: ValuesView[models.Alliance]
 
 def add_alliance(alliance: models.Alliance, /) -> None: ...
 def get_alliance(id: int, /) -> Optional[models.Alliance]: ...
+async def fetch_alliance(
+    id: int, /, *, api: bool = False
+) -> Optional[models.Alliance]: ...
+def get_alliance_rank(alliance: models.Alliance, /) -> int: ...
+def get_top_alliances(count: int, /) -> list[models.Alliance]: ...
+def update_alliance(old: models.Alliance, new: models.Alliance, /) -> None: ...
 def remove_alliance(account: models.Alliance, /) -> None: ...
 
 alliance_auto_roles: set[models.AllianceAutoRole]
+alliance_auto_roles_view: ValuesView[models.AllianceAutoRole]
 
 def add_alliance_auto_role(alliance_auto_role: models.AllianceAutoRole, /) -> None: ...
 def get_alliance_auto_role(id: int, /) -> Optional[models.AllianceAutoRole]: ...
@@ -34,96 +67,119 @@ def remove_alliance_auto_role(
 ) -> None: ...
 
 alliance_settings: set[models.AllianceSettings]
+alliance_settings_view: ValuesView[models.AllianceSettings]
 
 def add_alliance_setting(alliance_setting: models.AllianceSettings, /) -> None: ...
 def get_alliance_setting(alliance_id: int, /) -> Optional[models.AllianceSettings]: ...
 def remove_alliance_setting(alliance_setting: models.AllianceSettings, /) -> None: ...
 
 alliances_private: set[models.AlliancePrivate]
+alliances_private_view: ValuesView[models.AlliancePrivate]
 
 def add_alliance_private(alliance_private: models.AlliancePrivate, /) -> None: ...
 def get_alliance_private(id: int, /) -> Optional[models.AlliancePrivate]: ...
 def remove_alliance_private(alliances_private: models.AlliancePrivate, /) -> None: ...
 
 audit_checks: set[models.AuditCheck]
+audit_checks_view: ValuesView[models.AuditCheck]
 
 def add_audit_check(audit_check: models.AuditCheck, /) -> None: ...
 def get_audit_check(id: int, /) -> Optional[models.AuditCheck]: ...
 def remove_audit_check(audit_check: models.AuditCheck, /) -> None: ...
 
 audit_configs: set[models.AuditConfig]
+audit_configs_view: ValuesView[models.AuditConfig]
 
 def add_audit_config(audit_config: models.AuditConfig, /) -> None: ...
 def get_audit_config(id: int, /) -> Optional[models.AuditConfig]: ...
 def remove_audit_config(audit_config: models.AuditConfig, /) -> None: ...
 
 audit_log_configs: set[models.AuditLogConfig]
+audit_log_configs_view: ValuesView[models.AuditLogConfig]
 
 def add_audit_log_config(audit_log_config: models.AuditLogConfig, /) -> None: ...
 def get_audit_log_config(id: int, /) -> Optional[models.AuditLogConfig]: ...
 def remove_audit_log_config(audit_log_config: models.AuditLogConfig, /) -> None: ...
 
 audit_logs: set[models.AuditLog]
+audit_logs_view: ValuesView[models.AuditLog]
 
 def add_audit_log(audit_log: models.AuditLog, /) -> None: ...
 def get_audit_log(id: int, /) -> Optional[models.AuditLog]: ...
 def remove_audit_log(audit_log: models.AuditLog, /) -> None: ...
 
 audit_runs: set[models.AuditRun]
+audit_runs_view: ValuesView[models.AuditRun]
 
 def add_audit_run(audit_run: models.AuditRun, /) -> None: ...
 def get_audit_run(id: int, /) -> Optional[models.AuditRun]: ...
 def remove_audit_run(audit_run: models.AuditRun, /) -> None: ...
 
 bankrecs: set[models.Bankrec]
+bankrecs_view: ValuesView[models.Bankrec]
 
 def add_bankrec(bankrec: models.Bankrec, /) -> None: ...
 def get_bankrec(id: int, /) -> Optional[models.Bankrec]: ...
+async def fetch_bankrec(
+    id: int, /, *, api: bool = False
+) -> Optional[models.Bankrec]: ...
 def remove_bankrec(bankrec: models.Bankrec, /) -> None: ...
 
 blitzes: set[models.Blitz]
+blitzes_view: ValuesView[models.Blitz]
 
 def add_blitz(blitz: models.Blitz, /) -> None: ...
 def get_blitz(id: int, /) -> Optional[models.Blitz]: ...
 def remove_blitz(blitz: models.Blitz, /) -> None: ...
 
 blitz_targets: set[models.BlitzTarget]
+blitz_targets_view: ValuesView[models.BlitzTarget]
 
 def add_blitz_target(blitz_target: models.BlitzTarget, /) -> None: ...
 def get_blitz_target(id: int, /) -> Optional[models.BlitzTarget]: ...
 def remove_blitz_target(blitz_target: models.BlitzTarget, /) -> None: ...
 
 bounties: set[models.Bounty]
+bounties_view: ValuesView[models.Bounty]
 
 def add_bounty(bounty: models.Bounty, /) -> None: ...
 def get_bounty(id: int, /) -> Optional[models.Bounty]: ...
 def remove_bounty(bounty: models.Bounty, /) -> None: ...
 
 builds: set[models.Build]
+builds_view: ValuesView[models.Build]
 
 def add_build(build: models.Build, /) -> None: ...
 def get_build(id: int, /) -> Optional[models.Build]: ...
 def remove_build(build: models.Build, /) -> None: ...
 
 cities: set[models.City]
+cities_view: ValuesView[models.City]
+city_columns: Columns
 
 def add_city(city: models.City, /) -> None: ...
 def get_city(id: int, /) -> Optional[models.City]: ...
+async def fetch_city(id: int, /, *, api: bool = False) -> Optional[models.City]: ...
+def get_cities_by_nation(nation_id: int, /) -> set[models.City]: ...
+def update_city(old: models.City, new: models.City, /) -> None: ...
 def remove_city(city: models.City, /) -> None: ...
 
 city_auto_roles: set[models.CityAutoRole]
+city_auto_roles_view: ValuesView[models.CityAutoRole]
 
 def add_city_auto_role(city_auto_role: models.CityAutoRole, /) -> None: ...
 def get_city_auto_role(id: int, /) -> Optional[models.CityAutoRole]: ...
 def remove_city_auto_role(city_auto_role: models.CityAutoRole, /) -> None: ...
 
 colors: set[models.Color]
+colors_view: ValuesView[models.Color]
 
 def add_color(color: models.Color, /) -> None: ...
 def get_color(color: enums.Color, /) -> Optional[models.Color]: ...
 def remove_color(color: models.Color, /) -> None: ...
 
 conditional_auto_roles: set[models.ConditionalAutoRole]
+conditional_auto_roles_view: ValuesView[models.ConditionalAutoRole]
 
 def add_conditional_auto_role(
     conditional_auto_role: models.ConditionalAutoRole, /
@@ -134,60 +190,70 @@ def remove_conditional_auto_role(
 ) -> None: ...
 
 conditions: set[models.Condition]
+conditions_view: ValuesView[models.Condition]
 
 def add_condition(condition: models.Condition, /) -> None: ...
 def get_condition(id: int, /) -> Optional[models.Condition]: ...
 def remove_condition(condition: models.Condition, /) -> None: ...
 
 embassy_configs: set[models.EmbassyConfig]
+embassy_configs_view: ValuesView[models.EmbassyConfig]
 
 def add_embassy_config(embassy_config: models.EmbassyConfig, /) -> None: ...
 def get_embassy_config(id: int, /) -> Optional[models.EmbassyConfig]: ...
 def remove_embassy_config(embassy_config: models.EmbassyConfig, /) -> None: ...
 
 embassies: set[models.Embassy]
+embassies_view: ValuesView[models.Embassy]
 
 def add_embassy(embassy: models.Embassy, /) -> None: ...
 def get_embassy(id: int, /) -> Optional[models.Embassy]: ...
 def remove_embassy(embassy: models.Embassy, /) -> None: ...
 
 grants: set[models.Grant]
+grants_view: ValuesView[models.Grant]
 
 def add_grant(grant: models.Grant, /) -> None: ...
 def get_grant(id: int, /) -> Optional[models.Grant]: ...
 def remove_grant(grant: models.Grant, /) -> None: ...
 
 guild_roles: set[models.GuildRole]
+guild_roles_view: ValuesView[models.GuildRole]
 
 def add_guild_role(guild_role: models.GuildRole, /) -> None: ...
 def get_guild_role(id: int, /) -> Optional[models.GuildRole]: ...
 def remove_guild_role(guild_role: models.GuildRole, /) -> None: ...
 
 guild_settings: set[models.GuildSettings]
+guild_settings_view: ValuesView[models.GuildSettings]
 
 def add_guild_settings(guild_settings: models.GuildSettings, /) -> None: ...
 def get_guild_settings(guild_id: int, /) -> Optional[models.GuildSettings]: ...
 def remove_guild_settings(guild_settings: models.GuildSettings, /) -> None: ...
 
 inactive_alerts: set[models.InactiveAlert]
+inactive_alerts_view: ValuesView[models.InactiveAlert]
 
 def add_inactive_alert(inactive_alert: models.InactiveAlert, /) -> None: ...
 def get_inactive_alert(id: int, /) -> Optional[models.InactiveAlert]: ...
 def remove_inactive_alert(inactive_alert: models.InactiveAlert, /) -> None: ...
 
 interview_answers: set[models.InterviewAnswer]
+interview_answers_view: ValuesView[models.InterviewAnswer]
 
 def add_interview_answer(interview_answer: models.InterviewAnswer, /) -> None: ...
 def get_interview_answer(id: int, /) -> Optional[models.InterviewAnswer]: ...
 def remove_interview_answer(interview_answer: models.InterviewAnswer, /) -> None: ...
 
 interview_configs: set[models.InterviewConfig]
+interview_configs_view: ValuesView[models.InterviewConfig]
 
 def add_interview_config(interview_config: models.InterviewConfig, /) -> None: ...
 def get_interview_config(id: int, /) -> Optional[models.InterviewConfig]: ...
 def remove_interview_config(interview_config: models.InterviewConfig, /) -> None: ...
 
 interview_questions: set[models.InterviewQuestion]
+interview_questions_view: ValuesView[models.InterviewQuestion]
 
 def add_interview_question(interview_question: models.InterviewQuestion, /) -> None: ...
 def get_interview_question(id: int, /) -> Optional[models.InterviewQuestion]: ...
@@ -196,144 +262,185 @@ def remove_interview_question(
 ) -> None: ...
 
 interviews: set[models.Interview]
+interviews_view: ValuesView[models.Interview]
 
 def add_interview(interview: models.Interview, /) -> None: ...
 def get_interview(id: int, /) -> Optional[models.Interview]: ...
 def remove_interview(interview: models.Interview, /) -> None: ...
 
 mentions: set[models.Mention]
+mentions_view: ValuesView[models.Mention]
 
 def add_mention(mention: models.Mention, /) -> None: ...
 def get_mention(id: int, /) -> Optional[models.Mention]: ...
 def remove_mention(mention: models.Mention, /) -> None: ...
 
 menu_interfaces: set[models.MenuInterface]
+menu_interfaces_view: ValuesView[models.MenuInterface]
 
 def add_menu_interface(menu_interface: models.MenuInterface, /) -> None: ...
 def get_menu_interface(id: int, /) -> Optional[models.MenuInterface]: ...
 def remove_menu_interface(menu_interface: models.MenuInterface, /) -> None: ...
 
 menu_items: set[models.MenuItem]
+menu_items_view: ValuesView[models.MenuItem]
 
 def add_menu_item(menu_item: models.MenuItem, /) -> None: ...
 def get_menu_item(id: int, /) -> Optional[models.MenuItem]: ...
 def remove_menu_item(menu_item: models.MenuItem, /) -> None: ...
 
 menus: set[models.Menu]
+menus_view: ValuesView[models.Menu]
 
 def add_menu(menu: models.Menu, /) -> None: ...
 def get_menu(id: int, /) -> Optional[models.Menu]: ...
 def remove_menu(menu: models.Menu, /) -> None: ...
 
 nations: set[models.Nation]
+nations_view: ValuesView[models.Nation]
+nation_columns: Columns
 
 def add_nation(nation: models.Nation, /) -> None: ...
 def get_nation(id: int, /) -> Optional[models.Nation]: ...
+async def fetch_nation(id: int, /, *, api: bool = False) -> Optional[models.Nation]: ...
+def get_alliance_aggregates(
+    alliance_ids: Optional[Iterable[int]] = None, /
+) -> dict[int, dict[str, float]]: ...
+def get_alliance_aggregate(*alliance_ids: int) -> dict[str, float]: ...
+def get_nations_by_alliance(alliance_id: int, /) -> set[models.Nation]: ...
+def get_nations_by_score(
+    min_score: float, max_score: float, /
+) -> list[models.Nation]: ...
+def update_nation(old: models.Nation, new: models.Nation, /) -> None: ...
 def remove_nation(nation: models.Nation, /) -> None: ...
 
 nations_private: set[models.NationPrivate]
+nations_private_view: ValuesView[models.NationPrivate]
 
 def add_nation_private(nation_private: models.NationPrivate, /) -> None: ...
 def get_nation_private(id: int, /) -> Optional[models.NationPrivate]: ...
 def remove_nation_private(nations_private: models.NationPrivate, /) -> None: ...
 
 reminders: set[models.Reminder]
+reminders_view: ValuesView[models.Reminder]
 
 def add_reminder(reminder: models.Reminder, /) -> None: ...
 def get_reminder(id: int, /) -> Optional[models.Reminder]: ...
 def remove_reminder(reminder: models.Reminder, /) -> None: ...
 
 roles: set[models.Role]
+roles_view: ValuesView[models.Role]
 
 def add_role(role: models.Role, /) -> None: ...
 def get_role(id: int, /) -> Optional[models.Role]: ...
 def remove_role(role: models.Role, /) -> None: ...
 
 rosters: set[models.Roster]
+rosters_view: ValuesView[models.Roster]
 
 def add_roster(roster: models.Roster, /) -> None: ...
 def get_roster(id: int, /) -> Optional[models.Roster]: ...
 def remove_roster(roster: models.Roster, /) -> None: ...
 
 servers: set[models.Server]
+servers_view: ValuesView[models.Server]
 
 def add_server(server: models.Server, /) -> None: ...
 def get_server(id: int, /) -> Optional[models.Server]: ...
 def remove_server(server: models.Server, /) -> None: ...
 
 server_submissions: set[models.ServerSubmission]
+server_submissions_view: ValuesView[models.ServerSubmission]
 
 def add_server_submission(server_submission: models.ServerSubmission, /) -> None: ...
 def get_server_submission(id: int, /) -> Optional[models.ServerSubmission]: ...
 def remove_server_submission(server_submission: models.ServerSubmission, /) -> None: ...
 
 subscriptions: set[models.Subscription]
+subscriptions_view: ValuesView[models.Subscription]
 
 def add_subscription(subscription: models.Subscription, /) -> None: ...
 def get_subscription(id: int, /) -> Optional[models.Subscription]: ...
 def remove_subscription(subscription: models.Subscription, /) -> None: ...
 
 tags: set[models.Tag]
+tags_view: ValuesView[models.Tag]
 
 def add_tag(tag: models.Tag, /) -> None: ...
 def get_tag(id: int, /) -> Optional[models.Tag]: ...
 def remove_tag(tag: models.Tag, /) -> None: ...
 
 target_configs: set[models.TargetConfig]
+target_configs_view: ValuesView[models.TargetConfig]
 
 def add_target_config(target_config: models.TargetConfig, /) -> None: ...
 def get_target_config(id: int, /) -> Optional[models.TargetConfig]: ...
 def remove_target_config(target_config: models.TargetConfig, /) -> None: ...
 
 target_raters: set[models.TargetRater]
+target_raters_view: ValuesView[models.TargetRater]
 
 def add_target_rater(target_rater: models.TargetRater, /) -> None: ...
 def get_target_rater(id: int, /) -> Optional[models.TargetRater]: ...
+def update_target_rater(
+    old: models.TargetRater, new: models.TargetRater, /
+) -> None: ...
 def remove_target_rater(target_rater: models.TargetRater, /) -> None: ...
 
 target_reminders: set[models.TargetReminder]
+target_reminders_view: ValuesView[models.TargetReminder]
 
 def add_target_reminder(target_reminder: models.TargetReminder, /) -> None: ...
 def get_target_reminder(id: int, /) -> Optional[models.TargetReminder]: ...
 def remove_target_reminder(target_reminder: models.TargetReminder, /) -> None: ...
 
 tax_brackets: set[models.TaxBracket]
+tax_brackets_view: ValuesView[models.TaxBracket]
 
 def add_tax_bracket(tax_bracket: models.TaxBracket, /) -> None: ...
 def get_tax_bracket(id: int, /) -> Optional[models.TaxBracket]: ...
 def remove_tax_bracket(tax_bracket: models.TaxBracket, /) -> None: ...
 
 ticket_configs: set[models.TicketConfig]
+ticket_configs_view: ValuesView[models.TicketConfig]
 
 def add_ticket_config(ticket_config: models.TicketConfig, /) -> None: ...
 def get_ticket_config(id: int, /) -> Optional[models.TicketConfig]: ...
 def remove_ticket_config(ticket_config: models.TicketConfig, /) -> None: ...
 
 tickets: set[models.Ticket]
+tickets_view: ValuesView[models.Ticket]
 
 def add_ticket(ticket: models.Ticket, /) -> None: ...
 def get_ticket(id: int, /) -> Optional[models.Ticket]: ...
 def remove_ticket(ticket: models.Ticket, /) -> None: ...
 
 trades: set[models.Trade]
+trades_view: ValuesView[models.Trade]
 
 def add_trade(trade: models.Trade, /) -> None: ...
 def get_trade(id: int, /) -> Optional[models.Trade]: ...
+async def fetch_trade(id: int, /, *, api: bool = False) -> Optional[models.Trade]: ...
 def remove_trade(trade: models.Trade, /) -> None: ...
 
 transactions: set[models.Transaction]
+transactions_view: ValuesView[models.Transaction]
 
 def add_transaction(transaction: models.Transaction, /) -> None: ...
 def get_transaction(id: int, /) -> Optional[models.Transaction]: ...
 def remove_transaction(transaction: models.Transaction, /) -> None: ...
 
 treasures: set[models.Treasure]
+treasures_view: ValuesView[models.Treasure]
 
 def add_treasure(treasure: models.Treasure, /) -> None: ...
 def get_treasure(name: str, /) -> Optional[models.Treasure]: ...
+def get_treasures_by_nation(nation_id: int, /) -> set[models.Treasure]: ...
+def update_treasure(old: models.Treasure, new: models.Treasure, /) -> None: ...
 def remove_treasure(treasure: models.Treasure, /) -> None: ...
 
 treaties: set[models.Treaty]
+treaties_view: ValuesView[models.Treaty]
 
 def add_treaty(treaty: models.Treaty, /) -> None: ...
 def get_treaty(id: int, /) -> Optional[models.Treaty]: ...
@@ -346,25 +453,35 @@ def get_user(id: int, /) -> Optional[models.User]: ...
 def remove_user(user: models.User, /) -> None: ...
 
 war_attacks: set[models.WarAttack]
+war_attacks_view: ValuesView[models.WarAttack]
 
 def add_war_attack(war_attack: models.WarAttack, /) -> None: ...
 def get_war_attack(id: int, /) -> Optional[models.WarAttack]: ...
+async def fetch_war_attack(
+    id: int, /, *, api: bool = False
+) -> Optional[models.WarAttack]: ...
 def remove_war_attack(war_attack: models.WarAttack, /) -> None: ...
 
 war_room_configs: set[models.WarRoomConfig]
+war_room_configs_view: ValuesView[models.WarRoomConfig]
 
 def add_war_room_config(war_room_config: models.WarRoomConfig, /) -> None: ...
 def get_war_room_config(id: int, /) -> Optional[models.WarRoomConfig]: ...
 def remove_war_room_config(war_room_config: models.WarRoomConfig, /) -> None: ...
 
 war_rooms: set[models.WarRoom]
+war_rooms_view: ValuesView[models.WarRoom]
 
 def add_war_room(war_room: models.WarRoom, /) -> None: ...
 def get_war_room(id: int, /) -> Optional[models.WarRoom]: ...
 def remove_war_room(war_room: models.WarRoom, /) -> None: ...
 
 wars: set[models.War]
+wars_view: ValuesView[models.War]
 
 def add_war(war: models.War, /) -> None: ...
 def get_war(id: int, /) -> Optional[models.War]: ...
+async def fetch_war(id: int, /, *, api: bool = False) -> Optional[models.War]: ...
+def get_wars_by_nation(nation_id: int, /) -> set[models.War]: ...
+def update_war(old: models.War, new: models.War, /) -> None: ...
 def remove_war(war: models.War, /) -> None: ...
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import enum
+from typing import TYPE_CHECKING
+
+import numpy
+
+__all__ = ("Columns", "group_sum")
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from typing import Any, Optional
+
+    Array = numpy.ndarray[Any, Any]
+
+
+class Columns:
+    # struct of arrays snapshot of a cache table keyed by id, rows are kept dense
+    # so removing a row moves the last row into its place
+    __slots__ = ("_data", "_rows", "_size", "_order")
+
+    def __init__(self, dtypes: dict[str, str], /) -> None:
+        self._data: dict[str, Array] = {
+            i: numpy.zeros(0, dtype=j) for i, j in dtypes.items()
+        }
+        self._rows: dict[int, int] = {}
+        self._size: int = 0
+        # rows sorted by id for lookup, reset whenever rows are added or removed
+        self._order: Optional[Array] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._rows
+
+    def ids(self) -> Iterable[int]:
+        return self._rows.keys()
+
+    def row(self, id: int, /) -> Optional[int]:
+        return self._rows.get(id)
+
+    def read(self, row: int, names: Optional[Iterable[str]] = None, /) -> list[Any]:
+        if names is None:
+            return [i[row] for i in self._data.values()]
+        return [self._data[i][row] for i in names]
+
+    def write(self, row: int, names: Iterable[str], values: Iterable[Any], /) -> None:
+        for name, value in zip(names, values):
+            self._data[name][row] = value
+
+    def get(self, name: str, /) -> Array:
+        return self._data[name][: self._size]
+
+    def get_many(self, names: Iterable[str], /) -> dict[str, Array]:
+        return {i: self.get(i) for i in names}
+
+    def get_rows(self, ids: Iterable[int], /) -> Array:
+        rows = self._rows
+        return numpy.fromiter((rows[i] for i in ids), dtype=numpy.int64)
+
+    def lookup(self, ids: Array, /) -> Array:
+        # vectorized get_rows, ids that are not in the table map to -1
+        if not self._size:
+            return numpy.full(len(ids), -1, dtype=numpy.int64)
+        own = self.get("id")
+        order = self._order
+        if order is None:
+            order = self._order = numpy.argsort(own)
+        positions = numpy.searchsorted(own, ids, sorter=order)
+        rows = order[numpy.minimum(positions, self._size - 1)]
+        return numpy.where(own[rows] == ids, rows, -1)
+
+    def load(self, values: Sequence[Any], /) -> None:
+        self.clear()
+        self.reserve(len(values))
+        for name, column in self._data.items():
+            column[: len(values)] = [column_value(i, name) for i in values]
+        self._rows = {i.id: index for index, i in enumerate(values)}
+        self._size = len(values)
+        self._order = None
+
+    def set(self, value: Any, /) -> None:
+        row = self.allocate(value.id)
+        for name, column in self._data.items():
+            column[row] = column_value(value, name)
+
+    def set_values(self, id: int, values: Iterable[Any], /) -> None:
+        # values are in the order of the dtypes
+        row = self.allocate(id)
+        for column, value in zip(self._data.values(), values):
+            column[row] = value
+
+    def allocate(self, id: int, /) -> int:
+        row = self._rows.get(id)
+        if row is None:
+            self.reserve(self._size + 1)
+            row = self._rows[id] = self._size
+            self._size += 1
+            self._order = None
+        return row
+
+    def remove(self, id: int, /) -> None:
+        row = self._rows.pop(id, None)
+        if row is None:
+            return
+        self._size -= 1
+        self._order = None
+        last = self._size
+        if row != last:
+            for column in self._data.values():
+                column[row] = column[last]
+            self._rows[int(self._data["id"][row])] = row
+        for column in self._data.values():
+            if column.dtype == object:
+                column[last] = None
+
+    def remove_many(self, ids: Iterable[int], /) -> None:
+        # one pass over each column instead of a move per row, the remaining rows
+        # keep their order
+        rows = [j for j in (self._rows.get(i) for i in ids) if j is not None]
+        if not rows:
+            return
+        keep = numpy.ones(self._size, dtype=bool)
+        keep[rows] = False
+        size = int(keep.sum())
+        for column in self._data.values():
+            column[:size] = column[: self._size][keep]
+            if column.dtype == object:
+                column[size : self._size] = None
+        self._size = size
+        self._order = None
+        self._rows = {
+            int(i): index for index, i in enumerate(self._data["id"][:size].tolist())
+        }
+
+    def reserve(self, size: int, /) -> None:
+        capacity = len(self._data["id"])
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 64)
+        for name, column in self._data.items():
+            new = numpy.zeros(capacity, dtype=column.dtype)
+            new[: self._size] = column[: self._size]
+            self._data[name] = new
+
+    def clear(self) -> None:
+        self._rows.clear()
+        self._size = 0
+        self._order = None
+        for column in self._data.values():
+            if column.dtype == object:
+                column[:] = None
+
+    def nbytes(self) -> int:
+        return sum(i.nbytes for i in self._data.values())
+
+
+def column_value(value: Any, name: str) -> Any:
+    value = getattr(value, name)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def group_sum(
+    by: Array, values: dict[str, Array], mask: Array
+) -> dict[int, dict[str, float]]:
+    # by and values have one entry per row, rows outside of mask are skipped
+    keys, inverse = numpy.unique(by[mask], return_inverse=True)
+    counts = numpy.bincount(inverse, minlength=len(keys))
+    sums = {i: numpy.bincount(inverse, j[mask], len(keys)) for i, j in values.items()}
+    return {
+        int(key): {"count": int(counts[index])}
+        | {i: float(j[index]) for i, j in sums.items()}
+        for index, key in enumerate(keys)
+    }
@@ -168,7 +168,7 @@ class ConditionListCommand(
             embed=embeds.condition_list(
                 self.interaction,
                 utils.sort_models_by_id(
-                    cache.conditions,
+                    cache.conditions_view,
                     lambda x: x.owner_id == self.options.user.id
                     and x.can_use(self.interaction.user),
                 ),
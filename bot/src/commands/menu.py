@@ -303,7 +303,7 @@ class MenuListCommand(
             embed=embeds.menu_list(
                 self.interaction,
                 utils.sort_models_by_id(
-                    cache.menus, lambda x: x.guild_id == self.interaction.guild_id
+                    cache.menus_view, lambda x: x.guild_id == self.interaction.guild_id
                 ),
             )
         )
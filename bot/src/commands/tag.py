@@ -130,7 +130,7 @@ class TagListCommand(
         await self.interaction.respond_with_message(
             embed=embeds.tag_list(
                 self.interaction,
-                utils.sort_models_by_id(cache.tags, lambda x: x.can_use(user)),
+                utils.sort_models_by_id(cache.tags_view, lambda x: x.can_use(user)),
             ),
         )
 
@@ -207,7 +207,7 @@ class TicketConfigListCommand(
             embed=embeds.ticket_config_list(
                 self.interaction,
                 utils.sort_models_by_id(
-                    cache.ticket_configs,
+                    cache.ticket_configs_view,
                     lambda x: x.guild_id == self.interaction.guild_id,
                 ),
             ),
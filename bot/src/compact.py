@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import collections.abc
+import datetime
+import decimal
+import math
+import pickle  # nosec
+import tracemalloc
+import weakref
+from typing import TYPE_CHECKING
+
+import attrs
+import numpy
+
+from . import fixed, models
+from .columns import Columns
+
+__all__ = ("CompactTable", "benchmark")
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+    from typing import Any, Callable, Optional
+
+    Codec = tuple[
+        dict[str, str], Callable[[Any], tuple[Any, ...]], Callable[[Sequence[Any]], Any]
+    ]
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+MICROSECOND = datetime.timedelta(microseconds=1)
+# stands in for None in integer columns, float columns use nan
+NULL = int(numpy.iinfo(numpy.int64).min)
+MIN = NULL
+MAX = int(numpy.iinfo(numpy.int64).max)
+
+
+class CompactTable(collections.abc.MutableMapping):  # type: ignore
+    # a drop in replacement for the dict of a cache table that keeps the rows in
+    # typed columns keyed by id, rows are handed out as views that read and write
+    # their fields in the columns, every lookup of a row shares the same view while
+    # it's in use and a view keeps a copy of its row once the row is removed,
+    # decimals and fixed point numbers are kept as hundredths so they round trip
+    # exactly
+    __slots__ = ("cls", "columns", "codecs", "view", "views")
+
+    def __init__(self, cls: Any, /) -> None:
+        self.cls: Any = cls
+        # field name -> (columns, encode, decode)
+        self.codecs: dict[str, Codec] = {
+            i.name: codec(i.name, i.type)
+            for i in attrs.fields(cls)
+            if i.name in cls.FIELDS
+        }
+        self.columns: Columns = Columns(
+            {name: dtype for i in self.codecs.values() for name, dtype in i[0].items()}
+        )
+        self.view: Any = view_class(cls, self.codecs)
+        self.views: weakref.WeakValueDictionary[
+            int, Any
+        ] = weakref.WeakValueDictionary()
+
+    def __getitem__(self, id: int) -> Any:
+        if id not in self.columns:
+            raise KeyError(id)
+        return self.get_view(id)
+
+    def __setitem__(self, id: int, value: Any) -> None:
+        if value is self.views.get(id):
+            # the view already wrote its fields
+            return
+        self.columns.set_values(
+            id,
+            [
+                j
+                for name, (_, encode, _) in self.codecs.items()
+                for j in encode(getattr(value, name))
+            ],
+        )
+
+    def __delitem__(self, id: int) -> None:
+        if id not in self.columns:
+            raise KeyError(id)
+        self.detach((id,))
+        self.columns.remove(id)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.columns.ids())
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __contains__(self, id: object) -> bool:
+        return id in self.columns
+
+    def get(self, id: int, default: Any = None) -> Any:
+        return self.get_view(id) if id in self.columns else default
+
+    def get_view(self, id: int) -> Any:
+        view = self.views.get(id)
+        if view is None:
+            view = self.views[id] = object.__new__(self.view)
+            object.__setattr__(view, "_table", self)
+            object.__setattr__(view, "_id", id)
+            object.__setattr__(view, "_model", None)
+        return view
+
+    def clear(self) -> None:
+        self.detach(list(self.views.keys()))
+        self.columns.clear()
+
+    def detach(self, ids: Iterable[int]) -> None:
+        # views of rows that are about to be removed keep what they last read
+        for id in ids:
+            view = self.views.pop(id, None)
+            if view is not None:
+                object.__setattr__(view, "_model", self.decode(self.columns.row(id)))
+
+    def decode(self, row: Optional[int]) -> Any:
+        # a plain model with the values of the row
+        values = self.columns.read(row)  # type: ignore
+        kwargs: dict[str, Any] = {}
+        start = 0
+        for name, (columns, _, decode) in self.codecs.items():
+            kwargs[name] = decode(values[start : start + len(columns)])
+            start += len(columns)
+        return self.cls(**kwargs)
+
+    def remove_many(self, ids: Iterable[int]) -> None:
+        ids = list(ids)
+        self.detach([i for i in ids if i in self.columns])
+        self.columns.remove_many(ids)
+
+    def before(self, name: str, value: Any) -> list[int]:
+        # ids of the rows where a single column field is less than value, compared
+        # in the encoded column so no models are built, None is never less
+        (column,), encode, _ = self.codecs[name]
+        values = self.columns.get(column)
+        mask = values < encode(value)[0]
+        if values.dtype == numpy.int64:
+            mask &= values != NULL
+        return self.columns.get("id")[mask].tolist()  # type: ignore
+
+    def nbytes(self) -> int:
+        # the arrays and the id -> row index, not the objects in object columns
+        return self.columns.nbytes() + len(self) * 3 * 8
+
+
+def view_class(cls: Any, codecs: dict[str, Codec]) -> Any:
+    # a subclass of the model so it's used like one, calling it makes a plain
+    # model so attrs.evolve and the like copy the row out
+    def new(view: Any, *args: Any, **kwargs: Any) -> Any:
+        return cls(*args, **kwargs)
+
+    def reduce_ex(self: Any, protocol: int) -> Any:
+        # pickled as a plain model since the table can't go with it
+        return (build, (cls, attrs.asdict(materialize(self), recurse=False)))
+
+    namespace: dict[str, Any] = {
+        "__slots__": ("_table", "_id", "_model", "__weakref__"),
+        "__new__": new,
+        "__reduce_ex__": reduce_ex,
+    }
+    for name, (columns, encode, decode) in codecs.items():
+        namespace[name] = field_property(name, tuple(columns), encode, decode)
+    return type(cls.__name__, (cls,), namespace)
+
+
+def field_property(
+    name: str,
+    columns: tuple[str, ...],
+    encode: Callable[[Any], tuple[Any, ...]],
+    decode: Callable[[Sequence[Any]], Any],
+) -> property:
+    def getter(self: Any) -> Any:
+        model = self._model
+        if model is not None:
+            return getattr(model, name)
+        table = self._table.columns
+        return decode(table.read(table.row(self._id), columns))
+
+    def setter(self: Any, value: Any) -> None:
+        model = self._model
+        if model is not None:
+            setattr(model, name, value)
+            return
+        table = self._table.columns
+        table.write(table.row(self._id), columns, encode(value))
+
+    return property(getter, setter)
+
+
+def build(cls: Any, kwargs: dict[str, Any]) -> Any:
+    return cls(**kwargs)
+
+
+def materialize(value: Any) -> Any:
+    # a plain model with the current values of a view
+    if value._model is not None:
+        return attrs.evolve(value._model)
+    return value._table.decode(value._table.columns.row(value._id))
+
+
+def codec(name: str, annotation: Any) -> Codec:
+    # annotations are strings since the models use postponed evaluation
+    annotation = str(annotation)
+    if annotation.startswith("Optional["):
+        annotation = annotation[9:-1]
+    if annotation == "int":
+        return (
+            {name: "int64"},
+            lambda x: (NULL if x is None else x,),
+            lambda x: None if x[0] == NULL else int(x[0]),
+        )
+    elif annotation == "bool":
+        return (
+            {name: "int8"},
+            lambda x: (-1 if x is None else x,),
+            lambda x: None if x[0] == -1 else bool(x[0]),
+        )
+    elif annotation == "float":
+        return (
+            {name: "float64"},
+            lambda x: (math.nan if x is None else float(x),),
+            lambda x: None if math.isnan(x[0]) else float(x[0]),
+        )
+    elif annotation == "decimal.Decimal":
+        # numeric columns are unbounded so the few values that aren't whole
+        # hundredths are kept as they are in a column that's None otherwise
+        return (
+            {name: "int64", f"{name}.exact": "object"},
+            encode_decimal,
+            decode_decimal,
+        )
+    elif annotation == "fixed.Fixed":
+        # hundredths are stored as they are so these round trip exactly
+        return (
+            {name: "int64"},
+            lambda x: (NULL if x is None else x.value,),
+            lambda x: None if x[0] == NULL else fixed.Fixed(int(x[0])),
+        )
+    elif annotation == "datetime.datetime":
+        return (
+            {name: "int64"},
+            lambda x: (NULL if x is None else (x - EPOCH) // MICROSECOND,),
+            lambda x: None if x[0] == NULL else EPOCH + int(x[0]) * MICROSECOND,
+        )
+    elif annotation == "models.Resources":
+        names = [i.name for i in attrs.fields(models.Resources)]
+        return (
+            {f"{name}.{i}": "int64" for i in names},
+            lambda x: tuple(getattr(x, i).value for i in names),
+            lambda x: models.Resources(
+                **{i: fixed.Fixed(int(j)) for i, j in zip(names, x)}  # type: ignore
+            ),
+        )
+    # strings and enums are shared objects so they're kept by reference
+    return ({name: "object"}, lambda x: (x,), lambda x: x[0])
+
+
+def encode_decimal(value: Optional[decimal.Decimal]) -> tuple[int, Any]:
+    if value is None:
+        return (NULL, None)
+    if value.is_finite():
+        hundredths = value.scaleb(2)
+        if hundredths == hundredths.to_integral_value() and MIN < hundredths <= MAX:
+            return (int(hundredths), None)
+    return (0, value)
+
+
+def decode_decimal(values: Sequence[Any]) -> Optional[decimal.Decimal]:
+    hundredths, exact = values
+    if exact is not None:
+        return exact  # type: ignore
+    return None if hundredths == NULL else decimal.Decimal(int(hundredths)).scaleb(-2)
+
+
+def benchmark(cls: Any, values: Iterable[Any]) -> dict[str, int]:
+    # bytes allocated to hold the same rows in a dict of models and in a compact
+    # table, each layout gets its own copy of the rows so none of their values are
+    # shared, like rows loaded from the database
+    data = pickle.dumps(list(values))
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        rows = {i.id: i for i in pickle.loads(data)}  # nosec
+        dict_bytes = tracemalloc.get_traced_memory()[0] - start
+        del rows
+        start = tracemalloc.get_traced_memory()[0]
+        table = CompactTable(cls)
+        table.update((i.id, i) for i in pickle.loads(data))  # nosec
+        compact_bytes = tracemalloc.get_traced_memory()[0] - start
+        count = len(table)
+        del table
+    finally:
+        tracemalloc.stop()
+    return {"rows": count, "dict": dict_bytes, "compact": compact_bytes}
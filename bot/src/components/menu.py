@@ -234,7 +234,7 @@ class MenuInterfaceButton(CommonButton, checks=[checks.button_guild_only]):
             and i.channel_id == i.channel_id
             and i.message_id == (interaction.message and interaction.message.id)
             and i.menu_id == item.menu_id
-            for i in cache.menu_interfaces
+            for i in cache.menu_interfaces_view
         ):
             return
         if item.action is enums.MenuItemAction.ADD_ROLES:
@@ -6,6 +6,8 @@ __all__ = (
     "MAX_AIRCRAFT_PER_CITY",
     "MAX_SHIPS_PER_CITY",
     "MAX_MIL_PER_CITY",
+    "WAR_RANGE_MIN",
+    "WAR_RANGE_MAX",
 )
 
 MAX_SOLDIERS_PER_CITY = 15000
@@ -19,3 +21,8 @@ MAX_MIL_PER_CITY = {
     "aircraft": MAX_AIRCRAFT_PER_CITY,
     "ships": MAX_SHIPS_PER_CITY,
 }
+
+WAR_RANGE_MIN = 0.75
+WAR_RANGE_MAX = 1.75
+WAR_RANGE_MIN_PERCENT = 75
+WAR_RANGE_MAX_PERCENT = 175
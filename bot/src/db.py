@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+import collections
 import json
+import time
 from typing import TYPE_CHECKING
 
 import asyncpg
@@ -8,13 +11,54 @@ import asyncpg
 from .bot import bot
 from .env import DB_HOST, DB_NAME, DB_PASSWORD, DB_PORT, DB_USER
 
-__all__ = ("query",)
+__all__ = (
+    "query",
+    "execute",
+    "execute_many",
+    "register",
+    "statement_stats",
+    "load_stats",
+    "stream",
+    "load",
+)
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
-    from typing import Any
+    from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+    from typing import Any, Optional
 
-    from asyncpg import Connection, Pool
+    from asyncpg import Pool
+    from asyncpg.prepared_stmt import PreparedStatement
+
+
+class Connection(asyncpg.Connection):
+    # registered statements prepared on this connection, keyed by name
+    __slots__ = ("statements",)
+
+    statements: dict[str, PreparedStatement]
+
+
+class StatementStats:
+    __slots__ = ("count", "rows", "latencies")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.rows: int = 0
+        # only the most recent latencies are kept for the percentiles
+        self.latencies: collections.deque[float] = collections.deque(maxlen=1024)
+
+    def record(self, latency: float, rows: int) -> None:
+        self.count += 1
+        self.rows += rows
+        self.latencies.append(latency)
+
+    def to_dict(self) -> dict[str, float]:
+        latencies = sorted(self.latencies)
+        return {
+            "count": self.count,
+            "rows": self.rows,
+            "p50": latencies[int(0.5 * (len(latencies) - 1))] if latencies else 0.0,
+            "p99": latencies[int(0.99 * (len(latencies) - 1))] if latencies else 0.0,
+        }
 
 
 async def init(conn: Connection) -> Connection:
@@ -24,6 +68,14 @@ async def init(conn: Connection) -> Connection:
     return conn
 
 
+async def init_pool(conn: Connection) -> Connection:
+    await init(conn)
+    conn.statements = {}
+    for name in PREPARE:
+        conn.statements[name] = await conn.prepare(STATEMENTS[name])
+    return conn
+
+
 async def create_pool() -> Pool:
     global POOL
     POOL = await asyncpg.create_pool(  # type: ignore
@@ -32,7 +84,8 @@ async def create_pool() -> Pool:
         user=DB_USER,
         password=DB_PASSWORD,
         database=DB_NAME,
-        init=init,
+        init=init_pool,
+        connection_class=Connection,
     )
     return POOL
 
@@ -45,22 +98,146 @@ async def create_notify_connection() -> Connection:
         user=DB_USER,
         password=DB_PASSWORD,
         database=DB_NAME,
+        connection_class=Connection,
     )
     await init(NOTIFY_CONNECTION)
+    NOTIFY_CONNECTION.statements = {}
     for channel, callback in listeners.items():
         await NOTIFY_CONNECTION.add_listener(channel, callback)  # type: ignore
     return NOTIFY_CONNECTION
 
 
-async def query(query: str, *args: Any) -> Any:
+async def query(query: str, *args: Any, name: str = "query") -> Any:
+    start = time.perf_counter()
     # type is partially unknown
-    return await POOL.fetch(query, *args)  # type: ignore
+    rows = await POOL.fetch(query, *args)  # type: ignore
+    record(name, start, len(rows))  # type: ignore
+    return rows  # type: ignore
+
+
+def register(name: str, query: str, prepare: bool = False) -> None:
+    # statements are prepared the first time a connection runs them, or when the
+    # connection is created if prepare is set and they're registered before then
+    STATEMENTS[name] = query
+    if prepare:
+        PREPARE.add(name)
+
+
+async def prepared(conn: Connection, name: str) -> PreparedStatement:
+    try:
+        return conn.statements[name]
+    except KeyError:
+        statement = conn.statements[name] = await conn.prepare(STATEMENTS[name])
+        return statement
+
+
+async def execute(name: str, *args: Any) -> Any:
+    async with POOL.acquire() as conn:  # type: ignore
+        statement = await prepared(conn, name)  # type: ignore
+        start = time.perf_counter()
+        rows = await statement.fetch(*args)
+    record(name, start, len(rows))
+    return rows
+
+
+async def execute_many(name: str, args: Iterable[Sequence[Any]]) -> None:
+    args = list(args)
+    async with POOL.acquire() as conn:  # type: ignore
+        statement = await prepared(conn, name)  # type: ignore
+        start = time.perf_counter()
+        await statement.executemany(args)
+    record(name, start, len(args))
+
+
+def record(name: str, start: float, rows: int) -> None:
+    try:
+        stats = STATS[name]
+    except KeyError:
+        stats = STATS[name] = StatementStats()
+    stats.record(time.perf_counter() - start, rows)
+
+
+def statement_stats() -> dict[str, dict[str, float]]:
+    # unregistered queries are keyed by the name they're run with, the text of
+    # generated queries varies so it would add a new entry for each one
+    return {name: stats.to_dict() for name, stats in STATS.items()}
+
+
+def load_stats() -> dict[str, dict[str, float]]:
+    return {
+        table: {
+            "rows": rows,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(rows / seconds) if seconds else 0,
+        }
+        for table, (rows, seconds) in LOAD_STATS.items()
+    }
+
+
+async def stream(query: str, *args: Any, chunk_size: int = 10000) -> AsyncIterator[Any]:
+    # server side cursor so only one chunk of rows is held in memory at a time,
+    # each one holds a connection and a transaction until it's done so only a few
+    # run at once and the rest of the pool is left for everything else
+    async with CURSORS, POOL.acquire() as conn:  # type: ignore
+        async with conn.transaction():
+            cursor = await conn.cursor(query, *args)
+            while rows := await cursor.fetch(chunk_size):
+                yield rows
+
+
+async def load(
+    cls: Any,
+    *,
+    chunk_size: int = 10000,
+    keyset: Optional[bool] = None,
+    after: int = -(2**63),
+) -> AsyncIterator[list[Any]]:
+    # yields chunks of models built straight from the row tuples, keyset pages
+    # through the table by id instead of holding a cursor open for the whole load,
+    # starting after the given id, it's used unless the table has no id column
+    fields = ", ".join(f'"{i}"' for i in cls.FIELDS)
+    if keyset is None:
+        keyset = "id" in cls.FIELDS
+    count = 0
+    start = time.perf_counter()
+    if keyset:
+        last = after
+        while True:
+            rows = await query(
+                f"SELECT {fields} FROM {cls.TABLE} WHERE id > $1 ORDER BY id LIMIT $2;",  # nosec
+                last,
+                chunk_size,
+                name=f"{cls.TABLE}.load",
+            )
+            if not rows:
+                break
+            count += len(rows)
+            models = [cls.from_row(i) for i in rows]
+            last = models[-1].id
+            yield models
+            if len(rows) < chunk_size:
+                break
+    else:
+        async for rows in stream(
+            f"SELECT {fields} FROM {cls.TABLE};", chunk_size=chunk_size  # nosec
+        ):
+            count += len(rows)
+            yield [cls.from_row(i) for i in rows]
+    elapsed = time.perf_counter() - start
+    LOAD_STATS[cls.TABLE] = (count, elapsed)
 
 
 def standard_dispatch(conn: Connection, pid: int, channel: str, payload: str) -> None:
     bot.dispatch(channel, json.loads(payload))
 
 
+STATEMENTS: dict[str, str] = {}
+PREPARE: set[str] = set()
+STATS: dict[str, StatementStats] = {}
+# table -> (rows, seconds) of the last load
+LOAD_STATS: dict[str, tuple[int, float]] = {}
+# open server side cursors
+CURSORS = asyncio.Semaphore(2)
 listeners: dict[str, Callable[[Connection, int, str, Any], None]] = {}
 # will not be None after init
 POOL: Pool = None  # type: ignore
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import decimal
 from typing import TYPE_CHECKING
 
 import quarrel
 
-from .. import cache, consts, enums, models, strings, utils
+from .. import consts, enums, models, strings, utils
 
 __all__ = (
     "not_found_error",
@@ -132,9 +131,7 @@ def nation(interaction: quarrel.Interaction, nation: models.Nation) -> quarrel.E
 def alliance(
     interaction: quarrel.Interaction, alliance: models.Alliance
 ) -> quarrel.Embed:
-    members = alliance.members
-    member_ids = {i.id for i in members}
-    cities = {i for i in cache.cities if i.nation_id in member_ids}
+    aggregate = alliance.aggregate
     return utils.build_single_embed_from_user(
         author=interaction.user,
         color=consts.INFO_EMBED_COLOR,
@@ -161,7 +158,7 @@ def alliance(
             ),
             utils.embed_field(
                 "Members",
-                f"{len(members):,}",
+                f"{aggregate['nations']:,.0f}",
             ),
             utils.embed_field(
                 "Applicants",
@@ -185,7 +182,7 @@ def alliance(
             ),
             utils.embed_field(
                 "Vacation Mode",
-                len([i for i in members if i.vacation_mode_turns]),
+                f"{aggregate['vacation_mode']:,.0f}",
             ),
             utils.embed_field(
                 "Treasures",
@@ -193,20 +190,32 @@ def alliance(
             ),
             utils.embed_field(
                 "Average Cities",
-                f"{sum(i.num_cities for i in members)/len(members):,.2f}",
+                f"{average(aggregate['num_cities'], aggregate['nations']):,.2f}",
             ),
             utils.embed_field(
                 "Average Infrastructure",
-                f"{sum((i.infrastructure for i in cities), start=decimal.Decimal())/len(cities):,.2f}",
+                f"{average(aggregate['infrastructure'], aggregate['cities']):,.2f}",
             ),
             utils.embed_field(
                 "Average Score",
-                f"{sum((i.score for i in members), start=decimal.Decimal())/len(members):,.2f}",
+                f"{average(aggregate['score'], aggregate['nations']):,.2f}",
+            ),
+            utils.embed_field(
+                "Militarization",
+                "\n".join(
+                    f"{key.capitalize()}: {value:,.2%}"
+                    for key, value in utils.militarization(aggregate).items()
+                ),
             ),
         ],
     )
 
 
+def average(total: float, count: float) -> float:
+    # alliances can have no members or cities
+    return total / count if count else 0.0
+
+
 def user_already_linked(
     interaction: quarrel.Interaction, user: MemberOrUser
 ) -> quarrel.Embed:
@@ -30,6 +30,12 @@ DB_PORT = int(os.environ["DB_PORT"])
 DB_USER = os.environ["DB_USER"]
 DB_PASSWORD = os.environ["DB_PASSWORD"]
 DB_NAME = os.environ["DB_NAME"]
+# keeps the big pnw tables in typed columns, see src/compact.py
+COMPACT_CACHE = os.environ.get("COMPACT_CACHE", "false").lower() == "true"
+# days of war attacks, trades and bankrecs kept in memory and the most rows kept
+# of each, older rows are read from the database, 0 keeps everything
+HISTORY_RETENTION_DAYS = float(os.environ.get("HISTORY_RETENTION_DAYS", "0"))
+HISTORY_RETENTION_COUNT = int(os.environ.get("HISTORY_RETENTION_COUNT", "0"))
 
 kit = pnwkit.QueryKit(
     api_key=PNW_API_KEY,
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import decimal
+import operator
+from typing import TYPE_CHECKING
+
+import numpy
+
+__all__ = ("Fixed", "fixed_array", "fixed_sum")
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing import Any, Callable, Optional, Union
+
+    Number = Union["Fixed", decimal.Decimal, int, float]
+
+SCALE = 100
+HUNDREDTH = decimal.Decimal("0.01")
+
+
+class Fixed:
+    # a number kept as an integer count of hundredths, adding, subtracting and
+    # comparing two of them is integer math and anything else falls back to
+    # decimals, or floats when the other value is a float
+    __slots__ = ("value",)
+
+    def __init__(self, value: int = 0, /) -> None:
+        self.value: int = value
+
+    @classmethod
+    def from_number(cls, value: Any, /) -> Fixed:
+        # exact for anything with at most two decimal places, e.g. numeric columns
+        # and the api, anything finer is rounded half to even
+        if isinstance(value, Fixed):
+            return value
+        if isinstance(value, int):
+            return cls(value * SCALE)
+        if isinstance(value, float):
+            return cls(round(value * SCALE))
+        return cls(
+            int(decimal.Decimal(value).quantize(HUNDREDTH).scaleb(2))  # type: ignore
+        )
+
+    def to_decimal(self) -> decimal.Decimal:
+        return decimal.Decimal(self.value).scaleb(-2)
+
+    def __float__(self) -> float:
+        return self.value / SCALE
+
+    def __int__(self) -> int:
+        return int(self.value / SCALE)
+
+    def __bool__(self) -> bool:
+        return self.value != 0
+
+    def __hash__(self) -> int:
+        # equal to a decimal with the same value so it has to hash the same
+        return hash(self.to_decimal())
+
+    def __str__(self) -> str:
+        return str(self.to_decimal())
+
+    def __repr__(self) -> str:
+        return f"Fixed('{self}')"
+
+    def __format__(self, format_spec: str) -> str:
+        return format(self.to_decimal(), format_spec)
+
+    def __getstate__(self) -> int:
+        return self.value
+
+    def __setstate__(self, state: int) -> None:
+        self.value = state
+
+    def __neg__(self) -> Fixed:
+        return Fixed(-self.value)
+
+    def __pos__(self) -> Fixed:
+        return self
+
+    def __abs__(self) -> Fixed:
+        return Fixed(abs(self.value))
+
+    def __add__(self, other: Any) -> Any:
+        if isinstance(other, Fixed):
+            return Fixed(self.value + other.value)
+        if isinstance(other, (int, decimal.Decimal)):
+            return Fixed(self.value + exact(other))
+        return self.fallback(operator.add, other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Any) -> Any:
+        if isinstance(other, Fixed):
+            return Fixed(self.value - other.value)
+        if isinstance(other, (int, decimal.Decimal)):
+            return Fixed(self.value - exact(other))
+        return self.fallback(operator.sub, other)
+
+    def __rsub__(self, other: Any) -> Any:
+        return -self + other
+
+    def __mul__(self, other: Any) -> Any:
+        if isinstance(other, int) and not isinstance(other, bool):
+            return Fixed(self.value * other)
+        return self.fallback(operator.mul, other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Any) -> Any:
+        return self.fallback(operator.truediv, other)
+
+    def __rtruediv__(self, other: Any) -> Any:
+        return self.fallback(operator.truediv, other, True)
+
+    def __floordiv__(self, other: Any) -> Any:
+        return self.fallback(operator.floordiv, other)
+
+    def __rfloordiv__(self, other: Any) -> Any:
+        return self.fallback(operator.floordiv, other, True)
+
+    def __mod__(self, other: Any) -> Any:
+        return self.fallback(operator.mod, other)
+
+    def __rmod__(self, other: Any) -> Any:
+        return self.fallback(operator.mod, other, True)
+
+    def __pow__(self, other: Any) -> Any:
+        return self.fallback(operator.pow, other)
+
+    def __rpow__(self, other: Any) -> Any:
+        return self.fallback(operator.pow, other, True)
+
+    def __round__(self, ndigits: Optional[int] = None) -> Any:
+        if ndigits is None:
+            return round(self.to_decimal())
+        return round(self.to_decimal(), ndigits)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Fixed):
+            return self.value == other.value
+        return self.compare(operator.eq, other)
+
+    def __lt__(self, other: Any) -> bool:
+        if isinstance(other, Fixed):
+            return self.value < other.value
+        return self.compare(operator.lt, other)
+
+    def __le__(self, other: Any) -> bool:
+        if isinstance(other, Fixed):
+            return self.value <= other.value
+        return self.compare(operator.le, other)
+
+    def __gt__(self, other: Any) -> bool:
+        if isinstance(other, Fixed):
+            return self.value > other.value
+        return self.compare(operator.gt, other)
+
+    def __ge__(self, other: Any) -> bool:
+        if isinstance(other, Fixed):
+            return self.value >= other.value
+        return self.compare(operator.ge, other)
+
+    def compare(self, function: Callable[[Any, Any], bool], other: Any) -> Any:
+        if isinstance(other, float):
+            return function(self.value / SCALE, other)
+        if isinstance(other, (int, decimal.Decimal)):
+            return function(self.value, other * SCALE)
+        return NotImplemented
+
+    def fallback(
+        self, function: Callable[[Any, Any], Any], other: Any, reflected: bool = False
+    ) -> Any:
+        if isinstance(other, float):
+            value: Any = self.value / SCALE
+        elif isinstance(other, (Fixed, int, decimal.Decimal)):
+            value = self.to_decimal()
+            if isinstance(other, Fixed):
+                other = other.to_decimal()
+        else:
+            return NotImplemented
+        return function(other, value) if reflected else function(value, other)
+
+
+def exact(value: Union[int, decimal.Decimal]) -> int:
+    # hundredths of a value added to or subtracted from a fixed point number,
+    # rounding a finer decimal would lose part of it without anyone noticing
+    if isinstance(value, int):
+        return value * SCALE
+    hundredths = value.scaleb(2)
+    if not hundredths.is_finite() or hundredths != hundredths.to_integral_value():
+        raise ValueError(f"{value} has more than two decimal places")
+    return int(hundredths)
+
+
+def fixed_sum(values: Iterable[Fixed]) -> Fixed:
+    return Fixed(sum([i.value for i in values]))
+
+
+def fixed_array(values: Iterable[Number]) -> numpy.ndarray[Any, Any]:
+    # hundredths as int64, sum the array and wrap it in Fixed to get a total
+    return numpy.fromiter(
+        (Fixed.from_number(i).value for i in values), dtype=numpy.int64
+    )
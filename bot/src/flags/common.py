@@ -16,7 +16,8 @@ class CommonFlags:
     __slots__ = ("flags",)
 
     def __init__(self, flags: int = 0) -> None:
-        self.flags: int = flags
+        # attrs converters can pass an existing instance, e.g. in attrs.evolve
+        self.flags: int = int(flags)
 
     @classmethod
     def from_kwargs(cls, **kwargs: bool) -> CommonFlags:
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING
+
+import attrs
+
+__all__ = ("bytes_saved", "enum", "interned_fields", "string")
+
+if TYPE_CHECKING:
+    import enum as enum_
+    from collections.abc import Iterable
+    from typing import Any, Callable, Optional, TypeVar
+
+    E = TypeVar("E", bound=enum_.Enum)
+
+# enum class -> {value or member: member}, shared by every model using the enum
+ENUMS: dict[Any, dict[Any, Any]] = {}
+
+
+def string(value: Optional[str]) -> Optional[str]:
+    # equal strings loaded from different rows and payloads share one object, the
+    # interpreter frees interned strings once nothing refers to them
+    return value if value is None else sys.intern(value)
+
+
+def enum(cls: type[E]) -> Callable[[Any], E]:
+    # a converter that looks members up in a dict instead of going through
+    # EnumMeta.__call__, invalid values still raise the enum's ValueError
+    try:
+        members = ENUMS[cls]
+    except KeyError:
+        members = ENUMS[cls] = {}
+        for i in cls.__members__.values():
+            members[i.value] = i
+            members[i] = i
+
+    def convert(value: Any) -> E:
+        try:
+            return members[value]
+        except (KeyError, TypeError):
+            return cls(value)
+
+    return convert
+
+
+def interned_fields(cls: Any) -> tuple[str, ...]:
+    return tuple(i.name for i in attrs.fields(cls) if i.converter is string)
+
+
+def bytes_saved(values: Iterable[Any], fields: Iterable[str]) -> int:
+    # bytes the strings would take if every model had its own copy less the bytes
+    # they take shared, empty and one character strings are always shared so
+    # they're skipped
+    fields = tuple(fields)
+    seen: set[int] = set()
+    total = shared = 0
+    for i in values:
+        for name in fields:
+            value = getattr(i, name)
+            if value is None or len(value) < 2:
+                continue
+            size = sys.getsizeof(value)
+            total += size
+            if id(value) not in seen:
+                seen.add(id(value))
+                shared += size
+    return total - shared
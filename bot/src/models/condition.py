@@ -81,7 +81,7 @@ class Condition:
             command.interaction,
             value,
             cache.get_condition,
-            cache.conditions,
+            cache.conditions_view,
             "name",
             errors.ConditionNotFoundError,
             can_use=True,
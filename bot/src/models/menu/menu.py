@@ -50,7 +50,7 @@ class Menu:
 
     @property
     def interfaces(self) -> set[models.MenuInterface]:
-        return {i for i in cache.menu_interfaces if i.menu_id == self.id}
+        return {i for i in cache.menu_interfaces_view if i.menu_id == self.id}
 
     @classmethod
     async def convert(cls, command: CommonSlashCommand[Any], value: str) -> Menu:
@@ -59,7 +59,7 @@ class Menu:
             command.interaction,
             value,
             cache.get_menu,
-            {i for i in cache.menus if i.guild_id == command.interaction.guild_id},
+            {i for i in cache.menus_view if i.guild_id == command.interaction.guild_id},
             "name",
             errors.MenuNotFoundError,
         )
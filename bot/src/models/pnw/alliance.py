@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING
 import attrs
 import quarrel
 
-from ... import cache, embeds, enums, errors, models, utils
+from ... import cache, embeds, enums, errors, fixed, intern, models, utils
 
 __all__ = ("Alliance",)
 
@@ -25,15 +25,16 @@ class Alliance:
     TABLE: ClassVar[str] = "alliances"
     INCREMENT: ClassVar[tuple[str, ...]] = ()
     ENUMS: ClassVar[tuple[str, ...]] = ("color",)
+    FIXED: ClassVar[tuple[str, ...]] = ("score",)
     NO_UPDATE: ClassVar[tuple[str, ...]] = ("estimated_resources",)
     id: int
     name: str
     acronym: str
-    score: decimal.Decimal
-    color: enums.Color = attrs.field(converter=enums.Color)
+    score: fixed.Fixed = attrs.field(converter=fixed.Fixed.from_number)
+    color: enums.Color = attrs.field(converter=intern.enum(enums.Color))
     date: datetime.datetime
     accepts_members: bool
-    flag: str
+    flag: str = attrs.field(converter=intern.string)
     forum_link: str
     discord_link: str
     wiki_link: str
@@ -76,45 +77,41 @@ class Alliance:
             estimated_resources=models.Resources(),
         )
 
+    @property
+    def aggregate(self) -> dict[str, float]:
+        return cache.get_alliance_aggregate(self.id)
+
     @property
     def applicants(self) -> set[models.Nation]:
         return {
             i
-            for i in cache.nations
-            if i.alliance_id == self.id
-            and i.alliance_position is enums.AlliancePosition.APPLICANT
+            for i in cache.get_nations_by_alliance(self.id)
+            if i.alliance_position is enums.AlliancePosition.APPLICANT
         }
 
     @property
     def leaders(self) -> set[models.Nation]:
         return {
             i
-            for i in cache.nations
-            if i.alliance_id == self.id
-            and i.alliance_position is enums.AlliancePosition.LEADER
+            for i in cache.get_nations_by_alliance(self.id)
+            if i.alliance_position is enums.AlliancePosition.LEADER
         }
 
     @property
     def members(self) -> set[models.Nation]:
         return {
             i
-            for i in cache.nations
-            if i.alliance_id == self.id and i.alliance_position.value >= 2
+            for i in cache.get_nations_by_alliance(self.id)
+            if i.alliance_position.value >= 2
         }
 
     @property
     def rank(self) -> int:
-        return (
-            sorted(cache.alliances, key=lambda x: x.score, reverse=True).index(self) + 1
-        )
+        return cache.get_alliance_rank(self)
 
     @property
     def treasures(self) -> set[models.Treasure]:
-        return {
-            i
-            for i in cache.treasures
-            if (n := i.nation) is not None and n.alliance_id == self.id
-        }
+        return {j for i in cache.get_nations_by_alliance(self.id) for j in i.treasures}
 
     @classmethod
     async def convert(cls, command: CommonSlashCommand[Any], value: str) -> Alliance:
@@ -123,7 +120,7 @@ class Alliance:
             command.interaction,
             value,
             cache.get_alliance,
-            cache.alliances,
+            cache.alliances_view,
             {"name", "acronym"},
             errors.AllianceNotFoundError,
         )
@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 
 import attrs
 
-from ... import enums, models, utils
+from ... import enums, intern, models, utils
 
 __all__ = ("Bankrec",)
 
@@ -26,14 +26,14 @@ class Bankrec:
     date: datetime.datetime
     sender_id: int
     sender_type: enums.BankrecParticipantType = attrs.field(
-        converter=enums.BankrecParticipantType
+        converter=intern.enum(enums.BankrecParticipantType)
     )
     receiver_id: int
     receiver_type: enums.BankrecParticipantType = attrs.field(
-        converter=enums.BankrecParticipantType
+        converter=intern.enum(enums.BankrecParticipantType)
     )
     banker_id: int
-    note: str
+    note: str = attrs.field(converter=intern.string)
     resources: models.Resources = attrs.field(
         converter=lambda x: models.Resources.from_dict(x)
     )
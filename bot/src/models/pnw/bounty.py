@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 
 import attrs
 
-from ... import enums, utils
+from ... import enums, intern, utils
 
 __all__ = ("Bounty",)
 
@@ -25,7 +25,7 @@ class Bounty:
     date: datetime.datetime
     nation_id: int
     amount: int
-    type: enums.BountyType = attrs.field(converter=enums.BountyType)
+    type: enums.BountyType = attrs.field(converter=intern.enum(enums.BountyType))
 
     async def save(self, insert: bool = False) -> None:
         ...
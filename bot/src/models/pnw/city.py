@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 
 import attrs
 
-from ... import utils
+from ... import fixed, utils
 
 __all__ = ("City",)
 
@@ -21,13 +21,21 @@ if TYPE_CHECKING:
 class City:
     TABLE: ClassVar[str] = "cities"
     INCREMENT: ClassVar[tuple[str, ...]] = ()
+    FIXED: ClassVar[tuple[str, ...]] = ("infrastructure", "land")
     NO_UPDATE: ClassVar[tuple[str, ...]] = ("powered",)
+    # dtypes of the cache column snapshot
+    COLUMNS: ClassVar[dict[str, str]] = {
+        "id": "int64",
+        "nation_id": "int64",
+        "infrastructure": "float64",
+        "land": "float64",
+    }
     id: int
     nation_id: int
     name: str
     date: datetime.datetime
-    infrastructure: decimal.Decimal
-    land: decimal.Decimal
+    infrastructure: fixed.Fixed = attrs.field(converter=fixed.Fixed.from_number)
+    land: fixed.Fixed = attrs.field(converter=fixed.Fixed.from_number)
     powered: bool
     coal_power: int
     oil_power: int
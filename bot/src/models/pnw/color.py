@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING
 
 import attrs
 
-from ... import enums, utils
+from ... import enums, intern, utils
 
 __all__ = ("Color",)
 
@@ -21,7 +21,7 @@ class Color:
     PRIMARY_KEY: ClassVar[tuple[str]] = ("color",)
     INCREMENT: ClassVar[tuple[str, ...]] = ()
     ENUMS: ClassVar[tuple[str, ...]] = ("color",)
-    color: enums.Color = attrs.field(converter=enums.Color)
+    color: enums.Color = attrs.field(converter=intern.enum(enums.Color))
     bloc_name: str
     turn_bonus: int
 
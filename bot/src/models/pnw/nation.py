@@ -7,7 +7,19 @@ from typing import TYPE_CHECKING
 import attrs
 import quarrel
 
-from ... import cache, components, embeds, enums, errors, flags, models, utils
+from ... import (
+    cache,
+    components,
+    consts,
+    embeds,
+    enums,
+    errors,
+    fixed,
+    flags,
+    intern,
+    models,
+    utils,
+)
 
 __all__ = ("Nation",)
 
@@ -32,22 +44,46 @@ class Nation:
         "color",
     )
     FLAGS: ClassVar[tuple[str, ...]] = ("projects",)
+    FIXED: ClassVar[tuple[str, ...]] = ("score",)
     NO_UPDATE: ClassVar[tuple[str, ...]] = ("estimated_resources", "last_active")
+    # numeric lang attributes and their dtypes in the cache column snapshot, these
+    # can also be evaluated as columns with lang.evaluate_batch
+    COLUMNS: ClassVar[dict[str, str]] = {
+        "id": "int64",
+        "alliance_id": "int64",
+        "num_cities": "int32",
+        "score": "float64",
+        "vacation_mode_turns": "int32",
+        "beige_turns": "int32",
+        "soldiers": "int32",
+        "tanks": "int32",
+        "aircraft": "int32",
+        "ships": "int32",
+        "missiles": "int32",
+        "nukes": "int32",
+        "turns_since_last_city": "int32",
+        "turns_since_last_project": "int32",
+        "wars_won": "int32",
+        "wars_lost": "int32",
+        "alliance_seniority": "int32",
+    }
     id: int
     alliance_id: int
     alliance_position: enums.AlliancePosition = attrs.field(
-        converter=enums.AlliancePosition
+        converter=intern.enum(enums.AlliancePosition)
     )
     name: str
     leader: str
-    continent: enums.Continent = attrs.field(converter=enums.Continent)
-    war_policy: enums.WarPolicy = attrs.field(converter=enums.WarPolicy)
-    domestic_policy: enums.DomesticPolicy = attrs.field(converter=enums.DomesticPolicy)
+    continent: enums.Continent = attrs.field(converter=intern.enum(enums.Continent))
+    war_policy: enums.WarPolicy = attrs.field(converter=intern.enum(enums.WarPolicy))
+    domestic_policy: enums.DomesticPolicy = attrs.field(
+        converter=intern.enum(enums.DomesticPolicy)
+    )
     # TODO: When color data is available, convert to models.Color instead
-    color: enums.Color = attrs.field(converter=enums.Color)
+    color: enums.Color = attrs.field(converter=intern.enum(enums.Color))
     num_cities: int
-    score: decimal.Decimal
-    flag: str
+    score: fixed.Fixed = attrs.field(converter=fixed.Fixed.from_number)
+    flag: str = attrs.field(converter=intern.string)
     vacation_mode_turns: int
     beige_turns: int
     espionage_available: bool
@@ -59,7 +95,7 @@ class Nation:
     ships: int
     missiles: int
     nukes: int
-    discord_username: str
+    discord_username: str = attrs.field(converter=intern.string)
     turns_since_last_city: int
     turns_since_last_project: int
     projects: flags.Projects = attrs.field(converter=flags.Projects)
@@ -181,25 +217,32 @@ class Nation:
     @property
     def average_infrastructure(self) -> decimal.Decimal:
         return (
-            sum((i.infrastructure for i in self.cities), start=decimal.Decimal())
+            fixed.fixed_sum(i.infrastructure for i in self.cities).to_decimal()
             / self.num_cities
         )
 
     @property
     def average_land(self) -> decimal.Decimal:
         return (
-            sum((i.land for i in self.cities), start=decimal.Decimal())
-            / self.num_cities
+            fixed.fixed_sum(i.land for i in self.cities).to_decimal() / self.num_cities
         )
 
     @property
     def cities(self) -> set[models.City]:
-        return {i for i in cache.cities if i.nation_id == self.id}
+        return cache.get_cities_by_nation(self.id)
+
+    @property
+    def treasures(self) -> set[models.Treasure]:
+        return cache.get_treasures_by_nation(self.id)
 
     @property
     def user(self) -> Optional[models.User]:
         return cache.get_user(self.id)
 
+    @property
+    def wars(self) -> set[models.War]:
+        return cache.get_wars_by_nation(self.id)
+
     @classmethod
     async def convert(cls, command: CommonSlashCommand[Any], value: str) -> Nation:
         return utils.convert_model(
@@ -207,7 +250,7 @@ class Nation:
             command.interaction,
             value,
             cache.get_nation,
-            cache.nations,
+            cache.nations_view,
             {"name", "leader"},
             errors.NationNotFoundError,
         )
@@ -222,5 +265,28 @@ class Nation:
         return (
             self.id != other.id
             and self.alliance_id != other.alliance_id
-            and float(self.score) * 1.75 > other.score > float(self.score) * 0.75
+            # whole percents of whole hundredths so there's no rounding at the edges
+            and self.score.value * consts.WAR_RANGE_MAX_PERCENT
+            > other.score.value * 100
+            > self.score.value * consts.WAR_RANGE_MIN_PERCENT
         )
+
+    def nations_in_range(self) -> list[Nation]:
+        score = float(self.score)
+        return [
+            i
+            for i in cache.get_nations_by_score(
+                score * consts.WAR_RANGE_MIN, score * consts.WAR_RANGE_MAX
+            )
+            if self.can_declare_war_on(i)
+        ]
+
+    def nations_in_range_of(self) -> list[Nation]:
+        score = float(self.score)
+        return [
+            i
+            for i in cache.get_nations_by_score(
+                score / consts.WAR_RANGE_MAX, score / consts.WAR_RANGE_MIN
+            )
+            if i.can_declare_war_on(self)
+        ]
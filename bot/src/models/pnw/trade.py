@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING
 
 import attrs
 
-from ... import enums, utils
+from ... import enums, intern, utils
 
 __all__ = ("Trade",)
 
@@ -22,13 +22,13 @@ class Trade:
     INCREMENT: ClassVar[tuple[str, ...]] = ()
     ENUMS: ClassVar[tuple[str, ...]] = ("type", "action")
     id: int
-    type: enums.TradeType = attrs.field(converter=enums.TradeType)
+    type: enums.TradeType = attrs.field(converter=intern.enum(enums.TradeType))
     date: datetime.datetime
     sender_id: int
     receiver_id: int
-    resource: enums.Resource
+    resource: enums.Resource = attrs.field(converter=intern.enum(enums.Resource))
     amount: int
-    action: enums.TradeAction
+    action: enums.TradeAction = attrs.field(converter=intern.enum(enums.TradeAction))
     price: int
     accepted: bool
     date_accepted: datetime.datetime
@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING
 
 import attrs
 
-from ... import enums, utils
+from ... import enums, intern, utils
 
 __all__ = ("War",)
 
@@ -24,8 +24,8 @@ class War:
     ENUMS: ClassVar[tuple[str, ...]] = ("type",)
     id: int
     date: datetime.datetime
-    reason: str
-    type: enums.WarType
+    reason: str = attrs.field(converter=intern.string)
+    type: enums.WarType = attrs.field(converter=intern.enum(enums.WarType))
     attacker_id: int
     attacker_alliance_id: int
     defender_id: int
@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING
 
 import attrs
 
-from ... import enums, utils
+from ... import enums, intern, utils
 
 __all__ = ("WarAttack",)
 
@@ -26,7 +26,7 @@ class WarAttack:
     date: datetime.datetime
     attacker_id: int
     defender_id: int
-    type: enums.WarAttackType
+    type: enums.WarAttackType = attrs.field(converter=intern.enum(enums.WarAttackType))
     war_id: int
     victor_id: int
     success: int
@@ -38,7 +38,7 @@ class WarAttack:
     infrastructure_destroyed: decimal.Decimal
     improvements_lost: int
     money_stolen: decimal.Decimal
-    loot_info: str
+    loot_info: str = attrs.field(converter=intern.string)
     resistance_eliminated: int
     city_infrastructure_before: decimal.Decimal
     infrastructure_destroyed_value: decimal.Decimal
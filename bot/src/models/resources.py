@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-import decimal
 from typing import TYPE_CHECKING
 
 import attrs
 
+from .. import fixed
+
 __all__ = ("Resources",)
 
 if TYPE_CHECKING:
+    import decimal
     from typing import Generator
 
     from ..types.resources import Resources as ResourcesData
@@ -15,18 +17,42 @@ if TYPE_CHECKING:
 
 @attrs.define(weakref_slot=False, auto_attribs=True, eq=False)
 class Resources:
-    money: decimal.Decimal = attrs.field(default=decimal.Decimal(0))
-    coal: decimal.Decimal = attrs.field(default=decimal.Decimal(0))
-    oil: decimal.Decimal = attrs.field(default=decimal.Decimal(0))
-    uranium: decimal.Decimal = attrs.field(default=decimal.Decimal(0))
-    iron: decimal.Decimal = attrs.field(default=decimal.Decimal(0))
-    bauxite: decimal.Decimal = attrs.field(default=decimal.Decimal(0))
-    lead: decimal.Decimal = attrs.field(default=decimal.Decimal(0))
-    gasoline: decimal.Decimal = attrs.field(default=decimal.Decimal(0))
-    munitions: decimal.Decimal = attrs.field(default=decimal.Decimal(0))
-    steel: decimal.Decimal = attrs.field(default=decimal.Decimal(0))
-    aluminum: decimal.Decimal = attrs.field(default=decimal.Decimal(0))
-    food: decimal.Decimal = attrs.field(default=decimal.Decimal(0))
+    money: fixed.Fixed = attrs.field(
+        factory=fixed.Fixed, converter=fixed.Fixed.from_number
+    )
+    coal: fixed.Fixed = attrs.field(
+        factory=fixed.Fixed, converter=fixed.Fixed.from_number
+    )
+    oil: fixed.Fixed = attrs.field(
+        factory=fixed.Fixed, converter=fixed.Fixed.from_number
+    )
+    uranium: fixed.Fixed = attrs.field(
+        factory=fixed.Fixed, converter=fixed.Fixed.from_number
+    )
+    iron: fixed.Fixed = attrs.field(
+        factory=fixed.Fixed, converter=fixed.Fixed.from_number
+    )
+    bauxite: fixed.Fixed = attrs.field(
+        factory=fixed.Fixed, converter=fixed.Fixed.from_number
+    )
+    lead: fixed.Fixed = attrs.field(
+        factory=fixed.Fixed, converter=fixed.Fixed.from_number
+    )
+    gasoline: fixed.Fixed = attrs.field(
+        factory=fixed.Fixed, converter=fixed.Fixed.from_number
+    )
+    munitions: fixed.Fixed = attrs.field(
+        factory=fixed.Fixed, converter=fixed.Fixed.from_number
+    )
+    steel: fixed.Fixed = attrs.field(
+        factory=fixed.Fixed, converter=fixed.Fixed.from_number
+    )
+    aluminum: fixed.Fixed = attrs.field(
+        factory=fixed.Fixed, converter=fixed.Fixed.from_number
+    )
+    food: fixed.Fixed = attrs.field(
+        factory=fixed.Fixed, converter=fixed.Fixed.from_number
+    )
 
     @classmethod
     def from_dict(cls, data: ResourcesData) -> Resources:
@@ -34,18 +60,18 @@ class Resources:
 
     def to_dict(self) -> ResourcesData:
         return {
-            "money": self.money,
-            "coal": self.coal,
-            "oil": self.oil,
-            "uranium": self.uranium,
-            "iron": self.iron,
-            "bauxite": self.bauxite,
-            "lead": self.lead,
-            "gasoline": self.gasoline,
-            "munitions": self.munitions,
-            "steel": self.steel,
-            "aluminum": self.aluminum,
-            "food": self.food,
+            "money": self.money.to_decimal(),
+            "coal": self.coal.to_decimal(),
+            "oil": self.oil.to_decimal(),
+            "uranium": self.uranium.to_decimal(),
+            "iron": self.iron.to_decimal(),
+            "bauxite": self.bauxite.to_decimal(),
+            "lead": self.lead.to_decimal(),
+            "gasoline": self.gasoline.to_decimal(),
+            "munitions": self.munitions.to_decimal(),
+            "steel": self.steel.to_decimal(),
+            "aluminum": self.aluminum.to_decimal(),
+            "food": self.food.to_decimal(),
         }
 
     def update(self, data: Resources) -> Resources:
@@ -67,18 +93,19 @@ class Resources:
         return 12
 
     def __iter__(self) -> Generator[decimal.Decimal, None, None]:
-        yield self.money
-        yield self.coal
-        yield self.oil
-        yield self.uranium
-        yield self.iron
-        yield self.bauxite
-        yield self.lead
-        yield self.gasoline
-        yield self.munitions
-        yield self.steel
-        yield self.aluminum
-        yield self.food
+        # the values of the composite type in the database
+        yield self.money.to_decimal()
+        yield self.coal.to_decimal()
+        yield self.oil.to_decimal()
+        yield self.uranium.to_decimal()
+        yield self.iron.to_decimal()
+        yield self.bauxite.to_decimal()
+        yield self.lead.to_decimal()
+        yield self.gasoline.to_decimal()
+        yield self.munitions.to_decimal()
+        yield self.steel.to_decimal()
+        yield self.aluminum.to_decimal()
+        yield self.food.to_decimal()
 
     def __str__(self) -> str:
         resources = [
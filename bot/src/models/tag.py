@@ -74,7 +74,7 @@ class Tag:
             command.interaction,
             value,
             cache.get_tag,
-            cache.tags,
+            cache.tags_view,
             "name",
             errors.TagNotFoundError,
         )
@@ -3,7 +3,6 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 import attrs
-import lang
 import quarrel
 
 from .. import consts, enums, strings, utils
@@ -11,7 +10,9 @@ from .. import consts, enums, strings, utils
 __all__ = ("Target",)
 
 if TYPE_CHECKING:
-    from .. import flags, models
+    import lang
+
+    from .. import models
 
 
 @attrs.define(weakref_slot=False, auto_attribs=True, kw_only=True, eq=False)
@@ -29,33 +30,25 @@ class Target:
     @classmethod
     def rate_target(
         cls,
-        count: flags.TargetFindCounting,
-        rater: models.TargetRater,
+        raters: list[tuple[str, lang.Expression]],
         attacker: models.Nation,
         defender: models.Nation,
     ) -> Target:
-        attributes: list[TargetAttribute] = []
-        for attr in attrs.fields(type(rater)):
-            if getattr(count, attr.name, None):
-                attr_rater: str = getattr(rater, attr.name)
-                if attr_rater:
-                    attributes.append(
-                        TargetAttribute(
-                            name=attr.name,
-                            value=TargetAttribute.get_value(attr.name, defender),
-                            rating=float(
-                                utils.evaluate_in_default_scope(
-                                    lang.parse_expression(attr_rater),
-                                    nation=attacker,
-                                    target=defender,
-                                )
-                            ),
-                        )
-                    )
+        scope = utils.default_scope(nation=attacker, target=defender)
+        # the attributes of nation and target are checked when the raters compile
+        types = {"nation": type(attacker), "target": type(defender)}
+        attributes = tuple(
+            TargetAttribute(
+                name=name,
+                value=TargetAttribute.get_value(name, defender),
+                rating=float(expression.evaluate(scope, types)),
+            )
+            for name, expression in raters
+        )
         return cls(
             nation=defender,
             rating=sum(attr.rating for attr in attributes),
-            attributes=tuple(attributes),
+            attributes=attributes,
         )
 
 
@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING
 
 import attrs
 
-from .. import cache, models, utils
+from .. import models, utils
 
 __all__ = ("TargetConfig",)
 
@@ -62,19 +62,18 @@ class TargetConfig:
         expression: Missing[lang.Expression],
         nation: models.Nation,
     ) -> list[models.Target]:
+        raters = rater.get_expressions(count)
+        candidates = (
+            nation.nations_in_range_of() if attack else nation.nations_in_range()
+        )
+        # without an expression nothing matches
+        if not expression:
+            return []
+        mask = utils.evaluate_for_nations(
+            expression, "target", candidates, nation=nation  # type: ignore
+        )
+        candidates = [i for i, j in zip(candidates, mask) if j]
         if attack:
-            return [
-                models.Target.rate_target(count, rater, i, nation)
-                for i in cache.nations
-                if i.can_declare_war_on(nation)
-                and expression
-                and utils.evaluate_in_default_scope(expression, nation=nation, target=i)
-            ]
+            return [models.Target.rate_target(raters, i, nation) for i in candidates]
         else:
-            return [
-                models.Target.rate_target(count, rater, nation, i)
-                for i in cache.nations
-                if nation.can_declare_war_on(i)
-                and expression
-                and utils.evaluate_in_default_scope(expression, nation=nation, target=i)
-            ]
+            return [models.Target.rate_target(raters, nation, i) for i in candidates]
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 import attrs
+import lang
 
 from .. import consts, utils
 
@@ -11,6 +12,7 @@ __all__ = ("TargetRater",)
 if TYPE_CHECKING:
     from typing import Any, ClassVar
 
+    from .. import flags
     from ..commands.common import CommonSlashCommand
 
 
@@ -61,6 +63,30 @@ class TargetRater:
     async def convert(cls, command: CommonSlashCommand[Any], value: str) -> TargetRater:
         ...
 
+    def get_expression(self, name: str) -> lang.Expression:
+        # kept by rater id and text so the compiled formulas aren't evicted by
+        # whatever else is parsed, edited and deleted raters are cleared by the
+        # cache
+        text = getattr(self, name)
+        expressions = EXPRESSIONS.setdefault(self.id, {})
+        try:
+            return expressions[text]
+        except KeyError:
+            expression = expressions[text] = lang.parse_expression(text)
+            return expression
+
+    def clear_expressions(self) -> None:
+        EXPRESSIONS.pop(self.id, None)
+
+    def get_expressions(
+        self, count: flags.TargetFindCounting
+    ) -> list[tuple[str, lang.Expression]]:
+        return [
+            (attr.name, self.get_expression(attr.name))
+            for attr in attrs.fields(type(self))
+            if getattr(count, attr.name, None) and getattr(self, attr.name)
+        ]
+
     @classmethod
     def default_rater(cls) -> TargetRater:
         return cls(
@@ -87,3 +113,7 @@ class TargetRater:
             aluminum="target.estimated_resources.aluminum / 500",
             food="target.estimated_resources.food / 10000",
         )
+
+
+# rater id -> formula text -> parsed expression
+EXPRESSIONS: dict[int, dict[str, lang.Expression]] = {}
@@ -80,7 +80,7 @@ class Ticket:
         cls, command: CommonSlashCommand[Any], value: quarrel.TextChannel
     ) -> Ticket:
         try:
-            return next(i for i in cache.tickets if i.channel_id == value.id)
+            return next(i for i in cache.tickets_view if i.channel_id == value.id)
         except StopIteration as e:
             raise errors.TicketNotFoundError(command.interaction, value.id) from e
 
@@ -119,7 +119,7 @@ class Ticket:
         try:
             ticket_number = (
                 max(
-                    (i for i in cache.tickets if i.config_id == config.id),
+                    (i for i in cache.tickets_view if i.config_id == config.id),
                     key=lambda i: i.ticket_number,
                 ).ticket_number
                 + 1
@@ -68,7 +68,7 @@ class TicketConfig:
             cache.get_ticket_config,
             {
                 i
-                for i in cache.ticket_configs
+                for i in cache.ticket_configs_view
                 if i.guild_id == command.interaction.guild_id
             },
             "name",
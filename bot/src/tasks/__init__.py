@@ -1 +1,4 @@
+from .cache import *
+from .dispatch import *
 from .pnw import *
+from .write_behind import *
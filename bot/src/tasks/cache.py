@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from .. import cache
+from .common import CommonTask
+
+__all__ = ("CacheHistoryTask", "CacheRetentionTask")
+
+
+class CacheHistoryTask(CommonTask):
+    def __init__(self) -> None:
+        super().__init__(interval=-1)
+
+    async def task(self) -> None:
+        print("Loading cache history...", flush=True)
+        await cache.load_history()
+        print("Loaded cache history", flush=True)
+
+
+class CacheRetentionTask(CommonTask):
+    # evicts history rows outside of the cache's retention policies, see
+    # cache.sweep
+    def __init__(self, interval: float = 600) -> None:
+        super().__init__(interval=interval)
+
+    async def task(self) -> None:
+        cache.sweep()
@@ -28,6 +28,10 @@ class CommonTask:
     async def task(self) -> None:
         ...
 
+    async def stop(self) -> None:
+        # called once on shutdown to finish whatever work the task holds
+        ...
+
     async def on_error(self, error: Exception) -> None:
         utils.print_exception_with_header(
             f"Ignoring exception in task {type(self).__name__}:", error
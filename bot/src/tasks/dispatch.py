@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import heapq
+import itertools
+import time
+from typing import TYPE_CHECKING
+
+from .. import utils
+from .common import CommonTask
+
+__all__ = ("DispatchTask", "dispatcher", "merge_update")
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Coroutine, Literal, Optional
+
+    Listener = Callable[..., Coroutine[Any, Any, Any]]
+    Merge = Callable[[tuple[Any, ...], tuple[Any, ...]], Optional[tuple[Any, ...]]]
+    Policy = Literal["drop", "coalesce", "block"]
+
+# the events of each model are dispatched in this order, lower first, models that
+# aren't listed come last
+PRIORITIES: dict[str, int] = {
+    "war_attack": 0,
+    "war": 1,
+    "nation": 2,
+    "city": 3,
+    "alliance": 3,
+    "treaty": 3,
+    "bounty": 4,
+    "bankrec": 5,
+    "trade": 5,
+}
+
+
+class Event:
+    __slots__ = ("name", "args", "key", "merge", "queued")
+
+    def __init__(
+        self,
+        name: str,
+        args: Optional[tuple[Any, ...]],
+        key: Any,
+        merge: Optional[Merge],
+    ) -> None:
+        self.name: str = name
+        # None once the event has been merged away
+        self.args: Optional[tuple[Any, ...]] = args
+        self.key: Any = key
+        self.merge: Optional[Merge] = merge
+        self.queued: float = time.perf_counter()
+
+
+class EventStats:
+    __slots__ = ("depth", "dispatched", "dropped", "coalesced", "waits", "latencies")
+
+    def __init__(self) -> None:
+        self.depth: int = 0
+        self.dispatched: int = 0
+        self.dropped: int = 0
+        self.coalesced: int = 0
+        # only the most recent times are kept for the percentiles
+        self.waits: collections.deque[float] = collections.deque(maxlen=1024)
+        self.latencies: collections.deque[float] = collections.deque(maxlen=1024)
+
+    def to_dict(self) -> dict[str, float]:
+        waits = sorted(self.waits)
+        latencies = sorted(self.latencies)
+        return {
+            "depth": self.depth,
+            "dispatched": self.dispatched,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "wait_p50": waits[int(0.5 * (len(waits) - 1))] if waits else 0.0,
+            "wait_p99": waits[int(0.99 * (len(waits) - 1))] if waits else 0.0,
+            "p50": latencies[int(0.5 * (len(latencies) - 1))] if latencies else 0.0,
+            "p99": latencies[int(0.99 * (len(latencies) - 1))] if latencies else 0.0,
+        }
+
+
+class DispatchTask(CommonTask):
+    # events are queued by priority and passed to the listeners by a fixed number
+    # of workers so slow listeners hold up other listeners instead of the
+    # producers, once the queue is full new events are dropped, merged into a
+    # queued event with the same key, or wait for room, unless the policy is block
+    # an event that can't be merged takes the place of the last queued event with
+    # a lower priority and creates and deletes wait for room instead of being
+    # dropped, events waiting for room are kept in arrival order and producers
+    # wait on put once too many are waiting
+    def __init__(
+        self,
+        workers: int = 4,
+        max_size: int = 10000,
+        policy: Policy = "coalesce",
+        priorities: Optional[dict[str, int]] = None,
+    ) -> None:
+        super().__init__(interval=-1)
+        self.workers: int = workers
+        self.max_size: int = max_size
+        self.policy: Policy = policy
+        self.priorities: dict[str, int] = (
+            PRIORITIES if priorities is None else priorities
+        )
+        # (priority, sequence, event), the sequence is taken when the event
+        # arrives so events with the same priority keep their order
+        self.heap: list[tuple[int, int, Event]] = []
+        # events that arrived while the heap was full, at most max_size of them
+        self.overflow: collections.deque[tuple[int, int, Event]] = collections.deque()
+        # set while the heap has events and while the overflow has room
+        self.ready: asyncio.Event = asyncio.Event()
+        self.room: asyncio.Event = asyncio.Event()
+        self.room.set()
+        self.sequence: itertools.count[int] = itertools.count()
+        # (event name, key) -> the queued event
+        self.keyed: dict[tuple[str, Any], Event] = {}
+        self.listeners: dict[str, list[Listener]] = {}
+        self.event_stats: dict[str, EventStats] = {}
+
+    async def task(self) -> None:
+        await asyncio.gather(*(self.work() for _ in range(self.workers)))
+
+    def listen(self, name: str) -> Callable[[Listener], Listener]:
+        def decorator(listener: Listener) -> Listener:
+            self.listeners.setdefault(name, []).append(listener)
+            return listener
+
+        return decorator
+
+    def priority(self, name: str) -> int:
+        model = name.rpartition("_")[0]
+        return self.priorities.get(model, len(self.priorities))
+
+    def get_stats(self, name: str) -> EventStats:
+        try:
+            return self.event_stats[name]
+        except KeyError:
+            stats = self.event_stats[name] = EventStats()
+            return stats
+
+    def full(self) -> bool:
+        # nothing goes straight into the heap while older events wait for room
+        return len(self.heap) >= self.max_size or bool(self.overflow)
+
+    def coalesce(self, name: str, args: tuple[Any, ...], key: Any) -> bool:
+        if key is None:
+            return False
+        event = self.keyed.get((name, key))
+        if event is None or event.args is None:
+            return False
+        event.args = args if event.merge is None else event.merge(event.args, args)
+        self.get_stats(name).coalesced += 1
+        return True
+
+    def entry(
+        self, name: str, args: tuple[Any, ...], key: Any, merge: Optional[Merge]
+    ) -> tuple[int, int, Event]:
+        event = Event(name, args, key, merge)
+        if key is not None:
+            self.keyed[(name, key)] = event
+        self.get_stats(name).depth += 1
+        return (self.priority(name), next(self.sequence), event)
+
+    def push(self, entry: tuple[int, int, Event]) -> None:
+        heapq.heappush(self.heap, entry)
+        self.ready.set()
+
+    async def put(
+        self,
+        name: str,
+        *args: Any,
+        key: Any = None,
+        merge: Optional[Merge] = None,
+    ) -> None:
+        while not self.offer(name, args, key, merge):
+            self.room.clear()
+            await self.room.wait()
+
+    def put_nowait(
+        self,
+        name: str,
+        *args: Any,
+        key: Any = None,
+        merge: Optional[Merge] = None,
+    ) -> None:
+        # callers outside of a coroutine can't wait so the event is dropped once
+        # the overflow is full too
+        if not self.offer(name, args, key, merge):
+            self.get_stats(name).dropped += 1
+
+    def offer(
+        self, name: str, args: tuple[Any, ...], key: Any, merge: Optional[Merge]
+    ) -> bool:
+        # False if the event has to wait for room in the overflow
+        if not self.full():
+            self.push(self.entry(name, args, key, merge))
+            return True
+        if self.policy != "block":
+            if self.policy == "coalesce" and self.coalesce(name, args, key):
+                return True
+            if not self.overflow and self.evict(self.priority(name)):
+                self.push(self.entry(name, args, key, merge))
+                return True
+            if self.policy == "drop" or name.endswith("_update"):
+                self.get_stats(name).dropped += 1
+                return True
+        if len(self.overflow) >= self.max_size:
+            return False
+        self.overflow.append(self.entry(name, args, key, merge))
+        return True
+
+    def evict(self, priority: int) -> bool:
+        # drops the queued event that would be dispatched last if its priority is
+        # lower
+        if not self.heap:
+            return False
+        index = max(range(len(self.heap)), key=self.heap.__getitem__)
+        entry = self.heap[index]
+        if entry[0] <= priority:
+            return False
+        self.heap[index] = self.heap[-1]
+        self.heap.pop()
+        heapq.heapify(self.heap)
+        self.forget(entry[2])
+        self.get_stats(entry[2].name).dropped += 1
+        return True
+
+    def forget(self, event: Event) -> None:
+        if event.key is not None and self.keyed.get((event.name, event.key)) is event:
+            del self.keyed[(event.name, event.key)]
+        self.get_stats(event.name).depth -= 1
+
+    def pop(self) -> Event:
+        _, _, event = heapq.heappop(self.heap)
+        if self.overflow:
+            self.push(self.overflow.popleft())
+            self.room.set()
+        elif not self.heap:
+            self.ready.clear()
+        self.forget(event)
+        return event
+
+    async def get(self) -> Event:
+        while not self.heap:
+            await self.ready.wait()
+        return self.pop()
+
+    async def work(self) -> None:
+        while True:
+            await self.handle(await self.get())
+
+    async def stop(self) -> None:
+        # events still queued on shutdown are handled before the loop closes
+        while self.heap:
+            await self.handle(self.pop())
+
+    async def handle(self, event: Event) -> None:
+        # listeners are awaited so the workers bound how much of their work runs
+        # at once and the latency covers all of it
+        if event.args is not None:
+            stats = self.get_stats(event.name)
+            start = time.perf_counter()
+            stats.waits.append(start - event.queued)
+            for listener in self.listeners.get(event.name, ()):
+                error = await utils.return_exception(listener(*event.args))
+                if isinstance(error, Exception):
+                    utils.print_exception_with_header(
+                        f"Ignoring exception in listener for {event.name}:", error
+                    )
+            stats.dispatched += 1
+            stats.latencies.append(time.perf_counter() - start)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {name: i.to_dict() for name, i in self.event_stats.items()}
+
+
+def merge_update(
+    queued: tuple[Any, ...], args: tuple[Any, ...]
+) -> Optional[tuple[Any, ...]]:
+    # keeps the oldest state, the changes may have cancelled each other out
+    old, new = queued[0], args[1]
+    fields = new.diff(old)
+    return (old, new, fields) if fields else None
+
+
+dispatcher = DispatchTask()
@@ -2,58 +2,329 @@ from __future__ import annotations
 
 import asyncio
 import datetime
+import functools
+import time
 from typing import TYPE_CHECKING
 
 import attrs
 import pnwkit
 
-from .. import cache, models, utils
-from ..bot import bot
+from .. import cache, db, models, utils
 from ..env import kit
 from .common import CommonTask
+from .dispatch import dispatcher, merge_update
+from .write_behind import write_behind
 
-__all__ = ("PnWDataTask", "PnWSubscriptionsTask")
+__all__ = (
+    "Debouncer",
+    "PnWDataTask",
+    "PnWReconcileTask",
+    "PnWSubscriptionsTask",
+    "Supervisor",
+)
 
 if TYPE_CHECKING:
-    from typing import Any, Callable
+    from collections.abc import Iterable
+    from typing import Any, Awaitable, Callable, Optional
 
     import pnwkit
     from pnwkit.new import SubscriptionEventLiteral, SubscriptionModelLiteral
 
 
+class Debouncer:
+    # holds back update dispatches so every update to the same model within the
+    # window is dispatched once with the earliest old state and the latest state
+    def __init__(self, name: str, window: float) -> None:
+        self.name: str = name
+        self.window: float = window
+        # id -> [earliest old state, latest new state, timer], the latest state is
+        # kept since later updates don't have to come with the same model object
+        self.pending: dict[Any, list[Any]] = {}
+        self.merged: int = 0
+        self.dispatched: int = 0
+
+    def put(self, old: Any, new: Any) -> None:
+        pending = self.pending.get(new.id)
+        if pending is not None:
+            pending[1] = new
+            self.merged += 1
+            return
+        self.pending[new.id] = [
+            old,
+            new,
+            asyncio.get_running_loop().call_later(self.window, self.dispatch, new.id),
+        ]
+
+    def flush(self) -> None:
+        for id, (_, _, timer) in list(self.pending.items()):
+            timer.cancel()
+            self.dispatch(id)
+
+    def dispatch(self, id: Any) -> None:
+        old, new, _ = self.pending.pop(id)
+        # the changes may have cancelled each other out
+        fields = new.diff(old)
+        if fields:
+            self.dispatched += 1
+            dispatcher.put_nowait(
+                f"{self.name}_update", old, new, fields, key=new.id, merge=merge_update
+            )
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "merged": self.merged,
+            "dispatched": self.dispatched,
+            "pending": len(self.pending),
+        }
+
+
+# subscription model -> the root field to page through and the fields from_data
+# reads
+QUERIES: dict[str, tuple[str, str]] = {
+    "alliance": (
+        "alliances",
+        "id name acronym score color date accept_members flag forum_link "
+        "discord_link wiki_link",
+    ),
+    "bankrec": (
+        "bankrecs",
+        "id date sender_id sender_type receiver_id receiver_type banker_id note "
+        "money coal oil uranium iron bauxite lead gasoline munitions steel "
+        "aluminum food tax_id",
+    ),
+    "city": (
+        "cities",
+        "id nation_id name date infrastructure land coal_power oil_power "
+        "nuclear_power wind_power coal_mine lead_mine bauxite_mine oil_well "
+        "uranium_mine iron_mine farm oil_refinery steel_mill aluminum_refinery "
+        "munitions_factory police_station hospital recycling_center subway "
+        "supermarket bank shopping_mall stadium barracks factory hangar drydock "
+        "nuke_date",
+    ),
+    "nation": (
+        "nations",
+        "id alliance_id alliance_position nation_name leader_name continent "
+        "war_policy domestic_policy color num_cities score flag "
+        "vacation_mode_turns beige_turns espionage_available date soldiers tanks "
+        "aircraft ships missiles nukes discord turns_since_last_city "
+        "turns_since_last_project project_bits wars_won wars_lost tax_id "
+        "alliance_seniority",
+    ),
+    "trade": (
+        "trades",
+        "id type date sender_id receiver_id offer_resource offer_amount "
+        "buy_or_sell price accepted date_accepted original_trade_id",
+    ),
+    "warattack": (
+        "warattacks",
+        "id date att_id def_id type war_id victor success attcas1 attcas2 "
+        "defcas1 defcas2 city_id infra_destroyed improvements_lost money_stolen "
+        "loot_info resistance_eliminated city_infra_before infra_destroyed_value "
+        "att_mun_used def_mun_used att_gas_used def_gas_used "
+        "aircraft_killed_by_tanks",
+    ),
+    "war": (
+        "wars",
+        "id date reason war_type att_id att_alliance_id def_id def_alliance_id "
+        "ground_control air_superiority naval_blockade winner turns_left "
+        "att_points def_points att_resistance def_resistance att_peace def_peace "
+        "att_fortify def_fortify att_gas_used def_gas_used att_mun_used "
+        "def_mun_used att_alum_used def_alum_used att_steel_used def_steel_used "
+        "att_infra_destroyed def_infra_destroyed att_money_looted "
+        "def_money_looted att_infra_destroyed_value def_infra_destroyed_value "
+        "att_soldiers_killed def_soldiers_killed att_tanks_killed "
+        "def_tanks_killed att_aircraft_killed def_aircraft_killed "
+        "att_ships_killed def_ships_killed att_missiles_used def_missiles_used "
+        "att_nukes_used def_nukes_used",
+    ),
+}
+# models whose creates are backfilled after a reconnect, their root fields take
+# min_id
+BACKFILL: frozenset[str] = frozenset(("bankrec", "nation", "trade", "warattack", "war"))
+
+
+class Supervisor:
+    # restarts subscriptions that fail or end with exponential backoff and keeps
+    # the highest id seen for each model so creates missed while disconnected are
+    # backfilled once the create subscription is back, channels are opened
+    # concurrently but no more than rate per second
+    def __init__(
+        self,
+        initial_delay: float = 1.0,
+        max_delay: float = 300.0,
+        page_size: int = 500,
+        rate: float = 5.0,
+    ) -> None:
+        self.initial_delay: float = initial_delay
+        self.max_delay: float = max_delay
+        self.page_size: int = page_size
+        self.rate: float = rate
+        self.lock: asyncio.Lock = asyncio.Lock()
+        self.next_subscribe: float = 0.0
+        self.marks: dict[str, int] = {}
+        self.reconnects: dict[str, int] = {}
+        self.backfilled: dict[str, int] = {}
+        # "<model>_<event>" -> set while the channel is subscribed
+        self.channels: dict[str, asyncio.Event] = {}
+
+    def channel(self, model: str, event: str) -> asyncio.Event:
+        return self.channels.setdefault(f"{model}_{event}", asyncio.Event())
+
+    def is_ready(self, model: str, event: str) -> bool:
+        return self.channel(model, event).is_set()
+
+    async def wait_until_ready(self, *channels: tuple[str, str]) -> None:
+        await asyncio.gather(*(self.channel(*i).wait() for i in channels))
+
+    async def subscribe(
+        self, model: SubscriptionModelLiteral, event: SubscriptionEventLiteral
+    ) -> Any:
+        async with self.lock:
+            delay = self.next_subscribe - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.next_subscribe = time.perf_counter() + 1 / self.rate
+        stream = await kit.subscribe(model, event)
+        self.channel(model, event).set()
+        return stream
+
+    def see(self, model: str, id: int) -> None:
+        if id > self.marks.get(model, 0):
+            self.marks[model] = id
+
+    async def seed(self, model: str, cls: Any) -> None:
+        # the cache may not have the history tables yet so the mark starts from
+        # the database
+        if model not in self.marks:
+            rows = await db.query(
+                f"SELECT MAX(id) FROM {cls.TABLE};", name=f"{cls.TABLE}.max_id"  # nosec
+            )
+            self.see(model, rows[0][0] or 0)
+
+    async def supervise(
+        self,
+        event: SubscriptionEventLiteral,
+        model: SubscriptionModelLiteral,
+        *args: Any,
+    ) -> None:
+        delay = self.initial_delay
+        while True:
+            started = time.perf_counter()
+            error = await utils.return_exception(
+                subscription(event, model, *args, supervisor=self)
+            )
+            self.channel(model, event).clear()
+            if isinstance(error, Exception):
+                utils.print_exception_with_header(
+                    f"Ignoring exception in subscription {model} {event}:", error
+                )
+            # a subscription that stayed up for a while starts the backoff over
+            if time.perf_counter() - started > self.max_delay:
+                delay = self.initial_delay
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_delay)
+            key = f"{model}_{event}"
+            self.reconnects[key] = self.reconnects.get(key, 0) + 1
+
+    async def backfill(
+        self, model: str, cls: Any, create: Callable[[Any], Awaitable[Any]]
+    ) -> None:
+        if model not in BACKFILL:
+            return
+        field, fields = QUERIES[model]
+        query = kit.query(
+            field,  # type: ignore
+            {"min_id": self.marks.get(model, 0) + 1, "first": self.page_size},
+            fields,
+        )
+        count = 0
+        async for i in query.paginate(field):  # type: ignore
+            if await create(i):
+                count += 1
+        self.backfilled[model] = self.backfilled.get(model, 0) + count
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            "marks": self.marks.copy(),
+            "reconnects": self.reconnects.copy(),
+            "backfilled": self.backfilled.copy(),
+            "ready": {name: int(i.is_set()) for name, i in self.channels.items()},
+        }
+
+
 async def subscription(
     event: SubscriptionEventLiteral,
-    name: str,
     model: SubscriptionModelLiteral,
+    name: str,
     cls: Any,
     adder: Callable[[Any], Any],
     getter: Callable[[int], Any],
     remover: Callable[[Any], Any],
+    updater: Optional[Callable[[Any, Any], Any]],
+    debouncer: Optional[Debouncer],
+    supervisor: Optional[Supervisor] = None,
 ) -> None:
-    try:
-        if event == "create":
-            async for i in await kit.subscribe(model, "create"):
+    subscribe = kit.subscribe if supervisor is None else supervisor.subscribe
+    if event == "create":
+
+        async def create(data: Any) -> bool:
+            # a backfilled row can also arrive on the subscription
+            if getter(data.id) is not None:
+                return False
+            new = cls.from_data(data)
+            adder(new)
+            if supervisor is not None:
+                supervisor.see(model, new.id)
+            await write_behind.put(new, insert=True)
+            await dispatcher.put(f"{name}_create", new)
+            return True
+
+        resume = supervisor is not None and model in supervisor.marks
+        if supervisor is not None and model in BACKFILL:
+            await supervisor.seed(model, cls)
+        # events received while backfilling wait in the subscription's queue
+        stream = await subscribe(model, "create")
+        if resume:
+            await supervisor.backfill(model, cls, create)  # type: ignore
+        async for i in stream:
+            await create(i)
+    elif event == "update":
+        async for i in await subscribe(model, "update"):
+            new = getter(i.id)
+            if new is None and not cache.is_ready(cls.TABLE):
+                # history tables load in the background, the update is kept and
+                # saved in full so load_history doesn't replace it with the stored
+                # row
                 new = cls.from_data(i)
                 adder(new)
-                await new.save(insert=True)
-                bot.dispatch(f"{name}_create", new)
-        elif event == "update":
-            async for i in await kit.subscribe(model, "update"):
-                new = getter(i.id)
-                if new is not None:
-                    old = attrs.evolve(new)
-                    new.update(cls.from_data(i))
-                    await new.save()
-                    bot.dispatch(f"{name}_update", old, new)
-        else:
-            async for i in await kit.subscribe(model, "delete"):
-                old = cls.from_data(i)
-                if old is not None:
-                    remover(old)
-                    await old.delete()
-                    bot.dispatch(f"{name}_delete", old)
-    except Exception as e:
-        raise e
+                await write_behind.put(new, insert=True)
+            elif new is not None:
+                old = attrs.evolve(new)
+                new.update(cls.from_data(i))
+                fields = new.diff(old)
+                if not fields:
+                    continue
+                if updater is not None:
+                    updater(old, new)
+                await write_behind.put(new, fields=fields)
+                if debouncer is None:
+                    await dispatcher.put(
+                        f"{name}_update",
+                        old,
+                        new,
+                        fields,
+                        key=new.id,
+                        merge=merge_update,
+                    )
+                else:
+                    debouncer.put(old, new)
+    else:
+        async for i in await subscribe(model, "delete"):
+            old = cls.from_data(i)
+            if old is not None:
+                remover(old)
+                await write_behind.delete_many([old])
+                await dispatcher.put(f"{name}_delete", old)
 
 
 async def model_subscriptions(
@@ -63,22 +334,26 @@ async def model_subscriptions(
     adder: Callable[[Any], Any],
     getter: Callable[[int], Any],
     remover: Callable[[Any], Any],
+    updater: Optional[Callable[[Any, Any], Any]] = None,
+    debouncer: Optional[Debouncer] = None,
+    supervisor: Optional[Supervisor] = None,
 ) -> None:
-    await asyncio.sleep(1)
-    asyncio.create_task(
-        subscription("create", name, model, cls, adder, getter, remover),
-        name=f"subscribe_{model}_create",
-    )
-    await asyncio.sleep(1)
-    asyncio.create_task(
-        subscription("update", name, model, cls, adder, getter, remover),
-        name=f"subscribe_{model}_update",
-    )
-    await asyncio.sleep(1)
-    asyncio.create_task(
-        subscription("delete", name, model, cls, adder, getter, remover),
-        name=f"subscribe_{model}_delete",
-    )
+    supervisor = supervisor or Supervisor()
+    for event in ("create", "update", "delete"):
+        asyncio.create_task(
+            supervisor.supervise(
+                event,  # type: ignore
+                model,
+                name,
+                cls,
+                adder,
+                getter,
+                remover,
+                updater,
+                debouncer,
+            ),
+            name=f"subscribe_{model}_{event}",
+        )
 
 
 class PnWDataTask(CommonTask):
@@ -114,22 +389,23 @@ class PnWDataTask(CommonTask):
             if treasure is None:
                 cache.add_treasure(i)
                 continue
-            data = i.to_dict()
-            if data != treasure.to_dict():
+            fields = i.diff(treasure)
+            if fields:
                 old = attrs.evolve(treasure)
                 treasure.update(i)
-                bot.dispatch("treasure_update", old, treasure)
+                cache.update_treasure(old, treasure)
+                await dispatcher.put("treasure_update", old, treasure, fields)
         colors = [models.Color.from_data(i) for i in result.colors]
         for i in colors:
             color = cache.get_color(i.color)
             if color is None:
                 cache.add_color(i)
                 continue
-            data = i.to_dict()
-            if data != color.to_dict():
+            fields = i.diff(color)
+            if fields:
                 old = attrs.evolve(color)
                 color.update(i)
-                bot.dispatch("color_update", old, color)
+                await dispatcher.put("color_update", old, color, fields)
         # radiation = models.Radiation.from_data(
         #     result.game_info.radiation, utils.utcnow()
         # )
@@ -137,88 +413,310 @@ class PnWDataTask(CommonTask):
 
 
 class PnWSubscriptionsTask(CommonTask):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        debounce: Optional[dict[str, float]] = None,
+        names: Optional[Iterable[str]] = None,
+        rate: float = 5.0,
+    ) -> None:
         super().__init__(interval=-1)
+        # model name -> seconds to debounce its update events for
+        self.debouncers: dict[str, Debouncer] = {
+            name: Debouncer(name, window) for name, window in (debounce or {}).items()
+        }
+        # every model is subscribed to unless names is given, in the order of
+        # SUBSCRIPTIONS so the busiest channels open first
+        self.names: tuple[str, ...] = (
+            tuple(SUBSCRIPTIONS)
+            if names is None
+            else tuple(i for i in SUBSCRIPTIONS if i in set(names))
+        )
+        self.supervisor: Supervisor = Supervisor(rate=rate)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            name: i.stats() for name, i in self.debouncers.items()
+        } | self.supervisor.stats()
+
+    async def stop(self) -> None:
+        # updates held back by the debouncers are dispatched instead of dropped
+        for i in self.debouncers.values():
+            i.flush()
 
     async def task(self) -> None:
-        await model_subscriptions(
-            "alliance",
-            "alliance",
-            models.Alliance,
-            cache.add_alliance,
-            cache.get_alliance,
-            cache.remove_alliance,
-        )
-        await asyncio.sleep(1)
-        await model_subscriptions(
-            "bankrec",
-            "bankrec",
-            models.Bankrec,
-            cache.add_bankrec,
-            cache.get_bankrec,
-            cache.remove_bankrec,
-        )
-        await asyncio.sleep(1)
-        await model_subscriptions(
-            "bounty",
-            "bounty",
-            models.Bounty,
-            cache.add_bounty,
-            cache.get_bounty,
-            cache.remove_bounty,
-        )
-        await asyncio.sleep(1)
-        await model_subscriptions(
-            "city",
-            "city",
-            models.City,
-            cache.add_city,
-            cache.get_city,
-            cache.remove_city,
-        )
-        await asyncio.sleep(1)
-        await model_subscriptions(
-            "nation",
-            "nation",
-            models.Nation,
-            cache.add_nation,
-            cache.get_nation,
-            cache.remove_nation,
-        )
-        await asyncio.sleep(1)
-        await model_subscriptions(
-            "trade",
-            "trade",
-            models.Trade,
-            cache.add_trade,
-            cache.get_trade,
-            cache.remove_trade,
-        )
-        await asyncio.sleep(1)
-        await model_subscriptions(
-            "treaty",
-            "treaty",
-            models.Treaty,
-            cache.add_treaty,
-            cache.get_treaty,
-            cache.remove_treaty,
-        )
-        await asyncio.sleep(1)
-        await model_subscriptions(
-            "war_attack",
-            "warattack",
-            models.WarAttack,
-            cache.add_war_attack,
-            cache.get_war_attack,
-            cache.remove_war_attack,
+        for name in self.names:
+            model, *args = SUBSCRIPTIONS[name]
+            await model_subscriptions(
+                name,
+                model,
+                *args,
+                debouncer=self.debouncers.get(name),
+                supervisor=self.supervisor,
+            )
+        # TODO: create models and subscriptions for embargo, treasure_trade, tax_bracket, alliance_position and maybe baseball
+
+
+class PnWReconcileTask(CommonTask):
+    # pages through whole tables from the api and applies whatever the
+    # subscriptions missed, rows are compared by fingerprint first so only the rows
+    # that changed are diffed and written
+    def __init__(
+        self,
+        names: tuple[str, ...] = ("alliance", "nation", "city"),
+        interval: float = 60 * 60,
+        page_size: int = 500,
+        pages: int = 2,
+    ) -> None:
+        super().__init__(interval=interval)
+        self.names: tuple[str, ...] = names
+        self.page_size: int = page_size
+        # pages requested at once
+        self.pages: int = pages
+        # model name -> counts from the last run
+        self.drift: dict[str, dict[str, int]] = {}
+
+    async def before_task(self) -> None:
+        # the cache was just loaded so the first run waits an interval
+        await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {name: i.copy() for name, i in self.drift.items()}
+
+    async def task(self) -> None:
+        for name in self.names:
+            self.drift[name] = await self.reconcile(name, *RECONCILE[name])
+            print(
+                datetime.datetime.now(datetime.timezone.utc),
+                f"reconciled {name}",
+                self.drift[name],
+                flush=True,
+            )
+
+    async def reconcile(
+        self,
+        name: str,
+        cls: Any,
+        adder: Callable[[Any], Any],
+        getter: Callable[[int], Any],
+        remover: Callable[[Any], Any],
+        updater: Optional[Callable[[Any, Any], Any]],
+        values: Callable[[], Iterable[Any]],
+    ) -> dict[str, int]:
+        field, fields = QUERIES[name]
+        paginator = kit.query(
+            field,  # type: ignore
+            {
+                "first": self.page_size,
+                "orderBy": pnwkit.OrderBy("id", pnwkit.Order.ASC),  # type: ignore
+            },
+            fields,
+        ).paginate(
+            field  # type: ignore
         )
-        await asyncio.sleep(1)
-        await model_subscriptions(
-            "war",
-            "war",
-            models.War,
-            cache.add_war,
-            cache.get_war,
-            cache.remove_war,
+        paginator.batch_size = self.pages
+        seen: set[int] = set()
+        created: list[Any] = []
+        updated: dict[tuple[str, ...], list[Any]] = {}
+        unchanged = 0
+        # an update received from a subscription while a page was being fetched
+        # can be overwritten by the older row here, the next event or run fixes it
+        async for data in paginator:
+            new = cls.from_data(data)
+            seen.add(new.id)
+            model = getter(new.id)
+            if model is None:
+                adder(new)
+                created.append(new)
+                await dispatcher.put(f"{name}_create", new)
+                continue
+            if model.fingerprint() == new.fingerprint():
+                unchanged += 1
+                continue
+            old = attrs.evolve(model)
+            model.update(new)
+            changed = model.diff(old)
+            if not changed:
+                unchanged += 1
+                continue
+            if updater is not None:
+                updater(old, model)
+            updated.setdefault(changed, []).append(model)
+            await dispatcher.put(
+                f"{name}_update", old, model, changed, key=model.id, merge=merge_update
+            )
+        # page offsets shift when rows are deleted during the scan and rows can be
+        # created after their page was fetched, so missing rows are looked up by id
+        # before they're removed
+        missing = [i.id for i in values() if i.id not in seen]
+        for start in range(0, len(missing), self.page_size):
+            chunk = missing[start : start + self.page_size]
+            query = kit.query(
+                field, {"id": chunk, "first": self.page_size}, "id"  # type: ignore
+            )
+            async for data in query.paginate(field):  # type: ignore
+                seen.add(data.id)
+        deleted: list[Any] = []
+        for id in missing:
+            model = getter(id)
+            if id not in seen and model is not None:
+                remover(model)
+                deleted.append(model)
+                await dispatcher.put(f"{name}_delete", model)
+        await cls.upsert_many(created)
+        for changed, models_ in updated.items():
+            await cls.save_many(models_, fields=changed)
+        await write_behind.delete_many(deleted)
+        return {
+            "created": len(created),
+            "updated": sum(len(i) for i in updated.values()),
+            "deleted": len(deleted),
+            "unchanged": unchanged,
+        }
+
+
+# model name -> the model, cache add, get, remove and update functions and the
+# cached values
+RECONCILE: dict[
+    str,
+    tuple[
+        Any,
+        Callable[[Any], Any],
+        Callable[[int], Any],
+        Callable[[Any], Any],
+        Optional[Callable[[Any, Any], Any]],
+        Callable[[], Iterable[Any]],
+    ],
+] = {
+    "alliance": (
+        models.Alliance,
+        cache.add_alliance,
+        cache.get_alliance,
+        cache.remove_alliance,
+        cache.update_alliance,
+        lambda: list(cache.alliances_view),
+    ),
+    "city": (
+        models.City,
+        cache.add_city,
+        cache.get_city,
+        cache.remove_city,
+        cache.update_city,
+        lambda: list(cache.cities_view),
+    ),
+    "nation": (
+        models.Nation,
+        cache.add_nation,
+        cache.get_nation,
+        cache.remove_nation,
+        cache.update_nation,
+        lambda: list(cache.nations_view),
+    ),
+}
+# model name -> the pnw subscription model, the model, and the cache add, get,
+# remove and update functions
+SUBSCRIPTIONS: dict[
+    str,
+    tuple[
+        SubscriptionModelLiteral,
+        Any,
+        Callable[[Any], Any],
+        Callable[[int], Any],
+        Callable[[Any], Any],
+        Optional[Callable[[Any, Any], Any]],
+    ],
+] = {
+    "war_attack": (
+        "warattack",
+        models.WarAttack,
+        cache.add_war_attack,
+        cache.get_war_attack,
+        cache.remove_war_attack,
+        None,
+    ),
+    "war": (
+        "war",
+        models.War,
+        cache.add_war,
+        cache.get_war,
+        cache.remove_war,
+        cache.update_war,
+    ),
+    "nation": (
+        "nation",
+        models.Nation,
+        cache.add_nation,
+        cache.get_nation,
+        cache.remove_nation,
+        cache.update_nation,
+    ),
+    "city": (
+        "city",
+        models.City,
+        cache.add_city,
+        cache.get_city,
+        cache.remove_city,
+        cache.update_city,
+    ),
+    "alliance": (
+        "alliance",
+        models.Alliance,
+        cache.add_alliance,
+        cache.get_alliance,
+        cache.remove_alliance,
+        cache.update_alliance,
+    ),
+    "treaty": (
+        "treaty",
+        models.Treaty,
+        cache.add_treaty,
+        cache.get_treaty,
+        cache.remove_treaty,
+        None,
+    ),
+    "bounty": (
+        "bounty",
+        models.Bounty,
+        cache.add_bounty,
+        cache.get_bounty,
+        cache.remove_bounty,
+        None,
+    ),
+    "bankrec": (
+        "bankrec",
+        models.Bankrec,
+        cache.add_bankrec,
+        cache.get_bankrec,
+        cache.remove_bankrec,
+        None,
+    ),
+    "trade": (
+        "trade",
+        models.Trade,
+        cache.add_trade,
+        cache.get_trade,
+        cache.remove_trade,
+        None,
+    ),
+}
+
+
+async def fetch_from_api(
+    name: str, model: SubscriptionModelLiteral, cls: Any, id: int
+) -> Optional[Any]:
+    # the last resort of cache.fetch, rows that aren't in the database yet are
+    # saved and their create is dispatched like one from the subscription
+    field, fields = QUERIES[model]
+    query = kit.query(field, {"id": [id], "first": 1}, fields)  # type: ignore
+    async for data in query.paginate(field):  # type: ignore
+        new = cls.from_data(data)
+        await write_behind.put(new, insert=True)
+        await dispatcher.put(f"{name}_create", new)
+        return new
+    return None
+
+
+for name, (model, cls, *_) in SUBSCRIPTIONS.items():
+    if model in QUERIES:
+        cache.register_api(
+            cls.TABLE, functools.partial(fetch_from_api, name, model, cls)
         )
-        # TODO: create models and subscriptions for embargo, treasure_trade, tax_bracket, alliance_position and maybe baseball
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from .. import utils
+from .common import CommonTask
+
+__all__ = ("WriteBehindTask", "write_behind")
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing import Any, Optional
+
+
+class WriteBehindTask(CommonTask):
+    # coalesces saves by primary key and writes them in batches, the models are
+    # kept by reference so a flush always writes their latest state
+    def __init__(self, interval: float = 1.0, max_size: int = 5000) -> None:
+        super().__init__(interval=interval)
+        self.max_size: int = max_size
+        # primary key -> (model, insert, changed fields or None for every field)
+        self.pending: dict[
+            tuple[Any, ...], tuple[Any, bool, Optional[frozenset[str]]]
+        ] = {}
+        self.lock: asyncio.Lock = asyncio.Lock()
+
+    async def task(self) -> None:
+        await self.flush()
+
+    async def stop(self) -> None:
+        await self.flush()
+
+    async def put(
+        self,
+        model: Any,
+        insert: bool = False,
+        fields: Optional[Iterable[str]] = None,
+    ) -> None:
+        if insert and model.INSERT_QUERY is None:
+            # the generated values are needed right away
+            await model.save(insert=True)
+            return
+        key = primary_key(model)
+        changed = None if fields is None else frozenset(fields)
+        existing = self.pending.get(key)
+        if existing is not None:
+            insert = insert or existing[1]
+            changed = (
+                None
+                if changed is None or existing[2] is None
+                else changed | existing[2]
+            )
+        self.pending[key] = (model, insert, None if insert else changed)
+        # callers wait on the flush once the queue is full which slows down the
+        # producers instead of letting the queue grow
+        if len(self.pending) >= self.max_size:
+            await self.flush()
+
+    def discard(self, model: Any) -> None:
+        self.pending.pop(primary_key(model), None)
+
+    async def delete_many(self, models: Iterable[Any]) -> None:
+        # deletes wait for a flush in progress, otherwise a write of the same row
+        # that was already taken off the queue could land after the delete and
+        # bring the row back
+        async with self.lock:
+            batches: dict[type[Any], list[Any]] = {}
+            for i in models:
+                self.discard(i)
+                batches.setdefault(type(i), []).append(i)
+            for cls, models_ in batches.items():
+                await cls.delete_many(models_)
+
+    async def flush(self) -> None:
+        async with self.lock:
+            pending, self.pending = self.pending, {}
+            batches: dict[
+                tuple[type[Any], bool, Optional[frozenset[str]]], list[Any]
+            ] = {}
+            for model, insert, fields in pending.values():
+                batches.setdefault((type(model), insert, fields), []).append(model)
+            for (cls, insert, fields), models in batches.items():
+                # creates are upserted so replaying one for an existing row is harmless
+                error = await utils.return_exception(
+                    cls.upsert_many(models)
+                    if insert
+                    else cls.save_many(models, fields=fields)
+                )
+                if isinstance(error, Exception):
+                    # retry row by row so one bad row doesn't lose the whole batch,
+                    # creates are still upserted since some may have been applied
+                    for i in models:
+                        error = await utils.return_exception(
+                            cls.upsert_many([i]) if insert else i.save(fields=fields)
+                        )
+                        if isinstance(error, Exception):
+                            await self.on_error(error)
+
+
+def primary_key(model: Any) -> tuple[Any, ...]:
+    key = getattr(model, "PRIMARY_KEY", ("id",))
+    if isinstance(key, str):
+        key = (key,)
+    # keyed by table so a compact view and a plain copy of a row are the same entry
+    return (model.TABLE, *(getattr(model, i) for i in key))
+
+
+write_behind = WriteBehindTask()
@@ -5,6 +5,7 @@ from .embed import *
 from .error import *
 from .fetch import *
 from .lang_ import *
+from .militarization import *
 from .models import *
 from .property import *
 from .ticket import *
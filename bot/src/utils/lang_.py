@@ -4,17 +4,54 @@ import datetime
 from typing import TYPE_CHECKING
 
 import lang
+import numpy
 
-__all__ = ("evaluate_in_default_scope", "merge_expressions")
+from .. import cache, models
+
+__all__ = (
+    "default_scope",
+    "evaluate_in_default_scope",
+    "evaluate_for_nations",
+    "merge_expressions",
+    "nation_columns",
+)
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
     from typing import Any
 
 
+def default_scope(**scope: Any) -> dict[str, Any]:
+    return DEFAULT_SCOPE | scope
+
+
 def evaluate_in_default_scope(expression: lang.Expression, **scope: Any) -> Any:
     return expression.evaluate(DEFAULT_SCOPE | scope)
 
 
+def evaluate_for_nations(
+    expression: lang.Expression,
+    name: str,
+    nations: Sequence[models.Nation],
+    **scope: Any,
+) -> numpy.ndarray[Any, Any]:
+    return lang.evaluate_batch(
+        expression,
+        DEFAULT_SCOPE | scope,
+        {name: nations},
+        {name: nation_columns(nations)},
+    )
+
+
+def nation_columns(
+    nations: Sequence[models.Nation],
+) -> dict[str, numpy.ndarray[Any, Any]]:
+    # the nations have to be cached, the columns come from the cache snapshot
+    columns = cache.nation_columns
+    rows = columns.get_rows(i.id for i in nations)
+    return {i: columns.get(i)[rows] for i in models.Nation.COLUMNS}
+
+
 def merge_expressions(*expressions: lang.Expression | str, sep: str) -> lang.Expression:
     return lang.parse_expression(sep.join(f"({i})" for i in expressions))
 
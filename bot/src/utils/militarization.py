@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .. import consts
+
+__all__ = ("militarization",)
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+
+def militarization(aggregate: Mapping[str, float]) -> dict[str, float]:
+    # fraction of the maximum military for an aggregate from
+    # cache.get_alliance_aggregate
+    cities = aggregate["num_cities"]
+    return {
+        i: aggregate[i] / (j * cities) if cities else 0.0
+        for i, j in consts.MAX_MIL_PER_CITY.items()
+    }
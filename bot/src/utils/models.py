@@ -7,7 +7,8 @@ from .. import db
 __all__ = ("model",)
 
 if TYPE_CHECKING:
-    from typing import Any
+    from collections.abc import Iterable
+    from typing import Any, Optional
 
 T = TypeVar("T", bound="Type[ModelProtocol]")
 
@@ -15,8 +16,14 @@ T = TypeVar("T", bound="Type[ModelProtocol]")
 class ModelProtocol(Protocol):
     __slots__: ClassVar[tuple[str, ...]] = ()
     TABLE: ClassVar[str]
+    FIELDS: ClassVar[tuple[str, ...]]
+    UPDATE_QUERY: ClassVar[str]
+    INSERT_QUERY: ClassVar[Optional[str]]
+    UPSERT_QUERY: ClassVar[str]
 
-    async def save(self, insert: bool = False) -> None:
+    async def save(
+        self, insert: bool = False, fields: Optional[Iterable[str]] = None
+    ) -> None:
         ...
 
     async def delete(self) -> None:
@@ -26,12 +33,42 @@ class ModelProtocol(Protocol):
     def from_dict(cls, data: Any) -> ModelProtocol:
         ...
 
+    @classmethod
+    def from_row(cls, row: Any) -> ModelProtocol:
+        ...
+
+    @classmethod
+    async def save_many(
+        cls,
+        models: Iterable[Any],
+        insert: bool = False,
+        fields: Optional[Iterable[str]] = None,
+    ) -> None:
+        ...
+
+    @classmethod
+    async def upsert_many(cls, models: Iterable[Any]) -> None:
+        ...
+
+    @classmethod
+    async def delete_many(cls, models: Iterable[Any]) -> None:
+        ...
+
     def to_dict(self) -> Any:
         ...
 
+    def to_row(self) -> tuple[Any, ...]:
+        ...
+
     def update(self, data: Any) -> ModelProtocol:
         ...
 
+    def diff(self, other: Any) -> tuple[str, ...]:
+        ...
+
+    def fingerprint(self) -> int:
+        ...
+
 
 def model(class_: T) -> T:
     g: dict[str, Any] = {"db": db}
@@ -39,19 +76,115 @@ def model(class_: T) -> T:
     increment = getattr(class_, "INCREMENT", ("id",))
     enums = getattr(class_, "ENUMS", ())
     flags = getattr(class_, "FLAGS", ())
+    fixed = getattr(class_, "FIXED", ())
     no_update = getattr(class_, "NO_UPDATE", ())
     ignore = getattr(class_, "IGNORE", ())
     slots = [i for i in class_.__slots__ if i not in ignore]
     if isinstance(primary_key, str):
         primary_key = (primary_key,)
+    columns = ", ".join(f'"{name}"' for name in slots)
+    assignments = ", ".join(f'"{name}" = ${i + 1}' for i, name in enumerate(slots))
+    where = " AND ".join(f'"{name}" = ${slots.index(name) + 1}' for name in primary_key)
+    update_query = f"UPDATE {class_.TABLE} SET {assignments} WHERE {where};"
+    # fixed point numbers are written as the decimals the numeric columns expect
+    row_values = [
+        f"self.{name}.to_decimal()"
+        if name in fixed
+        else f"self.{name}"
+        if name not in enums and name not in flags
+        else f"self.{name}.value"
+        if name not in flags
+        else f"self.{name}.flags"
+        for name in slots
+    ]
+    values = ", ".join(row_values)
+    generated = [i for i in slots if i in increment]
+    inserted = [index for index, name in enumerate(slots) if name not in increment]
+    insert_columns = ", ".join(f'"{slots[i]}"' for i in inserted)
+    insert_values = ", ".join(row_values[i] for i in inserted)
+    returned = ", ".join(f'"{i}"' for i in increment)
+    returning = f" RETURNING ({returned});" if increment else ";"
+    save_insert_query = (
+        f"INSERT INTO {class_.TABLE} ({insert_columns}) "
+        f"VALUES ({', '.join(f'${i + 1}' for i in range(len(inserted)))}){returning}"
+    )
+    delete_query = f"DELETE FROM {class_.TABLE} WHERE {' AND '.join(f'{name} = ${index + 1}' for index, name in enumerate(primary_key))};"
+    # executemany can't return generated values so only models without increments
+    # have an INSERT_QUERY
+    insert_query = (
+        None
+        if generated
+        else f"INSERT INTO {class_.TABLE} ({columns}) VALUES "
+        f"({', '.join(f'${i + 1}' for i in range(len(slots)))});"
+    )
+    # looks up a single row for the cache's read through, see Cache.fetch
+    select_query = (
+        f"SELECT {columns} FROM {class_.TABLE} WHERE "
+        + " AND ".join(f'"{name}" = ${i + 1}' for i, name in enumerate(primary_key))
+        + ";"
+    )
+    conflict = ", ".join(f'"{name}"' for name in primary_key)
+    # columns that update() leaves alone aren't overwritten by an upsert either
+    excluded = ", ".join(
+        f'"{name}" = EXCLUDED."{name}"'
+        for name in slots
+        if name not in primary_key and name not in no_update
+    )
+    upsert_query = (
+        f"INSERT INTO {class_.TABLE} ({columns}) VALUES "
+        f"({', '.join(f'${i + 1}' for i in range(len(slots)))}) "
+        f"ON CONFLICT ({conflict}) "
+        + (f"DO UPDATE SET {excluded};" if excluded else "DO NOTHING;")
+    )
+    # prepared once per connection and tracked in db.statement_stats by name, the
+    # writes of models kept up to date from the pnw api are hot so they're prepared
+    # when the connection is created
+    hot = hasattr(class_, "from_data")
+    db.register(f"{class_.TABLE}.update", update_query, prepare=hot)
+    db.register(f"{class_.TABLE}.insert", save_insert_query)
+    db.register(f"{class_.TABLE}.delete", delete_query)
+    db.register(f"{class_.TABLE}.upsert", upsert_query, prepare=hot)
+    db.register(f"{class_.TABLE}.select", select_query)
+    if insert_query is not None:
+        db.register(f"{class_.TABLE}.insert_many", insert_query)
+    partial_updates: dict[frozenset[str], tuple[str, list[int]]] = {}
+
+    def partial_update(fields: Iterable[str]) -> tuple[str, list[int]]:
+        # statements that only update some columns are registered the first time
+        # each set of columns is saved, returns the name and the row indexes used
+        key = frozenset(fields)
+        try:
+            return partial_updates[key]
+        except KeyError:
+            pass
+        names = sorted(key, key=slots.index)
+        assignments = ", ".join(f'"{name}" = ${i + 1}' for i, name in enumerate(names))
+        where = " AND ".join(
+            f'"{name}" = ${len(names) + i + 1}' for i, name in enumerate(primary_key)
+        )
+        name = f"{class_.TABLE}.update({', '.join(names)})"
+        db.register(name, f"UPDATE {class_.TABLE} SET {assignments} WHERE {where};")
+        partial_updates[key] = result = (
+            name,
+            [slots.index(i) for i in (*names, *primary_key)],
+        )
+        return result
+
+    g["partial_update"] = partial_update
+    g["differs"] = differs
+    g["hashable"] = hashable
     exec(
         f"""
-async def save(self, insert = False):
+async def save(self, insert = False, fields = None):
     if {" and ".join(f"self.{i}" for i in primary_key)} and not insert:
-        await db.query('UPDATE {class_.TABLE} SET {", ".join(f'"{name}" = ${i+1}' for i, name in enumerate(slots))} WHERE {" AND ".join(f'"{name}" = ${slots.index(name)+1}' for name in primary_key)};',
-        {", ".join(f"self.{name}" if name not in enums and name not in flags else f"self.{name}.value" if name not in flags else f"self.{name}.flags" for name in slots)})
+        if fields is None:
+            await db.execute('{class_.TABLE}.update', {values})
+        elif fields:
+            name, indexes = partial_update(fields)
+            row = self.to_row()
+            await db.execute(name, *(row[i] for i in indexes))
     else:
-        id = await db.query('INSERT INTO {class_.TABLE} ({", ".join(f'"{i}"' for i in slots if i not in increment)}) VALUES ({", ".join(f"${index + 1}" for index in range(len([j for j in slots if j not in increment])))}){" RETURNING (" + ", ".join(f'"{i}"' for i in increment) + ");" if increment else ";"}', {", ".join(f"self.{name}" if name not in enums and name not in flags else f"self.{name}.value" if name not in flags else f"self.{name}.flags" for name in slots if name not in increment)})
+        id = await db.execute('{class_.TABLE}.insert', {insert_values})
         {'self.id = id[0]["id"]' if increment else ''}
     """,
         g,
@@ -59,7 +192,7 @@ async def save(self, insert = False):
     exec(  # nosec
         f"""
 async def delete(self):
-    await db.query("DELETE FROM {class_.TABLE} WHERE {' AND '.join(f'{name} = ${index + 1}' for index, name in enumerate(primary_key))};", {", ".join(f"self.{name}" for name in primary_key)})
+    await db.execute('{class_.TABLE}.delete', {", ".join(f"self.{name}" for name in primary_key)})
     """,
         g,
     )
@@ -71,6 +204,22 @@ def from_dict(cls, data):
     """,
         g,
     )
+    # rows are sequences with the columns in the order of FIELDS
+    exec(
+        f"""
+def to_row(self):
+    return ({values},)
+    """,
+        g,
+    )
+    exec(
+        f"""
+@classmethod
+def from_row(cls, row):
+    return cls({", ".join(f"{name}=row[{index}]" for index, name in enumerate(slots))})
+    """,
+        g,
+    )
     exec(
         f"""
 def to_dict(self):
@@ -87,9 +236,113 @@ def update(self, data):
     """,
         g,
     )
+
+    # fields that can change through update, flags have no __eq__ so they're
+    # compared by value
+    compared = [i for i in slots if i not in no_update]
+    exec(
+        f"""
+def diff(self, other):
+    changed = []
+    {newline_with_spaces.join(f'if self.{name}.flags != other.{name}.flags: changed.append("{name}")' if name in flags else f'if differs(self.{name}, other.{name}): changed.append("{name}")' for name in compared)}
+    return tuple(changed)
+    """,
+        g,
+    )
+    # equal fingerprints mean diff would be empty, barring hash collisions
+    exec(
+        f"""
+def fingerprint(self):
+    return hash(({"".join(f"self.{name}.flags, " if name in flags else f"self.{name}, " if name in enums else f"hashable(self.{name}), " for name in compared)}))
+    """,
+        g,
+    )
+
+    # executemany prepares the statement once and sends every row in one round trip
+    async def save_many(
+        cls: Any,
+        models: Iterable[Any],
+        insert: bool = False,
+        fields: Optional[Iterable[str]] = None,
+    ) -> None:
+        models = list(models)
+        if not models:
+            return
+        if not insert and fields is not None:
+            fields = frozenset(fields)
+            if fields:
+                name, indexes = partial_update(fields)
+                rows = [i.to_row() for i in models]
+                await db.execute_many(name, [[i[j] for j in indexes] for i in rows])
+        elif not insert:
+            await db.execute_many(
+                f"{class_.TABLE}.update", [i.to_row() for i in models]
+            )
+        elif insert_query is not None:
+            await db.execute_many(
+                f"{class_.TABLE}.insert_many", [i.to_row() for i in models]
+            )
+        else:
+            # generated values have to be returned so the rows are inserted with
+            # one multi row statement per chunk, postgres allows 32767 parameters
+            size = 32767 // max(len(inserted), 1)
+            for start in range(0, len(models), size):
+                chunk = models[start : start + size]
+                rows = [j.to_row() for j in chunk]
+                placeholders = ", ".join(
+                    f"({', '.join(f'${index * len(inserted) + i + 1}' for i in range(len(inserted)))})"
+                    for index in range(len(chunk))
+                )
+                result = await db.query(
+                    f"INSERT INTO {class_.TABLE} ({insert_columns}) "  # nosec
+                    f"VALUES {placeholders}{returning}",
+                    *(j[i] for j in rows for i in inserted),
+                    name=f"{class_.TABLE}.save_many",
+                )
+                for model, row in zip(chunk, result):
+                    model.id = row["id"]
+
+    async def upsert_many(cls: Any, models: Iterable[Any]) -> None:
+        rows = [i.to_row() for i in models]
+        if rows:
+            await db.execute_many(f"{class_.TABLE}.upsert", rows)
+
+    async def delete_many(cls: Any, models: Iterable[Any]) -> None:
+        keys = [tuple(getattr(i, name) for name in primary_key) for i in models]
+        if keys:
+            await db.execute_many(f"{class_.TABLE}.delete", keys)
+
     class_.save = g["save"]
     class_.delete = g["delete"]
     class_.from_dict = g["from_dict"]
+    class_.from_row = g["from_row"]
+    class_.to_row = g["to_row"]
+    class_.FIELDS = tuple(slots)
+    class_.UPDATE_QUERY = update_query
+    class_.INSERT_QUERY = insert_query
+    class_.UPSERT_QUERY = upsert_query
+    class_.save_many = classmethod(save_many)
+    class_.upsert_many = classmethod(upsert_many)
+    class_.delete_many = classmethod(delete_many)
     class_.to_dict = g["to_dict"]
     class_.update = g["update"]
+    class_.diff = g["diff"]
+    class_.fingerprint = g["fingerprint"]
     return class_
+
+
+def differs(a: Any, b: Any) -> bool:
+    # nested models like Resources don't define __eq__
+    if a is b:
+        return False
+    if hasattr(a, "to_dict") and hasattr(b, "to_dict"):
+        return a.to_dict() != b.to_dict()
+    return a != b
+
+
+def hashable(value: Any) -> Any:
+    if hasattr(value, "to_dict"):
+        return tuple(value.to_dict().values())
+    if isinstance(value, list):
+        return tuple(value)  # type: ignore
+    return value
@@ -19,7 +19,7 @@ def default_default_ticket_config(
     try:
         return next(
             i
-            for i in cache.ticket_configs
+            for i in cache.ticket_configs_view
             if i.guild_id == command.interaction.guild_id and i.default
         )
     except StopIteration as e:
@@ -31,7 +31,9 @@ def default_current_ticket(
 ) -> models.Ticket:
     try:
         return next(
-            i for i in cache.tickets if i.channel_id == command.interaction.channel_id
+            i
+            for i in cache.tickets_view
+            if i.channel_id == command.interaction.channel_id
         )
     except StopIteration as e:
         raise errors.TicketNotFoundError(
@@ -16,8 +16,13 @@ async def main() -> None:
     print("Initializing cache...", flush=True)
     await cache.initialize()
     bot.running_tasks = [
+        tasks.CacheHistoryTask().start(),
+        tasks.CacheRetentionTask().start(),
+        tasks.write_behind.start(),
+        tasks.dispatcher.start(),
         tasks.PnWDataTask().start(),
-        tasks.PnWSubscriptionsTask().start(),
+        tasks.PnWSubscriptionsTask(debounce={"city": 5, "nation": 5}).start(),
+        tasks.PnWReconcileTask().start(),
     ]
     print("Connecting to Discord...", flush=True)
     await bot.run()
@@ -25,4 +30,9 @@ async def main() -> None:
 
 if __name__ == "__main__":
     loop = asyncio.get_event_loop_policy().get_event_loop()
-    loop.run_until_complete(main())
+    try:
+        loop.run_until_complete(main())
+    finally:
+        # the producers stop first so their last events and writes are handled
+        for task in reversed(getattr(bot, "running_tasks", [])):
+            loop.run_until_complete(task.stop())
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import attrs
+from src import models
+from src.cache import Cache
+
+
+def test_expressions():
+    cache = Cache()
+    rater = attrs.evolve(models.TargetRater.default_rater(), id=1)
+    cache.add_target_rater(rater)
+    expression = rater.get_expression("nukes")
+    assert rater.get_expression("nukes") is expression
+    # edited formulas are parsed again
+    new = attrs.evolve(rater, nukes="target.nukes * -8")
+    cache.update_target_rater(rater, new)
+    assert str(new.get_expression("nukes")) == "target.nukes * -8"
+    assert "target.nukes * -4" not in models.target_rater.EXPRESSIONS[1]
+    cache.remove_target_rater(new)
+    assert 1 not in models.target_rater.EXPRESSIONS
@@ -8,6 +8,8 @@ __all__ = ("init_cache",)
 
 
 def init_cache() -> None:
-    cache._alliances = alliances.DATA
-    cache._nations = nations.DATA
+    for i in alliances.DATA.values():
+        cache.add_alliance(i)
+    for i in nations.DATA.values():
+        cache.add_nation(i)
     cache._users = users.DATA
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from src.tasks.dispatch import DispatchTask
+
+
+def test_full_queue():
+    async def main() -> None:
+        dispatcher = DispatchTask(max_size=3)
+        for i in range(3):
+            dispatcher.put_nowait("bankrec_update", i, i, (), key=i)
+        dispatcher.put_nowait("war_attack_create", 1)
+        # nothing left with a lower priority, creates and deletes wait for room in
+        # the order they arrived
+        dispatcher.put_nowait("bankrec_create", 2)
+        dispatcher.put_nowait("bankrec_delete", 2)
+        dispatcher.put_nowait("bankrec_update", 3, 3, (), key=3)
+        names = []
+        while dispatcher.heap:
+            names.append(dispatcher.pop().name)
+        assert names == [
+            "war_attack_create",
+            "bankrec_update",
+            "bankrec_update",
+            "bankrec_create",
+            "bankrec_delete",
+        ]
+        stats = dispatcher.stats()
+        assert stats["bankrec_update"]["dropped"] == 2
+        assert stats["bankrec_update"]["depth"] == 0
+        assert stats["war_attack_create"]["dropped"] == 0
+        assert stats["bankrec_create"]["dropped"] == 0
+
+    asyncio.run(main())
+
+
+def test_workers():
+    running: list[int] = [0]
+    peak: list[int] = [0]
+    seen: list[Any] = []
+
+    async def main() -> None:
+        dispatcher = DispatchTask(workers=2, max_size=2, policy="block")
+
+        @dispatcher.listen("nation_create")
+        async def listener(value: Any) -> None:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+            seen.append(value)
+
+        task = asyncio.create_task(dispatcher.task())
+        # the producer waits once the heap and the overflow are full
+        await asyncio.gather(*(dispatcher.put("nation_create", i) for i in range(8)))
+        while len(seen) < 8:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        assert dispatcher.stats()["nation_create"]["p50"] >= 0.01
+
+    asyncio.run(main())
+    assert peak[0] == 2
+    assert sorted(seen) == list(range(8))
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import asyncio
+
+import attrs
+from src.tasks.dispatch import dispatcher
+from src.tasks.pnw import Debouncer
+
+from ..suite.models import nations
+
+
+def test_debouncer():
+    async def main() -> None:
+        debouncer = Debouncer("nation", 60)
+        old = nations.DATA[1002]
+        # every update hands out a new copy like the compact cache does
+        first = attrs.evolve(old, soldiers=old.soldiers + 1)
+        second = attrs.evolve(first, tanks=old.tanks + 1)
+        debouncer.put(old, first)
+        debouncer.put(first, second)
+        # nothing is dropped when the task stops before the window is up
+        debouncer.flush()
+        assert not debouncer.pending
+        event = dispatcher.pop()
+        assert event.args == (old, second, ("soldiers", "tanks"))
+        assert debouncer.stats() == {"merged": 1, "dispatched": 1, "pending": 0}
+
+    asyncio.run(main())
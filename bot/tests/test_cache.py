@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+from typing import Any
+
+import attrs
+import pytest
+from src import db, models
+from src.cache import Cache, Retention
+
+from .suite.models import alliances, nations
+from .test_compact import bankrec
+
+
+def test_nations_by_alliance():
+    cache = Cache()
+    for i in nations.DATA.values():
+        cache.add_nation(i)
+    nation = nations.DATA[1002]
+    assert cache.get_nations_by_alliance(2001) == {nation}
+    old = attrs.evolve(nation, alliance_id=2001)
+    new = attrs.evolve(nation, alliance_id=2002)
+    cache.add_nation(new)
+    cache.update_nation(old, new)
+    assert cache.get_nations_by_alliance(2001) == set()
+    assert cache.get_nations_by_alliance(2002) == {new}
+    cache.remove_nation(new)
+    assert cache.get_nations_by_alliance(2002) == set()
+
+
+def test_nations_by_score():
+    cache = Cache()
+    for i in nations.DATA.values():
+        cache.add_nation(i)
+    nation = nations.DATA[1001]
+    assert cache.get_nations_by_score(200, 300) == sorted(
+        nations.DATA.values(), key=lambda x: x.score
+    )
+    assert cache.get_nations_by_score(250, 300) == [nation]
+    old = attrs.evolve(nation)
+    new = attrs.evolve(nation, score=nation.score * 10)
+    cache.add_nation(new)
+    cache.update_nation(old, new)
+    assert cache.get_nations_by_score(250, 300) == []
+    assert cache.get_nations_by_score(2000, 3000) == [new]
+
+
+def test_alliance_aggregates():
+    cache = Cache()
+    for i in nations.DATA.values():
+        cache.add_nation(i)
+    nation = nations.DATA[1002]
+    aggregate = cache.get_alliance_aggregate(2001)
+    assert aggregate["nations"] == 1
+    assert aggregate["soldiers"] == nation.soldiers
+    assert aggregate["score"] == float(nation.score)
+    assert aggregate["cities"] == 0
+    assert cache.get_alliance_aggregates().keys() == {2001}
+    cache.remove_nation(nation)
+    assert cache.get_alliance_aggregate(2001)["nations"] == 0
+    assert len(cache.nation_columns) == len(nations.DATA) - 1
+
+
+def test_alliance_rank():
+    cache = Cache()
+    alliance = alliances.DATA[2001]
+    other = attrs.evolve(alliance, id=2002, score=alliance.score * 2)
+    cache.add_alliance(alliance)
+    cache.add_alliance(other)
+    assert cache.get_alliance_rank(alliance) == 2
+    assert cache.get_top_alliances(1) == [other]
+    old = attrs.evolve(alliance)
+    new = attrs.evolve(alliance, score=alliance.score * 3)
+    cache.add_alliance(new)
+    cache.update_alliance(old, new)
+    assert cache.get_alliance_rank(new) == 1
+    assert cache.get_top_alliances(5) == [new, other]
+    cache.remove_alliance(other)
+    assert cache.get_top_alliances(5) == [new]
+
+
+def test_retention():
+    for compact in (False, True):
+        cache = Cache(
+            compact=compact,
+            retention={
+                "bankrecs": Retention(window=datetime.timedelta(hours=1), max_count=50)
+            },
+        )
+        for i in range(1, 4001):
+            cache.add_bankrec(bankrec(i))
+        cache._ready["bankrecs"].set()
+        now = bankrec(3900).date
+        assert cache.sweep(now) == {"bankrecs": 3950}
+        assert min(cache.bankrecs_view, key=lambda x: x.id).id == 3951
+        assert cache.retention_stats()["bankrecs"]["evicted"] == 3950
+        rows = asyncio.run(cache.fetch_history(models.Bankrec, bankrec(3990).date))
+        assert [i.id for i in rows] == list(range(3990, 4001))
+
+
+def test_fetch_evicted(monkeypatch: pytest.MonkeyPatch):
+    async def execute(name: str, id: int) -> list[tuple[Any, ...]]:
+        return [bankrec(id).to_row()]
+
+    cache = Cache(retention={"bankrecs": Retention(max_count=1)})
+    cache.add_bankrec(bankrec(1))
+    cache.add_bankrec(bankrec(2))
+    cache._ready["bankrecs"].set()
+    cache.sweep(bankrec(2).date)
+    monkeypatch.setattr(db, "execute", execute)
+    assert asyncio.run(cache.fetch_bankrec(1)).id == 1
+    assert cache.get_bankrec(1) is None
+    assert asyncio.run(cache.fetch_bankrec(3)).id == 3
+    assert cache.get_bankrec(3) is not None
+
+
+def test_fetch(monkeypatch: pytest.MonkeyPatch):
+    queries: list[int] = []
+
+    async def execute(name: str, id: int) -> list[tuple[Any, ...]]:
+        queries.append(id)
+        await asyncio.sleep(0.01)
+        return [nations.DATA[id].to_row()] if id in nations.DATA else []
+
+    async def main() -> None:
+        cache = Cache()
+        found = await asyncio.gather(*(cache.fetch_nation(1002) for _ in range(10)))
+        assert all(i is found[0] for i in found)
+        assert cache.get_nation(1002) is found[0]
+        assert (
+            await asyncio.gather(*(cache.fetch_nation(1) for _ in range(10)))
+            == [None] * 10
+        )
+        assert await cache.fetch_nation(1) is None
+        assert await cache.fetch_nation(1002) is found[0]
+
+    monkeypatch.setattr(db, "execute", execute)
+    asyncio.run(main())
+    assert queries == [1002, 1]
+
+
+def test_load_history(monkeypatch: pytest.MonkeyPatch):
+    cache = Cache()
+
+    async def load(model: Any, **kwargs: Any) -> Any:
+        if model is models.Trade:
+            raise RuntimeError
+        if model is models.Bankrec:
+            chunk = [bankrec(i) for i in range(1, 4)]
+            # deleted after the chunk was fetched
+            cache.remove_bankrec(chunk[1])
+            yield chunk
+
+    monkeypatch.setattr(db, "load", load)
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.load_history())
+    assert sorted(i.id for i in cache.bankrecs_view) == [1, 3]
+    assert cache.is_ready("trades")
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import numpy
+from src.columns import Columns
+
+
+def test_lookup():
+    columns = Columns({"id": "int64"})
+    for i in (5, 3, 9):
+        columns.set_values(i, [i])
+    assert columns.lookup(numpy.array([9, 4, 3])).tolist() == [2, -1, 1]
+    # the sort order is kept until rows are added or removed
+    columns.set_values(4, [4])
+    columns.remove(5)
+    assert columns.lookup(numpy.array([9, 4, 3, 5])).tolist() == [2, 0, 1, -1]
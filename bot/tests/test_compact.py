@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import datetime
+import pickle  # nosec
+from decimal import Decimal
+
+import attrs
+from src import enums, models
+from src.compact import CompactTable, benchmark, codec
+from src.tasks.write_behind import primary_key
+
+
+def bankrec(id: int) -> models.Bankrec:
+    return models.Bankrec(
+        id=id,
+        date=datetime.datetime(2022, 1, 1, tzinfo=datetime.timezone.utc)
+        + datetime.timedelta(seconds=id),
+        sender_id=1001,
+        sender_type=enums.BankrecParticipantType.NATION,
+        receiver_id=2001,
+        receiver_type=enums.BankrecParticipantType.ALLIANCE,
+        banker_id=1001,
+        note="deposit",
+        resources=models.Resources(money=Decimal("1234567.89"), food=Decimal(id)),
+        tax_id=0,
+    )
+
+
+def test_compact_table():
+    table = CompactTable(models.Bankrec)
+    for i in range(1, 4):
+        table[i] = bankrec(i)
+    del table[1]
+    assert len(table) == 2 and 1 not in table and table.get(1) is None
+    row = table[3]
+    assert row.to_dict() | {"resources": None} == bankrec(3).to_dict() | {
+        "resources": None
+    }
+    assert row.resources.to_dict() == bankrec(3).resources.to_dict()
+
+
+def test_compact_view():
+    table = CompactTable(models.Bankrec)
+    table[1] = bankrec(1)
+    view = table[1]
+    assert view is table.get(1) and isinstance(view, models.Bankrec)
+    # changes are written to the row
+    view.note = "withdrawal"
+    view.sender_type = enums.BankrecParticipantType.ALLIANCE.value
+    assert table.columns.read(0, ["note"]) == ["withdrawal"]
+    assert view.sender_type is enums.BankrecParticipantType.ALLIANCE
+    copy = attrs.evolve(view)
+    assert type(copy) is models.Bankrec and copy.note == "withdrawal"
+    assert type(pickle.loads(pickle.dumps(view))) is models.Bankrec  # nosec
+    # queued writes of the view and a copy of the row are merged
+    assert primary_key(view) == primary_key(copy)
+    # the view keeps its values once the row is gone
+    table.remove_many([1])
+    assert view.note == "withdrawal" and 1 not in table
+
+
+def test_compact_benchmark():
+    result = benchmark(models.Bankrec, [bankrec(i) for i in range(1, 1001)])
+    assert result["compact"] < result["dict"]
+
+
+def test_decimal_codec():
+    _, encode, decode = codec("money_stolen", "decimal.Decimal")
+    for value in (
+        None,
+        Decimal("-1.5"),
+        Decimal("12345678901234567.89"),
+        Decimal("0.123456789"),
+        Decimal("1e30"),
+    ):
+        assert decode(encode(value)) == value
+    assert encode(Decimal("12345678901234567.89"))[1] is None
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from src import db
+
+
+def test_statement_stats():
+    stats = db.StatementStats()
+    for i in range(100):
+        stats.record(i / 1000, 2)
+    assert stats.to_dict() == {"count": 100, "rows": 200, "p50": 0.049, "p99": 0.098}
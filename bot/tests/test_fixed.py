@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+from src import models
+from src.fixed import Fixed, fixed_array, fixed_sum
+
+
+def test_fixed():
+    a = Fixed.from_number(Decimal("0.1"))
+    b = Fixed.from_number("0.2")
+    assert a + b == Decimal("0.3")
+    assert fixed_sum([a] * 10) == 1
+    assert Fixed(fixed_array(["0.1"] * 10).sum()) == 1
+    assert (a - b).to_decimal() == Decimal("-0.1")
+    assert b * 3 == Fixed(60)
+    assert b / 2 == Decimal("0.1")
+    assert Fixed.from_number(Decimal("12.345")) == Decimal("12.34")
+    assert a < b < 0.3 < Fixed(31)
+    assert hash(Fixed(150)) == hash(Decimal("1.5"))
+    assert f"{Fixed(123456):,.2f}" == "1,234.56"
+    assert a + Decimal("1.50") == Decimal("1.6")
+    assert Decimal("1.5") - a == Decimal("1.4")
+    # finer decimals aren't rounded away silently
+    with pytest.raises(ValueError):
+        a + Decimal("0.001")
+    with pytest.raises(ValueError):
+        Decimal("0.001") - a
+
+
+def test_resources_row():
+    resources = models.Resources(money=Decimal("1000000.01"), food=5)
+    assert list(resources)[0] == Decimal("1000000.01")
+    assert all(isinstance(i, Decimal) for i in resources)
+    assert str(resources) == "$1,000,000.01, 5.00 Food"
+
+
+def test_resources_dict():
+    resources = models.Resources(money=Decimal("12.5"))
+    data = resources.to_dict()
+    assert data["money"] == Decimal("12.50")
+    assert all(type(i) is Decimal for i in data.values())
+    assert models.Resources.from_dict(data).to_dict() == data
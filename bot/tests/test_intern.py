@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from src import enums, intern, models
+
+from .suite.models import nations
+
+
+def test_enum():
+    convert = intern.enum(enums.Color)
+    assert convert(enums.Color.BLUE.value) is enums.Color.BLUE
+    assert convert(enums.Color.BLUE) is enums.Color.BLUE
+    with pytest.raises(ValueError):
+        convert(object())
+
+
+def test_bytes_saved():
+    # separately decoded payloads don't share their strings
+    flag = '"https://politicsandwar.com/uploads/flag.png"'
+    copies = [
+        models.Nation.from_dict({**i.to_dict(), "flag": json.loads(flag)})
+        for i in nations.DATA.values()
+    ]
+    assert copies[0].flag is copies[1].flag
+    assert intern.bytes_saved(copies, intern.interned_fields(models.Nation)) > 0
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import lang
+import numpy
+import pytest
+
+
+class Model:
+    __lang_attrs__ = ("value",)
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+        self.hidden = value
+
+
+def test_evaluate():
+    scope = {"a": Model(15), "b": Model(3)}
+    assert lang.parse_expression("a.value > 10 && b.value < 5").evaluate(scope)
+    assert lang.parse_expression("a.value - b.value * 2").evaluate(scope) == 9
+    assert lang.parse_expression("-a.value + b.value").evaluate(scope) == -12
+    assert lang.parse_expression("b.value in [1, 2, 3]").evaluate(scope)
+
+
+def test_short_circuit():
+    scope = {"a": Model(15)}
+    assert lang.parse_expression("true || a.missing").evaluate(scope) is True
+    assert lang.parse_expression("false && a.missing").evaluate(scope) is False
+
+
+def test_lang_attrs():
+    with pytest.raises(lang.InvalidAttributeError):
+        lang.parse_expression("a.hidden").evaluate({"a": Model(15)})
+    # with the type known the name is checked when compiling, before evaluating
+    with pytest.raises(lang.InvalidAttributeError):
+        lang.compile_expression(lang.parse_expression("a.hidden"), {"a": Model})
+    expression = lang.parse_expression("a.value * 2")
+    assert expression.evaluate({"a": Model(4)}, {"a": Model}) == 8
+
+
+def test_evaluate_batch():
+    rows = [Model(i) for i in range(10)]
+    columns = {"a": {"value": numpy.arange(10)}}
+    for text in (
+        "a.value > b.value && a.value % 2 == 0",
+        "a.value * 2 - b.value",
+        "a.value in [1, 2, 3] || -a.value < -8",
+    ):
+        expression = lang.parse_expression(text)
+        result = lang.evaluate_batch(expression, {"b": Model(3)}, {"a": rows}, columns)
+        assert list(result) == [
+            expression.evaluate({"a": i, "b": Model(3)}) for i in rows
+        ]
+
+
+def test_evaluate_batch_guard():
+    class Outer:
+        __lang_attrs__ = ("inner",)
+
+        def __init__(self, inner: Model | None) -> None:
+            self.inner = inner
+
+    rows = [Outer(None if i % 2 == 0 else Model(i)) for i in range(4)]
+    for text in (
+        "a.inner is not None && a.inner.value > 0",
+        "a.inner is None || a.inner.value > 2",
+    ):
+        expression = lang.parse_expression(text)
+        result = lang.evaluate_batch(expression, {}, {"a": rows}, {})
+        assert list(result) == [expression.evaluate({"a": i}) for i in rows]
@@ -25,3 +25,59 @@ def test_model():
     assert hasattr(Model, "TABLE")
     assert hasattr(Model, "save")
     assert hasattr(Model, "from_dict")
+    assert hasattr(Model, "from_row")
+
+
+@utils.model
+@attrs.define(weakref_slot=False, auto_attribs=True, kw_only=True, eq=False)
+class RowModel:
+    TABLE: ClassVar[str] = "test"
+
+    id: int
+    name: str
+
+
+def test_from_row():
+    assert RowModel.FIELDS == ("id", "name")  # type: ignore
+    model = RowModel.from_row((1, "name"))  # type: ignore
+    assert (model.id, model.name) == (1, "name")
+
+
+def test_batch_methods():
+    assert hasattr(RowModel, "save_many")
+    assert hasattr(RowModel, "upsert_many")
+    assert hasattr(RowModel, "delete_many")
+    assert RowModel.UPSERT_QUERY == (  # type: ignore
+        'INSERT INTO test ("id", "name") VALUES ($1, $2) '
+        'ON CONFLICT ("id") DO UPDATE SET "name" = EXCLUDED."name";'
+    )
+
+
+@utils.model
+@attrs.define(weakref_slot=False, auto_attribs=True, kw_only=True, eq=False)
+class NoUpdateModel:
+    TABLE: ClassVar[str] = "test_no_update"
+    NO_UPDATE: ClassVar[tuple[str, ...]] = ("seen",)
+
+    id: int
+    name: str
+    seen: int
+
+
+def test_upsert_no_update():
+    assert NoUpdateModel.UPSERT_QUERY == (  # type: ignore
+        'INSERT INTO test_no_update ("id", "name", "seen") VALUES ($1, $2, $3) '
+        'ON CONFLICT ("id") DO UPDATE SET "name" = EXCLUDED."name";'
+    )
+
+
+def test_diff():
+    model = RowModel(id=1, name="name")
+    assert model.diff(RowModel(id=1, name="name")) == ()  # type: ignore
+    assert model.diff(RowModel(id=1, name="other")) == ("name",)  # type: ignore
+
+
+def test_fingerprint():
+    model = RowModel(id=1, name="name")
+    assert model.fingerprint() == RowModel(id=1, name="name").fingerprint()  # type: ignore
+    assert model.fingerprint() != RowModel(id=1, name="other").fingerprint()  # type: ignore